@@ -1,4 +1,5 @@
 # waves
+from typing import Dict, Tuple, FrozenSet
 
 GAME_ID = 3
 SERVER_ID = "76402e5b20be2c39f095a152090afddc"
@@ -120,3 +121,77 @@ def get_need_proxy_func():
     if NeedProxyFunc:
         return NeedProxyFunc
     return []
+
+
+# WavesApi 方法 -> 请求地址, 用于按方法名配置代理
+FUNC_URL_MAP = {
+    "get_kuro_role_list": (ROLE_LIST_URL,),
+    "get_daily_info": (MR_REFRESH_URL,),
+    "refresh_data": (REFRESH_URL,),
+    "login_log": (LOGIN_LOG_URL,),
+    "get_base_info": (BASE_DATA_URL,),
+    "get_role_info": (ROLE_DATA_URL,),
+    "get_tree": (WIKI_TREE_URL,),
+    "get_wiki": (WIKI_DETAIL_URL,),
+    "get_role_detail_info": (ROLE_DETAIL_URL,),
+    "get_calabash_data": (CALABASH_DATA_URL,),
+    "get_explore_data": (EXPLORE_DATA_URL,),
+    "get_challenge_data": (CHALLENGE_DATA_URL,),
+    "get_abyss_data": (TOWER_DETAIL_URL,),
+    "get_abyss_index": (TOWER_INDEX_URL,),
+    "get_slash_index": (SLASH_INDEX_URL,),
+    "get_slash_detail": (SLASH_DETAIL_URL,),
+    "get_more_activity": (MORE_ACTIVITY_URL,),
+    "get_request_token": (REQUEST_TOKEN,),
+    "calculator_refresh_data": (CALCULATOR_REFRESH_DATA_URL,),
+    "get_online_list_role": (ONLINE_LIST_ROLE,),
+    "get_online_list_weapon": (ONLINE_LIST_WEAPON,),
+    "get_online_list_phantom": (ONLINE_LIST_PHANTOM,),
+    "get_owned_role": (QUERY_OWNED_ROLE,),
+    "get_develop_role_cultivate_status": (ROLE_CULTIVATE_STATUS,),
+    "get_batch_role_cost": (BATCH_ROLE_COST,),
+    "get_period_list": (PERIOD_LIST_URL,),
+    "get_period_detail": (MONTH_LIST_URL, WEEK_LIST_URL, VERSION_LIST_URL),
+    "get_gacha_log": (GACHA_LOG_URL, GACHA_NET_LOG_URL),
+    "get_ann_list_by_type": (ANN_LIST_URL,),
+    "get_ann_detail": (ANN_CONTENT_URL,),
+    "get_wiki_home": (WIKI_HOME_URL,),
+    "get_entry_detail": (WIKI_ENTRY_DETAIL_URL,),
+    "login": (LOGIN_URL,),
+}
+
+_need_proxy_urls: Dict[Tuple[str, ...], Tuple[bool, FrozenSet[str]]] = {}
+
+
+def get_need_proxy_urls() -> Tuple[bool, FrozenSet[str]]:
+    """根据需要代理的函数配置得到 (是否全部代理, 需要代理的地址)"""
+    proxy_func = tuple(get_need_proxy_func())
+    if proxy_func not in _need_proxy_urls:
+        urls = frozenset(
+            url for func in proxy_func for url in FUNC_URL_MAP.get(func, ())
+        )
+        _need_proxy_urls[proxy_func] = ("all" in proxy_func, urls)
+    return _need_proxy_urls[proxy_func]
+
+
+# 只读接口: 相同的并发请求合并为一次, 值为成功结果的缓存秒数
+SINGLE_FLIGHT_URLS = {
+    ROLE_LIST_URL: 0,
+    MR_REFRESH_URL: 3,
+    BASE_DATA_URL: 3,
+    ROLE_DATA_URL: 3,
+    ROLE_DETAIL_URL: 3,
+    CALABASH_DATA_URL: 3,
+    EXPLORE_DATA_URL: 3,
+    CHALLENGE_DATA_URL: 3,
+    TOWER_DETAIL_URL: 3,
+    TOWER_INDEX_URL: 3,
+    SLASH_INDEX_URL: 3,
+    SLASH_DETAIL_URL: 3,
+    MORE_ACTIVITY_URL: 3,
+    QUERY_OWNED_ROLE: 3,
+    PERIOD_LIST_URL: 3,
+    MONTH_LIST_URL: 3,
+    WEEK_LIST_URL: 3,
+    VERSION_LIST_URL: 3,
+}
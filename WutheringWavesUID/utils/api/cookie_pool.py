@@ -0,0 +1,112 @@
+import time
+import random
+import asyncio
+from collections import deque, OrderedDict
+from typing import TYPE_CHECKING, Dict, Deque, Optional
+
+from gsuid_core.logger import logger
+
+from ..database.models import WavesUser
+from ...wutheringwaves_config import WutheringWavesConfig
+
+if TYPE_CHECKING:
+    from .requests import WavesApi
+
+# 使用次数统计窗口(秒)
+RATE_WINDOW = 60
+# 同时验证的ck数
+VALIDATE_CONCURRENCY = 5
+
+
+class PublicCookiePool:
+    """预先验证的国服公共ck池
+
+    按最近最少使用的顺序借出，每个ck在统计窗口内的使用次数有上限
+    """
+
+    def __init__(self):
+        # cookie -> uid, 队首为最久未使用
+        self.pool: "OrderedDict[str, str]" = OrderedDict()
+        self.uses: Dict[str, Deque[float]] = {}
+        self.last_refresh = 0.0
+        self._lock = asyncio.Lock()
+
+    def _rate_limited(self, cookie: str, now: float) -> bool:
+        limit = WutheringWavesConfig.get_config("PublicCkRateLimit").data
+        if limit <= 0:
+            return False
+        uses = self.uses.setdefault(cookie, deque())
+        while uses and uses[0] <= now - RATE_WINDOW:
+            uses.popleft()
+        return len(uses) >= limit
+
+    def borrow(self) -> Optional[str]:
+        now = time.time()
+        for cookie in self.pool:
+            if self._rate_limited(cookie, now):
+                continue
+            self.pool.move_to_end(cookie)
+            self.uses[cookie].append(now)
+            return cookie
+        return None
+
+    def discard(self, cookie: str):
+        self.pool.pop(cookie, None)
+        self.uses.pop(cookie, None)
+
+    async def _validate(self, api: "WavesApi", user: WavesUser) -> bool:
+        if not await WavesUser.cookie_validate(user.uid):
+            return False
+        if api.is_net(user.uid):
+            return False
+
+        data = await api.login_log(user.uid, user.cookie)
+        if not data.success:
+            await data.mark_cookie_invalid(user.uid, user.cookie)
+            return False
+
+        data = await api.refresh_data(user.uid, user.cookie)
+        if not data.success:
+            await data.mark_cookie_invalid(user.uid, user.cookie)
+            return False
+        return True
+
+    async def refresh(self, api: "WavesApi", force: bool = True):
+        """重新验证并填充ck池，force为False时跳过最近刚刷新过的情况"""
+        async with self._lock:
+            if not force and time.time() - self.last_refresh < RATE_WINDOW:
+                return
+            size = WutheringWavesConfig.get_config("PublicCkPoolSize").data
+            user_list = await WavesUser.get_waves_all_user()
+            random.shuffle(user_list)
+
+            pool: "OrderedDict[str, str]" = OrderedDict()
+            for i in range(0, len(user_list), VALIDATE_CONCURRENCY):
+                if len(pool) >= size:
+                    break
+                batch = [
+                    u for u in user_list[i : i + VALIDATE_CONCURRENCY] if u.cookie
+                ]
+                results = await asyncio.gather(
+                    *[self._validate(api, u) for u in batch],
+                    return_exceptions=True,
+                )
+                for user, ok in zip(batch, results):
+                    if ok is True and len(pool) < size:
+                        pool[user.cookie] = user.uid
+
+            # 保留原有的使用顺序与次数
+            old_order = [c for c in self.pool if c in pool]
+            new_order = [c for c in pool if c not in self.pool]
+            self.pool = OrderedDict((c, pool[c]) for c in new_order + old_order)
+            self.uses = {c: self.uses.get(c, deque()) for c in self.pool}
+            self.last_refresh = time.time()
+            logger.info(f"[鸣潮] 公共ck池刷新完成, 数量: {len(self.pool)}")
+
+    async def get_cookie(self, api: "WavesApi") -> Optional[str]:
+        if not self.pool:
+            await self.refresh(api, force=False)
+        return self.borrow()
+
+
+public_cookie_pool = PublicCookiePool()
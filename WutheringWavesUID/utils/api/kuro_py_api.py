@@ -1,5 +1,7 @@
 # 集成 kuro.py 的国际服登录功能
-from typing import Any, Optional
+import time
+import asyncio
+from typing import Any, Dict, Tuple, Optional
 
 import kuro
 from kuro.types import Region
@@ -19,6 +21,58 @@ from .model import (
     AccountBaseInfo,
 )
 
+# OAuth code 缓存时间(秒)
+OAUTH_CODE_EXPIRE = 600
+
+_overseas_client: Optional[kuro.Client] = None
+# ck -> (oauth_code, 过期时间)
+_oauth_codes: Dict[str, Tuple[str, float]] = {}
+# uid -> 区域
+_uid_regions: Dict[str, Any] = {}
+
+
+def get_overseas_client() -> kuro.Client:
+    """复用的国际服客户端"""
+    global _overseas_client
+    if _overseas_client is None:
+        _overseas_client = kuro.Client(region=Region.OVERSEAS)
+    return _overseas_client
+
+
+async def get_oauth_code(client: kuro.Client, ck: str, refresh: bool = False) -> str:
+    now = time.time()
+    item = _oauth_codes.get(ck)
+    if not refresh and item and item[1] > now:
+        return item[0]
+
+    oauth_code = await client.generate_oauth_code(ck)
+    if len(_oauth_codes) > 1000:
+        for key in [k for k, v in _oauth_codes.items() if v[1] <= now]:
+            del _oauth_codes[key]
+    _oauth_codes[ck] = (oauth_code, now + OAUTH_CODE_EXPIRE)
+    return oauth_code
+
+
+async def find_player_region(
+    client: kuro.Client, oauth_code: str, uid: str
+) -> Optional[Any]:
+    """查询uid所在区域并保存"""
+    player_infos = await client.get_player_info(oauth_code)
+    logger.info(
+        f"[國際服] 獲取到 {len(player_infos)} 個區域的玩家信息: {list(player_infos.keys())}"
+    )
+    for region, player_info in player_infos.items():
+        if player_info and str(player_info.uid) == str(uid):
+            logger.info(f"[國際服] 找到 UID {uid} 在區域 {region}")
+            _uid_regions[uid] = region
+            await WavesUser.update_region_by_uid(uid, str(region))
+            return region
+
+    logger.warning(
+        f"[國際服] 未找到 UID {uid} 對應的區域，可用區域: {list(player_infos.keys())}"
+    )
+    return None
+
 
 async def login_overseas(
     user_id: str,
@@ -210,6 +264,7 @@ async def login_overseas(
             continue
 
         uid = str(player_info.uid)  # 使用 uid 字段
+        _uid_regions[uid] = region
 
         # 檢查UID是否在黑名單中
         from ...utils.util import is_uid_banned
@@ -236,6 +291,7 @@ async def login_overseas(
                 update_data={
                     "cookie": token_result.access_token,
                     "platform": region,
+                    "region": str(region),
                     "status": "",
                 },
             )
@@ -248,6 +304,7 @@ async def login_overseas(
                 cookie=token_result.access_token,
                 uid=uid,
                 platform=region,
+                region=str(region),
                 status="",
             )
             logger.info(f"WavesUser 創建成功: UID {uid}")
@@ -271,10 +328,11 @@ async def login_overseas(
 
 
 async def get_role_info_overseas(ck: str, uid: str) -> RoleInfo | None:
-    """获取国际服角色信息"""
-    import asyncio
+    """获取国际服角色信息
 
-    client = kuro.Client(region=Region.OVERSEAS)
+    复用客户端、OAuth code 与 uid 所在区域，缓存命中时只需请求一次角色信息
+    """
+    client = get_overseas_client()
 
     waves_user = await WavesUser.select_data_by_cookie_and_uid(cookie=ck, uid=uid)
     if not waves_user:
@@ -282,37 +340,27 @@ async def get_role_info_overseas(ck: str, uid: str) -> RoleInfo | None:
 
     # 添加重試機制
     max_retries = 3
+    refresh = False
     for attempt in range(max_retries):
+        used_cache = False
         try:
-            logger.info(f"[國際服] 嘗試 {attempt + 1}/{max_retries}: 生成 OAuth code")
             # 生成 OAuth code
-            oauth_code = await client.generate_oauth_code(ck)
-            logger.info(f"[國際服] OAuth code 生成成功")
-
-            # 首先獲取玩家信息以確定正確的區域
-            logger.info(f"[國際服] 獲取玩家信息...")
-            player_infos = await client.get_player_info(oauth_code)
-            logger.info(
-                f"[國際服] 獲取到 {len(player_infos)} 個區域的玩家信息: {list(player_infos.keys())}"
-            )
+            if not refresh and ck in _oauth_codes:
+                used_cache = True
+            oauth_code = await get_oauth_code(client, ck, refresh)
 
-            # 找到對應 UID 的區域
+            # 確定 UID 所在區域
             target_region = None
-            for region, player_info in player_infos.items():
-                logger.info(f"[國際服] 檢查區域 {region}: UID {player_info.uid}")
-                if str(player_info.uid) == str(uid):
-                    target_region = region
-                    logger.info(f"[國際服] 找到 UID {uid} 在區域 {region}")
-                    break
-
+            if not refresh:
+                target_region = _uid_regions.get(uid) or waves_user.region or None
+                used_cache = used_cache or bool(target_region)
+            if not target_region:
+                target_region = await find_player_region(client, oauth_code, uid)
             if not target_region:
-                logger.warning(
-                    f"[國際服] 未找到 UID {uid} 對應的區域，可用區域: {list(player_infos.keys())}"
-                )
                 return None
 
             # 獲取角色詳細信息
-            logger.info(f"[國際服] 獲取角色詳細信息，區域: {target_region}")
+            logger.debug(f"[國際服] 獲取角色詳細信息，區域: {target_region}")
             role_info = await client.get_player_role(
                 oauth_code, int(uid), target_region
             )
@@ -321,13 +369,12 @@ async def get_role_info_overseas(ck: str, uid: str) -> RoleInfo | None:
                 logger.warning(f"[國際服] 角色信息不完整")
                 return None
 
-            logger.info(f"[國際服] 獲取用戶信息成功")
+            logger.debug(f"[國際服] 獲取用戶信息成功")
             return role_info
 
         except Exception as e:
             logger.error(f"获取国际服用户信息失败 (嘗試 {attempt + 1}): {e}")
             logger.error(f"錯誤類型: {type(e).__name__}")
-            logger.error(f"錯誤詳情: {str(e)}")
 
             # 檢查是否為特定的錯誤類型
             error_str = str(e).lower()
@@ -338,6 +385,12 @@ async def get_role_info_overseas(ck: str, uid: str) -> RoleInfo | None:
             elif "connection" in error_str:
                 logger.error("檢測到連接錯誤，可能是網絡問題")
 
+            # 緩存的 OAuth code 或區域可能已失效，重新獲取後立即重試
+            refresh = True
+            _oauth_codes.pop(ck, None)
+            if used_cache:
+                continue
+
             # 如果不是最後一次嘗試，等待後重試
             if attempt < max_retries - 1:
                 wait_time = 2**attempt  # 指數退避：1s, 2s, 4s
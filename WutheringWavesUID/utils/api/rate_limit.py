@@ -0,0 +1,158 @@
+import time
+import asyncio
+from typing import Dict, List, Tuple
+from urllib.parse import urlsplit
+
+from gsuid_core.logger import logger
+
+from ...wutheringwaves_config import WutheringWavesConfig
+
+# 限流时速率下限(每秒)
+MIN_RATE = 1.0
+# 成功时每次增加的速率占上限的比例
+RATE_INCREASE = 0.05
+# 限流或失败时速率乘以该系数
+RATE_DECREASE = 0.5
+# 连续失败多少次后熔断
+FAILURE_THRESHOLD = 10
+# 熔断持续时间(秒)
+OPEN_SECONDS = 30
+# 半开状态下探测请求超过该时间(秒)仍未得出结果时，允许下一个请求探测
+PROBE_SECONDS = 30
+
+
+class KuroThrottleError(Exception):
+    """服务端限流(429)或服务端错误(5xx)"""
+
+
+def get_kuro_request_rate() -> float:
+    return WutheringWavesConfig.get_config("KuroRequestRate").data or 0
+
+
+class EndpointLimiter:
+    """单个 host + 接口路径 的令牌桶限流与熔断
+
+    速率按 AIMD 调整: 成功时线性增加，限流/服务端错误时减半；
+    限流、服务端错误与连接失败计入熔断，其他错误不计入
+    """
+
+    def __init__(self, name: str, max_rate: float):
+        self.name = name
+        self.max_rate = max_rate
+        self.rate = max_rate
+        self.tokens = max_rate
+        self.updated = time.monotonic()
+
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probe_at = 0.0
+        self.state = "closed"
+        self.throttled = 0
+        self.rejected = 0
+
+    def set_max_rate(self, max_rate: float):
+        if max_rate != self.max_rate:
+            self.max_rate = max_rate
+            self.rate = min(self.rate, max_rate) if self.rate > 0 else max_rate
+
+    def allow(self) -> bool:
+        """熔断判断，半开状态只放行一个探测请求"""
+        if self.state == "closed":
+            return True
+        now = time.monotonic()
+        if (
+            self.state == "open"
+            and now - self.opened_at >= OPEN_SECONDS
+            or self.state == "half_open"
+            and now - self.probe_at >= PROBE_SECONDS
+        ):
+            self.state = "half_open"
+            self.probe_at = now
+            return True
+        self.rejected += 1
+        return False
+
+    def release(self):
+        """请求结束，探测请求被取消或未得出结果时允许下一个请求探测
+
+        在 finally 中调用，已由 on_success/on_failure 结算时无影响
+        """
+        if self.state == "half_open":
+            self.probe_at = 0.0
+
+    async def acquire(self):
+        if self.max_rate <= 0:
+            return
+        while True:
+            now = time.monotonic()
+            self.tokens = min(
+                self.max_rate, self.tokens + (now - self.updated) * self.rate
+            )
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            await asyncio.sleep((1 - self.tokens) / self.rate)
+
+    def on_success(self):
+        self.rate = min(self.max_rate, self.rate + self.max_rate * RATE_INCREASE)
+        self.failures = 0
+        if self.state != "closed":
+            logger.info(f"[鸣潮] 接口 {self.name} 恢复正常")
+            self.state = "closed"
+
+    def on_throttle(self):
+        self.throttled += 1
+        if self.max_rate > 0:
+            self.rate = max(MIN_RATE, self.rate * RATE_DECREASE)
+        self.on_failure()
+
+    def on_failure(self):
+        self.failures += 1
+        if self.state == "half_open" or (
+            self.state == "closed" and self.failures >= FAILURE_THRESHOLD
+        ):
+            logger.warning(
+                f"[鸣潮] 接口 {self.name} 连续失败 {self.failures} 次，熔断 {OPEN_SECONDS} 秒"
+            )
+            self.state = "open"
+            self.opened_at = time.monotonic()
+
+    @property
+    def limited(self) -> bool:
+        return self.rate < self.max_rate
+
+
+class KuroRateLimiter:
+    """所有 WavesApi 请求共享的限流器，按 host 与完整路径区分接口"""
+
+    def __init__(self):
+        self.limiters: Dict[Tuple[str, str], EndpointLimiter] = {}
+
+    def get(self, url: str) -> EndpointLimiter:
+        parts = urlsplit(url)
+        key = (parts.netloc, parts.path)
+        limiter = self.limiters.get(key)
+        max_rate = get_kuro_request_rate()
+        if limiter is None:
+            limiter = EndpointLimiter(f"{key[0]}{key[1]}", max_rate)
+            self.limiters[key] = limiter
+        else:
+            limiter.set_max_rate(max_rate)
+        return limiter
+
+    def get_state(self) -> List[Dict]:
+        return [
+            {
+                "name": i.name,
+                "state": i.state,
+                "rate": round(i.rate, 2),
+                "max_rate": i.max_rate,
+                "throttled": i.throttled,
+                "rejected": i.rejected,
+            }
+            for i in self.limiters.values()
+        ]
+
+
+kuro_rate_limiter = KuroRateLimiter()
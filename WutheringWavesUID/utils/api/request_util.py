@@ -2,6 +2,8 @@ import asyncio
 from enum import IntEnum
 from typing import Any, Dict, Union, Generic, TypeVar, Optional
 
+from msgspec import Struct, DecodeError, ValidationError
+from msgspec import json as msgjson
 from gsuid_core.logger import logger
 from pydantic import (
     Field,
@@ -55,6 +57,8 @@ class ThrowMsg(str):
     DANGER_ENV = "当前环境存在风险无法进行操作，请切换网络环境后重试"
     SERVER_ERROR = "请求服务器失败，已达最大重试次数"
     SYSTEM_BUSY = "系统繁忙，请稍后再试"
+    # 库洛服务端限流(429)、服务端错误(5xx)或熔断中
+    SERVER_BUSY = "库洛服务器繁忙，请稍后再试"
 
 
 class RespCode(IntEnum):
@@ -104,6 +108,36 @@ def check_send_master_info(code: int, msg: str, data: Optional[T] = None) -> boo
     return isinstance(msg, str) and msg != ""
 
 
+class KuroEnvelope(Struct):
+    """库洛接口响应外层结构，data 多为 json 字符串"""
+
+    code: int = 0
+    msg: str = ""
+    data: Any = None
+
+
+_envelope_decoder = msgjson.Decoder(KuroEnvelope)
+
+
+def decode_kuro_response(body: bytes) -> Any:
+    """解析库洛接口响应，data 为 json 字符串时一并解码
+
+    外层结构不符合时退回通用解码，不是 json 时抛出 DecodeError
+    """
+    try:
+        env = _envelope_decoder.decode(body)
+        raw_data: Any = {"code": env.code, "msg": env.msg, "data": env.data}
+    except ValidationError:
+        raw_data = msgjson.decode(body)
+
+    if isinstance(raw_data, dict) and isinstance(raw_data.get("data"), str):
+        try:
+            raw_data["data"] = msgjson.decode(raw_data["data"])
+        except DecodeError:
+            pass
+    return raw_data
+
+
 class KuroApiResp(BaseModel, Generic[T]):
     model_config = ConfigDict(extra="ignore")
 
@@ -139,7 +173,11 @@ class KuroApiResp(BaseModel, Generic[T]):
     def is_bat_token_invalid(self) -> bool:
         if self.code == RespCode.BAT_TOKEN_INVALID.value:
             return True
-        return self.msg in ("数据令牌已失效")
+        return self.msg in ("数据令牌已失效",)
+
+    @property
+    def is_server_busy(self) -> bool:
+        return self.msg == ThrowMsg.SERVER_BUSY
 
     @model_validator(mode="after")
     def _post_validate(self) -> "KuroApiResp[T]":
@@ -1,24 +1,30 @@
 import json
 import random
 import asyncio
-import inspect
 from typing import Any, Dict, List, Union, Literal, Mapping, Optional
 
 import aiohttp
 from gsuid_core.logger import logger
-from aiohttp import ClientTimeout, ContentTypeError
+from msgspec import DecodeError
+from aiohttp import ClientTimeout
 
 from .captcha import get_solver
 from ..util import timed_async_cache
+from ..cache import cookie_validity_cache, persistent_async_cache
 from .captcha.base import CaptchaResult
+from .cookie_pool import public_cookie_pool
+from .rate_limit import KuroThrottleError, kuro_rate_limiter
+from .single_flight import single_flight, make_request_key
 from ..error_reply import WAVES_CODE_999
 from .captcha.errors import CaptchaError
 from ...utils.database.models import WavesUser
 from ...wutheringwaves_config import WutheringWavesConfig
 from .request_util import (
     KURO_VERSION,
+    ThrowMsg,
     KuroApiResp,
     get_base_header,
+    decode_kuro_response,
     get_community_header,
 )
 from .api import (
@@ -61,20 +67,26 @@ from .api import (
     ONLINE_LIST_PHANTOM,
     ROLE_CULTIVATE_STATUS,
     WIKI_ENTRY_DETAIL_URL,
+    SINGLE_FLIGHT_URLS,
     CALCULATOR_REFRESH_DATA_URL,
     get_local_proxy_url,
-    get_need_proxy_func,
+    get_need_proxy_urls,
 )
 
 
+def invalidate_cookie_cache(header: Mapping[str, str]):
+    """请求返回token失效时，清除对应cookie的验证缓存"""
+    if header.get("token"):
+        cookie_validity_cache.invalidate(cookie=header["token"])
+    elif header.get("b-at"):
+        cookie_validity_cache.invalidate(bat=header["b-at"])
+
+
 class WavesApi:
     ssl_verify = True
     ann_map = {}
-    ann_list_data = []
     event_type = {"2": "资讯", "3": "公告", "1": "活动"}
 
-    entry_detail_map = {}
-
     _sessions: Dict[str, aiohttp.ClientSession] = {}
     _session_lock = asyncio.Lock()
 
@@ -171,6 +183,9 @@ class WavesApi:
         if waves_user.status == "无效":
             return ""
 
+        if cookie_validity_cache.is_valid(uid, waves_user.cookie):
+            return waves_user.cookie
+
         from ..waves_api import waves_api
 
         if not waves_api.is_net(uid):
@@ -228,46 +243,20 @@ class WavesApi:
                     logger.warning(f"[國際服] UID {uid} 驗證失敗但可能是網絡問題: {e}")
                     return ""
 
+        cookie_validity_cache.set_valid(
+            uid,
+            waves_user.cookie,
+            waves_user.bat or "",
+            WutheringWavesConfig.get_config("CookieValidCacheTime").data,
+        )
         return waves_user.cookie
 
     async def get_waves_random_cookie(self, uid: str, user_id: str) -> Optional[str]:
         if WutheringWavesConfig.get_config("WavesOnlySelfCk").data:
             return None
 
-        # 公共ck 随机一个
-        user_list = await WavesUser.get_waves_all_user()
-        random.shuffle(user_list)
-        ck_list = []
-        times = 1
-        for user in user_list:
-            if not await WavesUser.cookie_validate(user.uid):
-                continue
-
-            from ..waves_api import waves_api
-
-            if waves_api.is_net(user.uid):
-                continue
-
-            data = await self.login_log(user.uid, user.cookie)
-            if not data.success:
-                await data.mark_cookie_invalid(user.uid, user.cookie)
-                continue
-
-            data = await self.refresh_data(user.uid, user.cookie)
-            if not data.success:
-                await data.mark_cookie_invalid(user.uid, user.cookie)
-
-                if times <= 0:
-                    break
-
-                times -= 1
-                continue
-
-            ck_list.append(user.cookie)
-            break
-
-        if len(ck_list) > 0:
-            return random.choices(ck_list, k=1)[0]
+        # 公共ck 从预先验证的ck池中借出
+        return await public_cookie_pool.get_cookie(self)
 
     async def get_kuro_role_list(self, token: str, did: str):
         header = await get_base_header()
@@ -361,12 +350,24 @@ class WavesApi:
         }
         return await self._waves_request(ROLE_DATA_URL, "POST", header, data=data)
 
+    @persistent_async_cache(
+        3600,
+        lambda x: x.success,
+        dumps=lambda x: x.model_dump(),
+        loads=KuroApiResp.model_validate,
+    )
     async def get_tree(self):
         header = await get_community_header()
         header.update({"wiki_type": "9"})
         data = {"devcode": ""}
         return await self._waves_request(WIKI_TREE_URL, "POST", header, data=data)
 
+    @persistent_async_cache(
+        3600,
+        lambda x: x.success,
+        dumps=lambda x: x.model_dump(),
+        loads=KuroApiResp.model_validate,
+    )
     async def get_wiki(self, catalogueId: str):
         header = await get_community_header()
         header.update({"wiki_type": "9"})
@@ -557,10 +558,6 @@ class WavesApi:
             CALCULATOR_REFRESH_DATA_URL, "POST", header, data=data
         )
 
-    @timed_async_cache(
-        86400,
-        lambda x: x.success and isinstance(x.data, (dict, list)),
-    )
     async def get_online_list_role(self, token: str):
         """所有的角色列表"""
         header = await get_base_header()
@@ -568,10 +565,6 @@ class WavesApi:
         data = {}
         return await self._waves_request(ONLINE_LIST_ROLE, "POST", header, data=data)
 
-    @timed_async_cache(
-        86400,
-        lambda x: x.success and isinstance(x.data, (dict, list)),
-    )
     async def get_online_list_weapon(self, token: str):
         """所有的武器列表"""
         header = await get_base_header()
@@ -582,6 +575,7 @@ class WavesApi:
     @timed_async_cache(
         86400,
         lambda x: x.success and isinstance(x.data, (dict, list)),
+        keys=[],
     )
     async def get_online_list_phantom(self, token: str):
         """所有的声骸列表"""
@@ -736,21 +730,26 @@ class WavesApi:
             return raw_data["data"]["postDetail"]
         return {}
 
-    async def get_ann_list(self, is_cache: bool = False):
-        """获取公告列表"""
-        if is_cache and self.ann_list_data:
-            return self.ann_list_data
-
-        self.ann_list_data = []
+    @persistent_async_cache(300, lambda x: bool(x))
+    async def fetch_ann_list(self):
+        """获取所有类型的公告列表"""
+        ann_list = []
         for _event in self.event_type.keys():
             res = await self.get_ann_list_by_type(eventType=_event, pageSize=5)
             if res.success:
                 raw_data = res.model_dump()
                 value = [{**x, "id": int(x["id"])} for x in raw_data["data"]["list"]]
-                self.ann_list_data.extend(value)
+                ann_list.extend(value)
 
-        return self.ann_list_data
+        return ann_list
+
+    async def get_ann_list(self, is_cache: bool = False):
+        """获取公告列表，is_cache为False时跳过缓存"""
+        if is_cache:
+            return await self.fetch_ann_list()
+        return await self.fetch_ann_list.refresh(self)
 
+    @persistent_async_cache(1800, lambda x: bool(x))
     async def get_wiki_home(self):
         """获取wiki首页"""
         headers = await get_community_header()
@@ -760,11 +759,9 @@ class WavesApi:
             return res.model_dump()
         return {}
 
+    @persistent_async_cache(86400, lambda x: bool(x))
     async def get_entry_detail(self, entry_id: str):
         """获取entry详情"""
-        if entry_id in self.entry_detail_map:
-            return self.entry_detail_map[entry_id]
-
         headers = await get_community_header()
         headers.update({"wiki_type": "9"})
         data = {"id": entry_id}
@@ -772,9 +769,7 @@ class WavesApi:
             WIKI_ENTRY_DETAIL_URL, "POST", headers, data=data
         )
         if res.success:
-            raw_data = res.model_dump()
-            self.entry_detail_map[entry_id] = raw_data
-            return raw_data
+            return res.model_dump()
         return {}
 
     async def login(self, mobile: Union[int, str], code: str, did: str):
@@ -806,8 +801,40 @@ class WavesApi:
         if header is None:
             header = await get_base_header()
 
-        proxy_func = get_need_proxy_func()
-        if inspect.stack()[1].function in proxy_func or "all" in proxy_func:
+        ttl = SINGLE_FLIGHT_URLS.get(url)
+        if ttl is not None:
+            key = make_request_key(url, method, header, params, json_data, data)
+            return await single_flight.do(
+                key,
+                ttl,
+                lambda: self._send_request(
+                    url,
+                    method,
+                    header,
+                    params,
+                    json_data,
+                    data,
+                    max_retries,
+                    retry_delay,
+                ),
+            )
+        return await self._send_request(
+            url, method, header, params, json_data, data, max_retries, retry_delay
+        )
+
+    async def _send_request(
+        self,
+        url: str,
+        method: Literal["GET", "POST"],
+        header: Mapping[str, str],
+        params: Optional[Dict[str, Any]],
+        json_data: Optional[Dict[str, Any]],
+        data: Optional[Dict[str, Any]],
+        max_retries: int,
+        retry_delay: float,
+    ) -> KuroApiResp[Union[str, Dict[str, Any], List[Any]]]:
+        proxy_all, proxy_urls = get_need_proxy_urls()
+        if proxy_all or url in proxy_urls:
             proxy_url = get_local_proxy_url()
         else:
             proxy_url = None
@@ -825,20 +852,25 @@ class WavesApi:
                 proxy=proxy_url,
                 timeout=ClientTimeout(total=10),
             ) as resp:
+                if resp.status == 429 or resp.status >= 500:
+                    raise KuroThrottleError(resp.status)
+                body = await resp.read()
                 try:
-                    raw_data = await resp.json()
-                except ContentTypeError:
-                    _raw_data = await resp.text()
-                    raw_data = {"code": WAVES_CODE_999, "data": _raw_data}
-
-                if isinstance(raw_data, dict):
-                    try:
-                        raw_data["data"] = json.loads(raw_data.get("data", ""))
-                    except Exception:
-                        pass
-
-                logger.debug(
-                    f"url:[{url}] params:[{params}] headers:[{header}] data:[{req_data}] raw_data:{raw_data}"
+                    raw_data = decode_kuro_response(body)
+                except DecodeError:
+                    raw_data = {
+                        "code": WAVES_CODE_999,
+                        "data": body.decode("utf-8", "replace"),
+                    }
+
+                # 仅在输出 debug 日志时才格式化响应内容
+                logger.opt(lazy=True).debug(
+                    "url:[{}] params:[{}] headers:[{}] data:[{}] raw_data:{}",
+                    lambda: url,
+                    lambda: params,
+                    lambda: header,
+                    lambda: req_data,
+                    lambda: raw_data,
                 )
                 # 统一解析为 KuroApiResp
                 return KuroApiResp[Any].model_validate(raw_data)
@@ -854,14 +886,24 @@ class WavesApi:
 
             return {"code": WAVES_CODE_999, "data": "验证码破解失败"}
 
+        limiter = kuro_rate_limiter.get(url)
+        throttled = False
         for attempt in range(max_retries):
+            # 熔断中直接失败
+            if not limiter.allow():
+                return KuroApiResp[Any].err(ThrowMsg.SERVER_BUSY, code=WAVES_CODE_999)
+            throttled = False
             try:
                 client = await self.get_session(proxy=proxy_url)
                 if not client:
                     logger.warning(f"url:[{url}] 获取session失败")
                     continue
 
+                await limiter.acquire()
                 response = await do_request(data, client)
+                limiter.on_success()
+                if response.is_token_invalid or response.is_bat_token_invalid:
+                    invalidate_cookie_cache(header)
 
                 res_data = response.data or {}
                 if (
@@ -883,15 +925,25 @@ class WavesApi:
 
                 return response
 
+            except KuroThrottleError as e:
+                throttled = True
+                limiter.on_throttle()
+                logger.warning(f"url:[{url}] 服务器限流或异常({e}), 尝试次数 {attempt + 1}")
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                limiter.on_failure()
+                logger.warning(f"url:[{url}] 连接失败, 尝试次数 {attempt + 1}", e)
             except aiohttp.ClientError as e:
                 logger.warning(f"url:[{url}] 网络请求失败, 尝试次数 {attempt + 1}", e)
-                if attempt < max_retries - 1:
-                    await asyncio.sleep(retry_delay)
             except Exception as e:
                 logger.warning(f"url:[{url}] 发生未知错误, 尝试次数 {attempt + 1}", e)
-                if attempt < max_retries - 1:
-                    await asyncio.sleep(retry_delay)
+            finally:
+                limiter.release()
+
+            if attempt < max_retries - 1:
+                # 指数退避并加入随机抖动，避免并发请求同时重试
+                await asyncio.sleep(retry_delay * 2**attempt * random.uniform(0.5, 1.5))
 
         return KuroApiResp[Any].err(
-            "请求服务器失败，已达最大重试次数", code=WAVES_CODE_999
+            ThrowMsg.SERVER_BUSY if throttled else ThrowMsg.SERVER_ERROR,
+            code=WAVES_CODE_999,
         )
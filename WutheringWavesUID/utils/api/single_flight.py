@@ -0,0 +1,77 @@
+import json
+import time
+import asyncio
+from typing import Any, Dict, Tuple, Mapping, Callable, Optional, Awaitable
+
+from .request_util import KuroApiResp
+
+# 结果缓存超过该数量时清理过期数据
+MAX_RESULTS = 1000
+
+
+def make_request_key(
+    url: str,
+    method: str,
+    header: Mapping[str, str],
+    params: Optional[Dict[str, Any]],
+    json_data: Optional[Dict[str, Any]],
+    data: Optional[Dict[str, Any]],
+) -> Tuple:
+    body = json.dumps([params, json_data, data], sort_keys=True, default=str)
+    return (
+        method,
+        url,
+        body,
+        header.get("token", ""),
+        header.get("b-at", ""),
+        header.get("did", ""),
+    )
+
+
+class SingleFlight:
+    """相同的并发请求共享同一次执行，可选短时间缓存成功结果
+
+    返回给共享者的是深拷贝，避免调用方修改数据互相影响
+    """
+
+    def __init__(self):
+        self.inflight: Dict[Tuple, asyncio.Future] = {}
+        self.results: Dict[Tuple, Tuple[float, KuroApiResp]] = {}
+        self.shared = 0
+
+    def _on_done(self, key: Tuple, ttl: float, future: asyncio.Future):
+        self.inflight.pop(key, None)
+        if future.cancelled() or future.exception() or ttl <= 0:
+            return
+        res: KuroApiResp = future.result()
+        if not res.success:
+            return
+        now = time.monotonic()
+        if len(self.results) >= MAX_RESULTS:
+            self.results = {k: v for k, v in self.results.items() if v[0] > now}
+        self.results[key] = (now + ttl, res.model_copy(deep=True))
+
+    async def do(
+        self,
+        key: Tuple,
+        ttl: float,
+        func: Callable[[], Awaitable[KuroApiResp]],
+    ) -> KuroApiResp:
+        item = self.results.get(key)
+        if item and item[0] > time.monotonic():
+            self.shared += 1
+            return item[1].model_copy(deep=True)
+
+        future = self.inflight.get(key)
+        if future is not None:
+            self.shared += 1
+            res = await asyncio.shield(future)
+            return res.model_copy(deep=True)
+
+        future = asyncio.ensure_future(func())
+        future.add_done_callback(lambda f: self._on_done(key, ttl, f))
+        self.inflight[key] = future
+        return await asyncio.shield(future)
+
+
+single_flight = SingleFlight()
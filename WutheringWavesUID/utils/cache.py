@@ -1,5 +1,17 @@
+import json
 import time
+import asyncio
+import inspect
+import sqlite3
+import threading
+from pathlib import Path
+from functools import wraps
 from collections import OrderedDict
+from typing import Any, Dict, Tuple, Callable, Optional
+
+from gsuid_core.logger import logger
+
+from .resource.RESOURCE_PATH import API_CACHE_PATH
 
 
 class TimedCache:
@@ -37,3 +49,202 @@ class TimedCache:
                 keys_to_delete.append(key)
         for key in keys_to_delete:
             del self.cache[key]
+
+
+class CookieValidityCache:
+    """验证通过的cookie，有效期内跳过登录校验"""
+
+    def __init__(self, maxsize: int = 10000):
+        self.maxsize = maxsize
+        # (uid, cookie) -> (过期时间, bat)
+        self.valid: Dict[Tuple[str, str], Tuple[float, str]] = {}
+        self.saved = 0
+        self.validations = 0
+
+    def is_valid(self, uid: str, cookie: str) -> bool:
+        item = self.valid.get((uid, cookie))
+        if item and item[0] > time.time():
+            self.saved += 1
+            return True
+        self.validations += 1
+        return False
+
+    def set_valid(self, uid: str, cookie: str, bat: str, ttl: float):
+        if ttl <= 0:
+            return
+        now = time.time()
+        if len(self.valid) >= self.maxsize:
+            self.valid = {k: v for k, v in self.valid.items() if v[0] > now}
+        self.valid[(uid, cookie)] = (now + ttl, bat)
+
+    def invalidate(
+        self,
+        uid: Optional[str] = None,
+        cookie: Optional[str] = None,
+        bat: Optional[str] = None,
+    ):
+        for key, (_, _bat) in list(self.valid.items()):
+            if uid is not None and key[0] != uid:
+                continue
+            if cookie is not None and key[1] != cookie:
+                continue
+            if bat is not None and _bat != bat:
+                continue
+            self.valid.pop(key, None)
+
+
+cookie_validity_cache = CookieValidityCache()
+
+
+class PersistentCache:
+    """sqlite持久化缓存，值为可json序列化的数据
+
+    sqlite读写在线程中执行；内存中按LRU保留最近使用的 maxsize 条
+    """
+
+    def __init__(self, path: Path, maxsize: int = 1024):
+        self.path = path
+        self.maxsize = maxsize
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._memory: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache "
+                "(key TEXT PRIMARY KEY, value TEXT NOT NULL, updated REAL NOT NULL)"
+            )
+            self._conn.commit()
+        return self._conn
+
+    def _remember(self, key: str, item: Tuple[float, str]):
+        with self._lock:
+            self._memory[key] = item
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.maxsize:
+                self._memory.popitem(last=False)
+
+    def _select(self, key: str) -> Optional[Tuple[float, str]]:
+        with self._lock:
+            try:
+                row = (
+                    self._connect()
+                    .execute("SELECT updated, value FROM cache WHERE key = ?", (key,))
+                    .fetchone()
+                )
+            except sqlite3.Error as e:
+                logger.warning(f"[鸣潮] 读取接口缓存失败: {e}")
+                return None
+        return (row[0], row[1]) if row else None
+
+    def _replace(self, key: str, raw: str, updated: float):
+        with self._lock:
+            try:
+                conn = self._connect()
+                conn.execute(
+                    "REPLACE INTO cache (key, value, updated) VALUES (?, ?, ?)",
+                    (key, raw, updated),
+                )
+                conn.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"[鸣潮] 写入接口缓存失败: {e}")
+
+    async def get(self, key: str) -> Optional[Tuple[float, Any]]:
+        """返回(更新时间, 数据)"""
+        with self._lock:
+            item = self._memory.get(key)
+            if item is not None:
+                self._memory.move_to_end(key)
+        if item is None:
+            item = await asyncio.to_thread(self._select, key)
+            if item is None:
+                return None
+            self._remember(key, item)
+        return item[0], json.loads(item[1])
+
+    async def set(self, key: str, value: Any):
+        updated = time.time()
+        raw = json.dumps(value, ensure_ascii=False)
+        self._remember(key, (updated, raw))
+        await asyncio.to_thread(self._replace, key, raw, updated)
+
+
+api_cache = PersistentCache(API_CACHE_PATH)
+
+
+def persistent_async_cache(
+    expiration: float,
+    condition: Callable[[Any], bool] = lambda x: True,
+    dumps: Optional[Callable[[Any], Any]] = None,
+    loads: Optional[Callable[[Any], Any]] = None,
+    max_stale: float = 7 * 86400,
+):
+    """按参数缓存异步函数结果并持久化到磁盘
+
+    过期后max_stale内仍直接返回旧数据，同时后台刷新；请求失败时也返回旧数据。
+    wrapper.refresh 跳过缓存直接请求并更新缓存
+    """
+
+    def decorator(func):
+        sig = inspect.signature(func)
+        params = list(sig.parameters.keys())
+        is_cls_method = params and params[0] in ["self", "cls"]
+        refreshing: Dict[str, asyncio.Task] = {}
+
+        def make_key(args, kwargs) -> str:
+            bound_args = sig.bind(*args, **kwargs)
+            bound_args.apply_defaults()
+            arguments = dict(bound_args.arguments)
+            if is_cls_method:
+                arguments.pop(params[0], None)
+            return f"{func.__qualname__}:" + json.dumps(
+                arguments, sort_keys=True, ensure_ascii=False, default=str
+            )
+
+        def load(raw):
+            return loads(raw) if loads else raw
+
+        async def fetch(key: str, args, kwargs):
+            value = await func(*args, **kwargs)
+            if condition(value):
+                await api_cache.set(key, dumps(value) if dumps else value)
+            return value
+
+        async def background_fetch(key: str, args, kwargs):
+            try:
+                await fetch(key, args, kwargs)
+            except Exception as e:
+                logger.warning(f"[鸣潮] 后台刷新缓存失败 {func.__qualname__}: {e}")
+            finally:
+                refreshing.pop(key, None)
+
+        @wraps(func)
+        async def wrapper(*args, **kwargs):
+            key = make_key(args, kwargs)
+            cached = await api_cache.get(key)
+            if cached is not None:
+                updated, raw = cached
+                age = time.time() - updated
+                if age < expiration:
+                    return load(raw)
+                if age < expiration + max_stale:
+                    if key not in refreshing:
+                        refreshing[key] = asyncio.create_task(
+                            background_fetch(key, args, kwargs)
+                        )
+                    return load(raw)
+
+            value = await fetch(key, args, kwargs)
+            if cached is not None and not condition(value):
+                return load(cached[1])
+            return value
+
+        async def refresh(*args, **kwargs):
+            return await fetch(make_key(args, kwargs), args, kwargs)
+
+        wrapper.refresh = refresh
+        return wrapper
+
+    return decorator
@@ -413,10 +413,11 @@ class WuWaCalc(object):
         # logger.debug(f"面板数据: {card_sort_map}")
         return card_sort_map
 
-    def card_sort_map_to_attribute(self, card_sort_map: Dict):
+    def card_sort_map_to_attribute(self, card_sort_map: Dict, trace: bool = True):
         attr = DamageAttribute(
             enemy_resistance=self.enemy_detail.enemy_resistance / 100,
             enemy_level=self.enemy_detail.enemy_level,
+            trace=trace,
         )
         attr.set_char_atk(card_sort_map["char_atk"])
         attr.set_char_life(card_sort_map["char_life"])
@@ -0,0 +1,133 @@
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, List, Optional, Tuple
+
+from gsuid_core.logger import logger
+
+from .api.model import RoleDetailData
+from ..wutheringwaves_config import WutheringWavesConfig
+from .rank_index import calc_rank_entry, calc_total_score
+
+
+def get_rank_calc_workers() -> int:
+    return WutheringWavesConfig.get_config("RankCalcWorkers").data or 0
+
+
+def _init_worker():
+    """子进程内注册伤害计算"""
+    from .damage.register_char import register_char
+    from .damage.register_echo import register_echo
+    from .damage.register_weapon import register_weapon
+    from .map.damage.register import register_damage, register_rank
+
+    register_weapon()
+    register_echo()
+    register_damage()
+    register_rank()
+    register_char()
+
+
+def _safe_calc_rank_entry(
+    role_detail: RoleDetailData, rankDetail: Optional[Dict] = None
+) -> Tuple[Optional[Dict], str]:
+    """返回 (排行数据, 错误信息)，单个角色出错不影响同批其他角色"""
+    try:
+        return calc_rank_entry(role_detail, rankDetail), ""
+    except Exception as e:
+        return None, str(e)
+
+
+def _calc_rank_entries_worker(roles: List[Dict]) -> List[Tuple[Optional[Dict], str]]:
+    return [_safe_calc_rank_entry(RoleDetailData(**r)) for r in roles]
+
+
+def _calc_total_score_worker(roles: List[Dict]) -> Tuple[float, List[Dict]]:
+    return calc_total_score(RoleDetailData(**r) for r in roles)
+
+
+class CalcPool:
+    """排行计算进程池，worker数为0时在当前进程计算"""
+
+    def __init__(self):
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._workers = 0
+
+    @property
+    def workers(self) -> int:
+        return max(get_rank_calc_workers(), 0)
+
+    def get_executor(self) -> Optional[ProcessPoolExecutor]:
+        workers = self.workers
+        if workers != self._workers:
+            # 已提交的计算在旧进程池中继续完成
+            self.shutdown()
+            self._workers = workers
+        if workers <= 0:
+            return None
+        if self._executor is None:
+            logger.info(f"[鸣潮] 启动排行计算进程池, worker数: {workers}")
+            self._executor = ProcessPoolExecutor(
+                max_workers=workers, initializer=_init_worker
+            )
+        return self._executor
+
+    def shutdown(self, cancel_futures: bool = False):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=cancel_futures)
+            self._executor = None
+
+    async def run(self, func, *args):
+        """在进程池中执行，返回(结果,)；返回None表示需要在当前进程计算"""
+        executor = self.get_executor()
+        if executor is None:
+            return None
+        try:
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(executor, func, *args)
+        except BrokenProcessPool as e:
+            logger.warning(f"[鸣潮] 排行计算进程池异常，回退到当前进程: {e}")
+            self.shutdown()
+            return None
+        return (result,)
+
+
+calc_pool = CalcPool()
+
+
+async def calc_rank_entries_async(
+    role_details: List[RoleDetailData], rankDetail: Optional[Dict] = None
+) -> List[Tuple[Optional[Dict], str]]:
+    """批量计算排行数据，返回与 role_details 对应的 (排行数据, 错误信息)
+
+    按worker数分批，每批一次进程间调用
+    """
+    if not role_details:
+        return []
+    size = -(-len(role_details) // max(calc_pool.workers, 1))
+    chunks = [role_details[i : i + size] for i in range(0, len(role_details), size)]
+    results = await asyncio.gather(
+        *(
+            calc_pool.run(_calc_rank_entries_worker, [r.model_dump() for r in chunk])
+            for chunk in chunks
+        )
+    )
+
+    entries = []
+    for chunk, result in zip(chunks, results):
+        if result is None:
+            entries.extend(_safe_calc_rank_entry(r, rankDetail) for r in chunk)
+        else:
+            entries.extend(result[0])
+    return entries
+
+
+async def calc_total_score_async(
+    role_details: List[RoleDetailData],
+) -> Tuple[float, List[Dict]]:
+    result = await calc_pool.run(
+        _calc_total_score_worker, [r.model_dump() for r in role_details]
+    )
+    if result is None:
+        return calc_total_score(role_details)
+    return result[0]
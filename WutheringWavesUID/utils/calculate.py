@@ -1,6 +1,7 @@
 import math
+import time
 from pathlib import Path
-from typing import Dict, List, Union
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
 
 from msgspec import json as msgjson
 
@@ -8,7 +9,10 @@ from gsuid_core.logger import logger
 
 from ..utils.api.model import Props
 from ..utils.ascension.char import get_char_model
-from .expression_evaluator import find_first_matching_expression
+from .expression_evaluator import (
+    CompiledExpressions,
+    find_first_matching_expression,
+)
 from .image import SPECIAL_GOLD, WAVES_MOLTEN, WAVES_SIERRA, WAVES_VOID
 from .map.calc_score_script import phantom_sub_value_map as ph_sub_map
 from .resource.constant import ATTRIBUTE_NAME_SET, ID_FULL_CHAR_NAME
@@ -19,18 +23,76 @@ score_interval = ["c", "b", "a", "s", "ss", "sss"]
 fix_max_score = 50
 
 
+# 距上次检查文件mtime超过该秒数才重新stat
+CALC_MAP_CHECK_INTERVAL = 10
+
+
+class JsonFileCache:
+    """按文件mtime失效的json解码缓存，不存在的文件缓存为None"""
+
+    def __init__(
+        self,
+        parser: Optional[Callable[[Any], Any]] = None,
+        check_interval: float = CALC_MAP_CHECK_INTERVAL,
+    ):
+        self.parser = parser
+        self.check_interval = check_interval
+        self.cache: Dict[Path, Tuple[float, int, Any]] = {}
+
+    def get(self, path: Path) -> Any:
+        now = time.monotonic()
+        item = self.cache.get(path)
+        if item and now - item[0] < self.check_interval:
+            return item[2]
+
+        try:
+            mtime = path.stat().st_mtime_ns
+        except OSError:
+            mtime, data = 0, None
+        else:
+            if item and item[1] == mtime:
+                data = item[2]
+            else:
+                with open(path, "r", encoding="utf-8") as f:
+                    data = msgjson.decode(f.read())
+                if self.parser:
+                    data = self.parser(data)
+        self.cache[path] = (now, mtime, data)
+        return data
+
+    def clear(self):
+        self.cache.clear()
+
+
+calc_map_cache = JsonFileCache()
+# condition文件缓存编译后的表达式
+condition_cache = JsonFileCache(parser=CompiledExpressions)
+
+
+def preload_calc_map() -> int:
+    """预加载所有角色的condition与calc文件"""
+    for path in MAP_PATH.glob("*/*.json"):
+        if path.name.startswith("condition"):
+            cache = condition_cache
+        else:
+            cache = calc_map_cache
+        try:
+            cache.get(path)
+        except Exception as e:
+            logger.warning(f"[鸣潮] 加载评分文件失败 {path}: {e}")
+    return len(calc_map_cache.cache) + len(condition_cache.cache)
+
+
 def get_calc_map(ctx: Dict, char_name: str, char_id: Union[int, str]):
     if str(char_id) in ID_FULL_CHAR_NAME:
         char_name = ID_FULL_CHAR_NAME[str(char_id)]
     char_path = MAP_PATH / char_name
-    if not char_path.is_dir():
+    if calc_map_cache.get(char_path / "calc.json") is None:
         char_path = MAP_PATH / "default"
 
     def check_conditions(file_name):
-        condition_path = char_path / file_name
-        if condition_path.exists():
-            with open(condition_path, "r", encoding="utf-8") as f:
-                expressions = msgjson.decode(f.read())
+        expressions = condition_cache.get(char_path / file_name)
+        if expressions is not None:
             return find_first_matching_expression(ctx, expressions)
         return None
 
@@ -41,8 +103,10 @@ def get_calc_map(ctx: Dict, char_name: str, char_id: Union[int, str]):
         or "calc.json"
     )
     logger.debug(f"{char_name} [匹配文件]: {char_path.name}/{calc_json_path}")
-    with open(char_path / calc_json_path, "r", encoding="utf-8") as f:
-        return msgjson.decode(f.read())
+    calc_map = calc_map_cache.get(char_path / calc_json_path)
+    if calc_map is None:
+        raise FileNotFoundError(char_path / calc_json_path)
+    return calc_map
 
 
 def calc_phantom_entry(index, prop, cost: int, calc_map, char_attr: str):
@@ -1,29 +1,85 @@
-import json
-from typing import Any, Dict, Generator, Union
+from collections import OrderedDict
+from typing import Any, Dict, Generator, List, Tuple, Union
 
-import aiofiles
+from ..utils.api.model import RoleDetailData
+from ..wutheringwaves_config import WutheringWavesConfig
+from .raw_data_store import raw_data_store
 
-from gsuid_core.logger import logger
 
-from ..utils.api.model import RoleDetailData
-from .resource.RESOURCE_PATH import PLAYER_PATH
+def get_role_detail_cache_size() -> int:
+    return WutheringWavesConfig.get_config("RoleDetailCacheSize").data or 0
+
+
+class RoleDetailCache:
+    """按uid缓存解析后的角色面板，以文件mtime校验，LRU淘汰"""
+
+    def __init__(self):
+        self.cache: OrderedDict[str, Tuple[Tuple[int, int], List[RoleDetailData]]] = (
+            OrderedDict()
+        )
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, uid: str, stamp: Tuple[int, int]) -> Union[List[RoleDetailData], None]:
+        item = self.cache.get(uid)
+        if item is None or item[0] != stamp:
+            self.misses += 1
+            return None
+        self.cache.move_to_end(uid)
+        self.hits += 1
+        return item[1]
+
+    def set(self, uid: str, stamp: Tuple[int, int], value: List[RoleDetailData]):
+        maxsize = get_role_detail_cache_size()
+        if maxsize <= 0:
+            self.cache.clear()
+            return
+        self.cache[uid] = (stamp, value)
+        self.cache.move_to_end(uid)
+        while len(self.cache) > maxsize:
+            self.cache.popitem(last=False)
+
+    def delete(self, uid: str):
+        self.cache.pop(uid, None)
+
+    def clear(self):
+        self.cache.clear()
+
+    @property
+    def size(self) -> int:
+        return len(self.cache)
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+role_detail_cache = RoleDetailCache()
+
+
+def invalidate_role_detail_cache(uid: str):
+    """角色面板写入后调用"""
+    role_detail_cache.delete(uid)
 
 
 async def get_all_role_detail_info_list(
     uid: str,
 ) -> Union[Generator[RoleDetailData, Any, None], None]:
-    path = PLAYER_PATH / uid / "rawData.json"
-    if not path.exists():
-        return None
-    try:
-        async with aiofiles.open(path, mode="r", encoding="utf-8") as f:
-            player_data = json.loads(await f.read())
-    except Exception as e:
-        logger.exception(f"get role detail info failed {path}:", e)
-        path.unlink(missing_ok=True)
+    stat = raw_data_store.stat(uid)
+    if stat is None:
+        role_detail_cache.delete(uid)
         return None
 
-    return iter(RoleDetailData(**r) for r in player_data)
+    stamp = (stat.st_mtime_ns, stat.st_size)
+    cached = role_detail_cache.get(uid, stamp)
+    if cached is not None:
+        return iter(cached)
+
+    player_data = await raw_data_store.read(uid)
+    role_list = [RoleDetailData(**r) for r in player_data.values()]
+    role_detail_cache.set(uid, stamp, role_list)
+    return iter(role_list)
 
 
 async def get_all_role_detail_info(uid: str) -> Union[Dict[str, RoleDetailData], None]:
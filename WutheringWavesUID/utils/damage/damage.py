@@ -92,6 +92,10 @@ class DamageBonusPhantom:
         return res
 
 
+# 不记录效果时仍需保留的标题，这些效果会被 get_effect 读取参与计算
+TRACE_REQUIRED_EFFECTS = {"默认手法"}
+
+
 class DamageAttribute:
     def __init__(
         self,
@@ -131,6 +135,7 @@ class DamageAttribute:
         teammate_char_ids: Optional[List[int]] = None,
         env_spectro=False,
         online_level=1,
+        trace=True,
     ):
         """
         初始化 DamageAttribute 类的实例。
@@ -160,6 +165,7 @@ class DamageAttribute:
         :param echo_id: 声骸技能id
         :param char_attr: 角色属性 ["冷凝", "衍射", "导电", "热熔", "气动", "湮灭"]
         :param sync_strike: 协同攻击
+        :param trace: 是否记录效果明细，排行等只需数值的场景可关闭
         """
         if teammate_char_ids is None:
             teammate_char_ids = []
@@ -230,6 +236,8 @@ class DamageAttribute:
         self.energy_regen = energy_regen
         # 效果
         self.effect = []
+        # 是否记录效果明细
+        self.trace = trace
         # 敌人等级
         self.enemy_level = 0
         # 队友id
@@ -255,7 +263,9 @@ class DamageAttribute:
 
         if enemy_resistance:
             self.add_enemy_resistance(
-                enemy_resistance, "敌人抗性", f"{enemy_resistance:.0%}"
+                enemy_resistance,
+                "敌人抗性",
+                f"{enemy_resistance:.0%}" if trace else "",
             )
         self.set_enemy_level(enemy_level)
 
@@ -307,6 +317,8 @@ class DamageAttribute:
         return self
 
     def add_effect(self, title: str, msg: str):
+        if not self.trace and title not in TRACE_REQUIRED_EFFECTS:
+            return
         effect = WavesEffect.add_effect(title, msg)
         if effect is None:
             return
@@ -320,6 +332,8 @@ class DamageAttribute:
 
     def set_enemy_level(self, enemy_level: int):
         self.enemy_level = enemy_level
+        if not self.trace:
+            return self
 
         title = "敌人等级"
         msg = f"{enemy_level}级"
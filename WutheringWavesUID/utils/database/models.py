@@ -12,6 +12,7 @@ from gsuid_core.utils.database.base_models import (
     Push,
     User,
     BaseModel,
+    BaseIDModel,
     with_session,
 )
 
@@ -22,6 +23,7 @@ exec_list.extend(
         'ALTER TABLE WavesUser ADD COLUMN bbs_sign_switch TEXT DEFAULT "off"',
         'ALTER TABLE WavesUser ADD COLUMN bat TEXT DEFAULT ""',
         'ALTER TABLE WavesUser ADD COLUMN did TEXT DEFAULT ""',
+        'ALTER TABLE WavesUser ADD COLUMN region TEXT DEFAULT ""',
         'ALTER TABLE WavesPush ADD COLUMN push_time_value TEXT DEFAULT ""',
     ]
 )
@@ -30,6 +32,7 @@ T_WavesBind = TypeVar("T_WavesBind", bound="WavesBind")
 T_WavesUser = TypeVar("T_WavesUser", bound="WavesUser")
 T_WavesUserAvatar = TypeVar("T_WavesUserAvatar", bound="WavesUserAvatar")
 T_WavesSimulator = TypeVar("T_WavesSimulator", bound="WavesSimulator")
+T_WavesCharRankIndex = TypeVar("T_WavesCharRankIndex", bound="WavesCharRankIndex")
 
 
 class WavesUserAvatar(BaseModel, table=True):
@@ -125,12 +128,18 @@ class WavesUser(User, table=True):
     bbs_sign_switch: str = Field(default="off", title="自动社区签到")
     bat: str = Field(default="", title="bat")
     did: str = Field(default="", title="did")
+    region: str = Field(default="", title="国际服区域")
 
     @classmethod
     @with_session
     async def mark_cookie_invalid(
         cls: Type[T_WavesUser], session: AsyncSession, uid: str, cookie: str, mark: str
     ):
+        from ..api.cookie_pool import public_cookie_pool
+        from ..cache import cookie_validity_cache
+
+        cookie_validity_cache.invalidate(uid=uid, cookie=cookie)
+        public_cookie_pool.discard(cookie)
         sql = (
             update(cls)
             .where(col(cls.uid) == uid)
@@ -205,6 +214,14 @@ class WavesUser(User, table=True):
         data = result.scalars().all()
         return data[0] if data else None
 
+    @classmethod
+    @with_session
+    async def update_region_by_uid(
+        cls: Type[T_WavesUser], session: AsyncSession, uid: str, region: str
+    ):
+        sql = update(cls).where(col(cls.uid) == uid).values(region=region)
+        await session.execute(sql)
+
     @classmethod
     @with_session
     async def select_data_by_cookie_and_uid(
@@ -430,3 +447,92 @@ class WavesSimulatorAdmin(GsAdminModel):
 
     # 配置管理模型
     model = WavesSimulator
+
+
+class WavesCharRankIndex(BaseIDModel, table=True):
+    """角色排行索引，每个uid每个角色一行，随面板刷新增量更新"""
+
+    __table_args__: Dict[str, Any] = {"extend_existing": True}
+    uid: str = Field(title="鸣潮UID", index=True)
+    role_id: int = Field(title="角色ID", index=True)
+    level: int = Field(default=0, title="角色等级")
+    chain: int = Field(default=0, title="共鸣链")
+    chain_name: str = Field(default="", title="共鸣链名称")
+    score: float = Field(default=0, title="声骸评分")
+    score_bg: str = Field(default="", title="评分背景")
+    expected_damage: str = Field(default="0", title="期望伤害")
+    expected_damage_int: int = Field(default=0, title="期望伤害数值")
+    sonata_name: str = Field(default="", title="合鸣效果")
+    stamp: int = Field(default=0, title="面板文件时间戳")
+    version: str = Field(default="", title="插件版本")
+
+    @classmethod
+    @with_session
+    async def select_by_role_ids(
+        cls: Type[T_WavesCharRankIndex],
+        session: AsyncSession,
+        role_ids: List[int],
+    ) -> List[T_WavesCharRankIndex]:
+        sql = select(cls).where(col(cls.role_id).in_(role_ids))
+        result = await session.execute(sql)
+        return list(result.scalars().all())
+
+    @classmethod
+    @with_session
+    async def select_uid_stamps(
+        cls: Type[T_WavesCharRankIndex],
+        session: AsyncSession,
+    ) -> Dict[str, tuple]:
+        """获取每个uid索引对应的面板文件时间戳与插件版本"""
+        sql = select(cls.uid, cls.stamp, cls.version).distinct()
+        result = await session.execute(sql)
+        return {uid: (stamp, version) for uid, stamp, version in result.all()}
+
+    @classmethod
+    @with_session
+    async def select_uid_stamp(
+        cls: Type[T_WavesCharRankIndex],
+        session: AsyncSession,
+        uid: str,
+    ) -> Optional[tuple]:
+        sql = select(cls.stamp, cls.version).where(col(cls.uid) == uid).limit(1)
+        result = await session.execute(sql)
+        data = result.first()
+        return (data[0], data[1]) if data else None
+
+    @classmethod
+    @with_session
+    async def upsert_uid_index(
+        cls: Type[T_WavesCharRankIndex],
+        session: AsyncSession,
+        uid: str,
+        entries: Dict[int, Dict],
+        stamp: int,
+        version: str,
+        remove_role_ids: Optional[List[int]] = None,
+        full: bool = False,
+    ):
+        """写入`entries`，删除`remove_role_ids`，并把该uid的所有行标记为`stamp`
+
+        `full`为True时先清空该uid的全部索引
+        """
+        if full:
+            await session.execute(delete(cls).where(col(cls.uid) == uid))
+        else:
+            drop_ids = set(entries.keys()) | set(remove_role_ids or [])
+            if drop_ids:
+                await session.execute(
+                    delete(cls).where(
+                        and_(col(cls.uid) == uid, col(cls.role_id).in_(drop_ids))
+                    )
+                )
+        for role_id, entry in entries.items():
+            session.add(
+                cls(uid=uid, role_id=role_id, stamp=stamp, version=version, **entry)
+            )
+        await session.execute(
+            update(cls)
+            .where(col(cls.uid) == uid)
+            .values(stamp=stamp, version=version)
+        )
+        await session.commit()
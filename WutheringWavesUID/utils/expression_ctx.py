@@ -87,7 +87,7 @@ async def get_waves_char_rank(uid, all_role_detail, need_expected_damage=False):
                         calc.phantom_card
                     )
                     calc.damageAttribute = calc.card_sort_map_to_attribute(
-                        calc.role_card
+                        calc.role_card, trace=False
                     )
                     _, expected_damage = rankDetail["func"](
                         calc.damageAttribute, role_detail
@@ -1,24 +1,28 @@
+from typing import Any, Callable, Dict, List, Tuple
+
 from gsuid_core.logger import logger
 
 
+def convert(value):
+    if isinstance(value, str):
+        if "%" in value:
+            value.replace("%", "")
+        try:
+            value = float(value)
+        except ValueError as _:
+            pass
+    elif isinstance(value, list):
+        return [convert(item) for item in value]
+    return value
+
+
 def convert_wrapper(func):
     def wrapper(a, b):
-        def convert(value):
-            if isinstance(value, str):
-                if "%" in value:
-                    value.replace("%", "")
-                try:
-                    value = float(value)
-                except ValueError as _:
-                    pass
-            elif isinstance(value, list):
-                return [convert(item) for item in value]
-            return value
-
         a = convert(a)
         b = convert(b)
         return func(a, b)
 
+    wrapper.__wrapped__ = func
     return wrapper
 
 
@@ -104,7 +108,83 @@ class ExpressionEvaluator:
         return operations[op](self.ctx.get(key), value)
 
 
+COMPARISON_FUNCS = {
+    "=": ExpressionFunc.func_equal,
+    "!=": ExpressionFunc.func_not_equal,
+    "<": ExpressionFunc.func_less_than,
+    ">": ExpressionFunc.func_greater_than,
+    "<=": ExpressionFunc.func_less_than_or_equal,
+    ">=": ExpressionFunc.func_greater_than_or_equal,
+    "in": ExpressionFunc.func_in,
+    "!in": ExpressionFunc.func_not_in,
+}
+
+
+def _raise_on_call(e: Exception) -> Callable[[Dict], Any]:
+    # 编译期的错误推迟到求值时抛出，与解释执行一致
+    def func(ctx):
+        raise e
+
+    return func
+
+
+def _compile_comparison(expression) -> Callable[[Dict], Any]:
+    key, op, value = expression["key"], expression["op"], expression["value"]
+    func = COMPARISON_FUNCS[op]
+    raw = getattr(func, "__wrapped__", None)
+    if raw is None:
+        return lambda ctx: func(ctx.get(key), value)
+
+    # 常量一侧只转换一次
+    value = convert(value)
+    return lambda ctx: raw(convert(ctx.get(key)), value)
+
+
+def compile_expression(expression) -> Callable[[Dict], Any]:
+    """把表达式树编译为闭包，结果与`ExpressionEvaluator.evaluate`一致"""
+    try:
+        op = expression["op"]
+        if op not in {"&&", "||", "!"}:
+            return _compile_comparison(expression)
+
+        childs = [compile_expression(child) for child in expression["sub"]]
+        if op == "&&":
+            return lambda ctx: all(child(ctx) for child in childs)
+        if op == "||":
+            return lambda ctx: any(child(ctx) for child in childs)
+        return lambda ctx: not [child(ctx) for child in childs][0]
+    except Exception as e:
+        return _raise_on_call(e)
+
+
+class CompiledExpressions:
+    """一个condition文件编译后的结果"""
+
+    def __init__(self, expressions):
+        self.items: List[Tuple[Callable[[Dict], Any], Any]] = []
+        self.error = None
+        try:
+            for expr in expressions:
+                self.items.append((compile_expression(expr), expr))
+        except Exception as e:
+            self.error = e
+
+    def find_first_match(self, ctx, default="calc.json"):
+        if self.error is not None:
+            raise self.error
+        for func, expr in self.items:
+            try:
+                if func(ctx):
+                    return expr["choose"]
+            except Exception as e:
+                logger.exception(e)
+        return default
+
+
 def find_first_matching_expression(ctx, expressions, default="calc.json"):
+    if isinstance(expressions, CompiledExpressions):
+        return expressions.find_first_match(ctx, default)
+
     evaluator = ExpressionEvaluator(ctx)
     for expr in expressions:
         try:
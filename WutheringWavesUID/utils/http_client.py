@@ -0,0 +1,141 @@
+import asyncio
+import threading
+from collections import Counter
+from typing import Dict, Optional, Tuple
+
+import httpx
+
+from gsuid_core.logger import logger
+
+from ..wutheringwaves_config import WutheringWavesConfig
+
+try:
+    import h2  # noqa: F401
+
+    HTTP2_ENABLED = True
+except ImportError:
+    HTTP2_ENABLED = False
+
+
+def get_http_limits() -> Tuple[int, int, int]:
+    """(总连接数, 单host连接数, 保持的空闲连接总数)"""
+    total = WutheringWavesConfig.get_config("HttpMaxConnections").data or 100
+    per_host = WutheringWavesConfig.get_config("HttpMaxConnPerHost").data or 10
+    keepalive = WutheringWavesConfig.get_config("HttpMaxKeepalive").data or 20
+    return total, min(per_host, total), min(keepalive, total)
+
+
+class SharedHttpClient:
+    """共享的长连接httpx客户端
+
+    httpx.AsyncClient 不能跨事件循环使用，任务队列运行在独立线程的事件循环中，
+    因此每个事件循环各持有一个客户端
+    """
+
+    def __init__(self, timeout: float = 10):
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._clients: Dict[asyncio.AbstractEventLoop, httpx.AsyncClient] = {}
+        self._host_limits: Dict[
+            Tuple[asyncio.AbstractEventLoop, str], asyncio.Semaphore
+        ] = {}
+        self.created = 0
+        self.requests: Counter = Counter()
+        self.errors: Counter = Counter()
+
+    def get_client(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            client = self._clients.get(loop)
+            if client is None or client.is_closed:
+                self._prune()
+                # 单host并发由信号量限制
+                total, _, keepalive = get_http_limits()
+                client = httpx.AsyncClient(
+                    http2=HTTP2_ENABLED,
+                    timeout=httpx.Timeout(self.timeout),
+                    limits=httpx.Limits(
+                        max_connections=total,
+                        max_keepalive_connections=keepalive,
+                        keepalive_expiry=30,
+                    ),
+                )
+                self._clients[loop] = client
+                self.created += 1
+            return client
+
+    def _prune(self):
+        """移除已关闭事件循环的客户端与信号量，需持有锁"""
+        for loop in [i for i in self._clients if i.is_closed()]:
+            del self._clients[loop]
+        for key in [i for i in self._host_limits if i[0].is_closed()]:
+            del self._host_limits[key]
+
+    def _get_host_limit(self, host: str) -> asyncio.Semaphore:
+        key = (asyncio.get_running_loop(), host)
+        with self._lock:
+            sem = self._host_limits.get(key)
+            if sem is None:
+                sem = asyncio.Semaphore(get_http_limits()[1])
+                self._host_limits[key] = sem
+            return sem
+
+    async def request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        client = self.get_client()
+        host = httpx.URL(url).host
+        self.requests[host] += 1
+        async with self._get_host_limit(host):
+            try:
+                return await client.request(method, url, **kwargs)
+            except Exception:
+                self.errors[host] += 1
+                raise
+
+    async def get(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("POST", url, **kwargs)
+
+    async def aclose_current(self):
+        """关闭当前事件循环的客户端，在事件循环结束前调用"""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            client = self._clients.pop(loop, None)
+            for key in [i for i in self._host_limits if i[0] is loop]:
+                del self._host_limits[key]
+        if client is not None:
+            await client.aclose()
+
+    async def aclose(self):
+        """关闭所有事件循环下的客户端"""
+        current: Optional[asyncio.AbstractEventLoop] = None
+        try:
+            current = asyncio.get_running_loop()
+        except RuntimeError:
+            pass
+
+        with self._lock:
+            clients = list(self._clients.items())
+            self._clients.clear()
+            self._host_limits.clear()
+
+        for loop, client in clients:
+            try:
+                if loop is current:
+                    await client.aclose()
+                elif loop.is_running() and not loop.is_closed():
+                    future = asyncio.run_coroutine_threadsafe(client.aclose(), loop)
+                    await asyncio.wrap_future(future)
+            except Exception as e:
+                logger.warning(f"[鸣潮] 关闭HTTP客户端失败: {e}")
+
+    def get_metrics(self) -> Dict:
+        return {
+            "created": self.created,
+            "requests": dict(self.requests),
+            "errors": dict(self.errors),
+        }
+
+
+http_client = SharedHttpClient()
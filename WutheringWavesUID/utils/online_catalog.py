@@ -0,0 +1,85 @@
+import time
+import asyncio
+from typing import Any, Dict, Union, Generic, TypeVar, Callable, Optional, Awaitable
+
+from gsuid_core.logger import logger
+
+from .waves_api import waves_api
+from .api.request_util import KuroApiResp
+from .api.model import OnlineRole, OnlineWeapon, OnlineRoleList, OnlineWeaponList
+
+T = TypeVar("T")
+
+# 图鉴刷新间隔(秒)
+CATALOG_EXPIRATION = 3600
+# 刷新失败后重试间隔(秒)
+CATALOG_RETRY = 60
+
+
+class OnlineCatalog(Generic[T]):
+    """所有用户共享的游戏图鉴(角色/武器列表)
+
+    图鉴与用户无关，解析后的结果常驻内存；过期后先返回旧数据并在后台刷新，
+    内容变化时版本号加一
+    """
+
+    def __init__(
+        self,
+        name: str,
+        fetch: Callable[[str], Awaitable[KuroApiResp]],
+        parse: Callable[[Any], Dict[str, T]],
+        expiration: float = CATALOG_EXPIRATION,
+    ):
+        self.name = name
+        self.fetch = fetch
+        self.parse = parse
+        self.expiration = expiration
+        self.data: Optional[Dict[str, T]] = None
+        self.version = 0
+        self.updated = 0.0
+        self._raw: Any = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def _refresh(self, token: str) -> Union[Dict[str, T], str]:
+        try:
+            resp = await self.fetch(token)
+            if not resp.success or not isinstance(resp.data, list):
+                msg = resp.throw_msg()
+            else:
+                if resp.data != self._raw:
+                    self.data = self.parse(resp.data)
+                    self._raw = resp.data
+                    self.version += 1
+                self.updated = time.time()
+                return self.data  # type: ignore
+        except Exception as e:
+            logger.warning(f"[鸣潮] 刷新{self.name}失败: {e}")
+            msg = f"获取{self.name}失败"
+        # 失败后间隔一段时间再重试
+        self.updated = time.time() - self.expiration + CATALOG_RETRY
+        return self.data if self.data is not None else msg
+
+    def _start(self, token: str) -> asyncio.Task:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._refresh(token))
+        return self._task
+
+    async def get(self, token: str) -> Union[Dict[str, T], str]:
+        """返回 id -> 图鉴条目，获取失败时返回错误信息"""
+        if self.data is not None:
+            if time.time() - self.updated >= self.expiration:
+                self._start(token)
+            return self.data
+        return await asyncio.shield(self._start(token))
+
+
+online_role_catalog: OnlineCatalog[OnlineRole] = OnlineCatalog(
+    "角色图鉴",
+    waves_api.get_online_list_role,
+    lambda data: {str(i.roleId): i for i in OnlineRoleList.model_validate(data)},
+)
+online_weapon_catalog: OnlineCatalog[OnlineWeapon] = OnlineCatalog(
+    "武器图鉴",
+    waves_api.get_online_list_weapon,
+    lambda data: {str(i.weaponId): i for i in OnlineWeaponList.model_validate(data)},
+)
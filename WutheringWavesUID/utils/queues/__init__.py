@@ -9,11 +9,12 @@ from ..api.wwapi import (
     UPLOAD_SLASH_RECORD_URL,
     UPLOAD_URL,
 )
+from ..http_client import http_client
 from .const import QUEUE_ABYSS_RECORD, QUEUE_SCORE_RANK, QUEUE_SLASH_RECORD
 from .queues import register_handler, start_dispatcher
 
 
-async def send_score_rank(item: Any):
+async def upload_item(url: str, item: Any, name: str):
     if not item:
         return
     if not isinstance(item, dict):
@@ -25,85 +26,64 @@ async def send_score_rank(item: Any):
     if not WavesToken:
         return
 
-    async with httpx.AsyncClient() as client:
-        res = None
-        try:
-            res = await client.post(
-                UPLOAD_URL,
-                json=item,
-                headers={
-                    "Content-Type": "application/json",
-                    "Authorization": f"Bearer {WavesToken}",
-                },
-                timeout=httpx.Timeout(10),
-            )
-            logger.info(f"上传面板结果: {res.status_code} - {res.text}")
-        except Exception as e:
-            logger.exception(f"上传面板失败: {res.text if res else ''} {e}")
-
+    res = await http_client.post(
+        url,
+        json=item,
+        headers={
+            "Content-Type": "application/json",
+            "Authorization": f"Bearer {WavesToken}",
+        },
+        timeout=httpx.Timeout(10),
+    )
+    logger.info(f"上传{name}结果: {res.status_code} - {res.text}")
+    # 服务端异常或限流时抛出，由任务分发器重试
+    if res.status_code == 429 or res.status_code >= 500:
+        res.raise_for_status()
 
-async def send_abyss_record(item: Any):
-    if not item:
-        return
-    if not isinstance(item, dict):
-        return
-    from ...wutheringwaves_config import WutheringWavesConfig
 
-    WavesToken = WutheringWavesConfig.get_config("WavesToken").data
+async def send_score_rank(item: Any):
+    await upload_item(UPLOAD_URL, item, "面板")
 
-    if not WavesToken:
-        return
 
-    async with httpx.AsyncClient() as client:
-        res = None
-        try:
-            res = await client.post(
-                UPLOAD_ABYSS_RECORD_URL,
-                json=item,
-                headers={
-                    "Content-Type": "application/json",
-                    "Authorization": f"Bearer {WavesToken}",
-                },
-                timeout=httpx.Timeout(10),
-            )
-            logger.info(f"上传深渊结果: {res.status_code} - {res.text}")
-        except Exception as e:
-            logger.exception(f"上传深渊失败: {res.text if res else ''} {e}")
+async def send_abyss_record(item: Any):
+    await upload_item(UPLOAD_ABYSS_RECORD_URL, item, "深渊")
 
 
 async def send_slash_record(item: Any):
-    if not item:
-        return
-    if not isinstance(item, dict):
-        return
-    from ...wutheringwaves_config import WutheringWavesConfig
+    await upload_item(UPLOAD_SLASH_RECORD_URL, item, "冥海")
 
-    WavesToken = WutheringWavesConfig.get_config("WavesToken").data
 
-    if not WavesToken:
-        return
+def score_rank_key(item: Any):
+    """同一用户只上传最新面板，单角色刷新按角色区分"""
+    if not isinstance(item, dict):
+        return None
+    waves_id = item.get("waves_id")
+    if not waves_id:
+        return None
+    if item.get("single_refresh"):
+        char_ids = tuple(
+            sorted(str(c.get("char_id", "")) for c in item.get("char_info", []))
+        )
+        return (waves_id, char_ids)
+    return waves_id
+
+
+def abyss_record_key(item: Any):
+    if not isinstance(item, dict):
+        return None
+    return item.get("waves_id")
+
 
-    async with httpx.AsyncClient() as client:
-        res = None
-        try:
-            res = await client.post(
-                UPLOAD_SLASH_RECORD_URL,
-                json=item,
-                headers={
-                    "Content-Type": "application/json",
-                    "Authorization": f"Bearer {WavesToken}",
-                },
-                timeout=httpx.Timeout(10),
-            )
-            logger.info(f"上传冥海结果: {res.status_code} - {res.text}")
-        except Exception as e:
-            logger.exception(f"上传冥海失败: {res.text if res else ''} {e}")
+def slash_record_key(item: Any):
+    if not isinstance(item, dict) or not item.get("wavesId"):
+        return None
+    return (item["wavesId"], item.get("challengeId"))
 
 
 def init_queues():
     # 注册处理函数
-    register_handler(QUEUE_SCORE_RANK, send_score_rank)
-    register_handler(QUEUE_ABYSS_RECORD, send_abyss_record)
-    register_handler(QUEUE_SLASH_RECORD, send_slash_record)
+    register_handler(QUEUE_SCORE_RANK, send_score_rank, score_rank_key)
+    register_handler(QUEUE_ABYSS_RECORD, send_abyss_record, abyss_record_key)
+    register_handler(QUEUE_SLASH_RECORD, send_slash_record, slash_record_key)
     # 启动任务分发器
     start_dispatcher(daemon=True)
@@ -1,77 +1,275 @@
 import asyncio
+import itertools
+import json
+import random
 import threading
-from typing import Any, Callable, Coroutine, Dict, Union
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Coroutine, Dict, Hashable, Optional, Union
 
 from gsuid_core.logger import logger
 
+from ..resource.RESOURCE_PATH import QUEUE_BACKLOG_PATH
+
+# 重试退避基数(秒)
+RETRY_BASE_DELAY = 2
+
+
+def get_queue_config():
+    from ...wutheringwaves_config import WutheringWavesConfig
+
+    workers = WutheringWavesConfig.get_config("UploadQueueWorkers").data or 1
+    max_size = WutheringWavesConfig.get_config("UploadQueueMaxSize").data or 1
+    retry = WutheringWavesConfig.get_config("UploadRetryTimes").data or 0
+    return max(workers, 1), max(max_size, 1), max(retry, 0)
+
 
 class TaskDispatcher:
+    """任务分发器
+
+    在独立线程的事件循环中运行，固定数量的worker消费有界队列；
+    相同合并key的任务只保留最新一条，超出队列上限或关闭时未处理的任务写入磁盘，
+    下次空闲或重启后再继续处理。
+
+    每个任务带递增序号(跨重启递增)，合并时同样比较磁盘中的任务:
+    新任务入队时磁盘中相同key的旧任务作废，读回磁盘任务时跳过作废或旧于队列中的任务
+    """
 
     def __init__(self):
-        self.queue = asyncio.Queue()
         self.running = False
         self.handlers: Dict[str, Callable] = {}
+        self.key_funcs: Dict[str, Callable[[Any], Optional[Hashable]]] = {}
+        self.pending: OrderedDict = OrderedDict()
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self._ready = threading.Event()
+        self._stopped = threading.Event()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._stop: Optional[asyncio.Event] = None
+        self._seq = itertools.count()
+        self._last_seq = 0
+        # 合并key -> 磁盘中该key最新任务的序号
+        self.backlog_keys: Dict[Hashable, int] = {}
+        # 合并key -> 磁盘中序号不大于该值的任务已作废
+        self.superseded: Dict[Hashable, int] = {}
+        self.spilled = 0
 
     def register_handler(
         self,
         task_type: str,
         handler: Callable[[Any], Union[Any, Coroutine[Any, Any, Any]]],
+        key: Optional[Callable[[Any], Optional[Hashable]]] = None,
     ) -> None:
         self.handlers[task_type] = handler
+        if key:
+            self.key_funcs[task_type] = key
         logger.info(f"注册任务处理器: {task_type}")
 
     async def dispatch(self, task_type: str, data: Any) -> None:
-        if not self.running:
+        if not self.running or self.loop is None:
             logger.warning("任务分发器未启动或已关闭")
             return
         if task_type not in self.handlers:
             return
 
-        await self.queue.put((task_type, data))
+        self.loop.call_soon_threadsafe(self._enqueue, task_type, data)
 
-    async def _process(self) -> None:
-        while True:
+    def _get_key(self, task_type: str, data: Any) -> Hashable:
+        key_func = self.key_funcs.get(task_type)
+        key = None
+        if key_func:
             try:
-                # 如果分发器已关闭，退出循环
-                if not self.running:
-                    break
+                key = key_func(data)
+            except Exception:
+                key = None
+        if key is None:
+            # 不合并的任务使用递增序号，与合并key区分
+            return (task_type, None, next(self._seq))
+        return (task_type, key)
+
+    def _next_seq(self) -> int:
+        self._last_seq = max(time.time_ns(), self._last_seq + 1)
+        return self._last_seq
 
-                # 获取队列任务
-                task_type, data = await asyncio.wait_for(self.queue.get(), timeout=3.0)
+    def _enqueue(self, task_type: str, data: Any, seq: Optional[int] = None) -> None:
+        key = self._get_key(task_type, data)
+        if seq is None:
+            seq = self._next_seq()
+        if key in self.pending and self.pending[key][2] > seq:
+            # 队列中已有更新的数据
+            return
+        if self.backlog_keys.get(key, seq) < seq:
+            # 磁盘中的旧数据作废
+            self.superseded[key] = self.backlog_keys.pop(key)
+
+        _, max_size, _ = get_queue_config()
+        if key in self.pending:
+            # 合并: 丢弃旧数据，新数据排到队尾
+            del self.pending[key]
+        elif len(self.pending) >= max_size:
+            self._spill([(task_type, data, seq)])
+            return
+        self.pending[key] = (task_type, data, seq)
+        if self._wakeup:
+            self._wakeup.set()
 
-                # 处理任务
-                handler = self.handlers.get(task_type)
-                if handler:
-                    # 创建异步任务
-                    asyncio.create_task(self._run_task(handler, data, task_type))
+    def _spill(self, items) -> None:
+        try:
+            with open(QUEUE_BACKLOG_PATH, "a", encoding="utf-8") as f:
+                for task_type, data, seq in items:
+                    f.write(
+                        json.dumps(
+                            {"type": task_type, "data": data, "seq": seq},
+                            ensure_ascii=False,
+                        )
+                        + "\n"
+                    )
+                    key = self._get_key(task_type, data)
+                    if len(key) == 2:
+                        self.backlog_keys[key] = max(
+                            seq, self.backlog_keys.get(key, 0)
+                        )
+            self.spilled += len(items)
+        except Exception as e:
+            logger.exception(f"任务写入磁盘失败: {e}")
 
-                # 标记任务完成
-                self.queue.task_done()
+    def _read_backlog(self, remove: bool = True):
+        """读取磁盘中的积压任务"""
+        if not QUEUE_BACKLOG_PATH.exists():
+            return []
+        try:
+            with open(QUEUE_BACKLOG_PATH, "r", encoding="utf-8") as f:
+                lines = f.readlines()
+            if remove:
+                QUEUE_BACKLOG_PATH.unlink()
+        except Exception as e:
+            logger.exception(f"读取积压任务失败: {e}")
+            return []
 
-            except asyncio.TimeoutError:
+        items = []
+        for line in lines:
+            try:
+                item = json.loads(line)
+            except json.JSONDecodeError:
                 continue
-            except Exception as e:
-                logger.exception(f"任务处理异常: {e}")
+            if item.get("type") in self.handlers:
+                items.append((item["type"], item["data"], item.get("seq", 0)))
+        return items
+
+    def _scan_backlog(self) -> None:
+        """启动时记录磁盘中各合并key的最新序号"""
+        for task_type, data, seq in self._read_backlog(remove=False):
+            key = self._get_key(task_type, data)
+            if len(key) == 2:
+                self.backlog_keys[key] = max(seq, self.backlog_keys.get(key, 0))
+            self._last_seq = max(self._last_seq, seq)
+
+    def _load_backlog(self) -> None:
+        """从磁盘读取积压任务，跳过已作废的任务，超出上限的部分写回磁盘"""
+        items = self._read_backlog()
+        superseded = self.superseded
+        self.backlog_keys = {}
+        self.superseded = {}
+        skipped = 0
+        for task_type, data, seq in items:
+            key = self._get_key(task_type, data)
+            if superseded.get(key, -1) >= seq:
+                skipped += 1
+                continue
+            self._enqueue(task_type, data, seq)
+        if items:
+            logger.info(f"加载积压任务: {len(items)}，跳过已有更新的任务: {skipped}")
+
+    async def _worker(self) -> None:
+        while self.running:
+            if not self.pending:
+                self._load_backlog()
+            if not self.pending:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+
+            key, item = self.pending.popitem(last=False)
+            task_type, data, _ = item
+            handler = self.handlers.get(task_type)
+            if not handler:
+                continue
+            try:
+                await self._run_task(handler, data, task_type)
+            except asyncio.CancelledError:
+                # 关闭时放回队列，随后写入磁盘
+                if key not in self.pending:
+                    self.pending[key] = item
+                    self.pending.move_to_end(key, last=False)
+                raise
 
     async def _run_task(self, handler: Callable, data: Any, task_type: str) -> None:
+        _, _, retry = get_queue_config()
+        for attempt in range(retry + 1):
+            try:
+                result = handler(data)
+                # 如果是协程，等待它完成
+                if asyncio.iscoroutine(result):
+                    await result
+                return
+            except Exception as e:
+                if attempt >= retry or not self.running:
+                    logger.exception(f"任务执行错误 ({task_type}): {e}")
+                    return
+                delay = RETRY_BASE_DELAY * 2**attempt * random.uniform(0.5, 1.5)
+                logger.warning(
+                    f"任务执行错误 ({task_type}): {e}, {delay:.1f}秒后重试"
+                )
+                await asyncio.sleep(delay)
+
+    async def _process(self) -> None:
+        self.loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._stop = asyncio.Event()
+        self._scan_backlog()
+        workers, _, _ = get_queue_config()
+        tasks = [asyncio.create_task(self._worker()) for _ in range(workers)]
+        self._ready.set()
+
+        await self._stop.wait()
+
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        # 未处理的任务写入磁盘
+        if self.pending:
+            self._spill(list(self.pending.values()))
+            logger.info(f"任务分发器关闭，保存未处理任务: {len(self.pending)}")
+            self.pending.clear()
+        # worker 已全部结束，在本事件循环结束前关闭其共享HTTP客户端
+        from ..http_client import http_client
+
         try:
-            result = handler(data)
-            # 如果是协程，等待它完成
-            if asyncio.iscoroutine(result):
-                await result
+            await http_client.aclose_current()
         except Exception as e:
-            logger.exception(f"任务执行错误 ({task_type}): {e}")
+            logger.warning(f"任务分发器关闭HTTP客户端失败: {e}")
+        self._stopped.set()
 
     def start(self, daemon: bool = True) -> None:
         if self.running:
             return
 
         self.running = True
+        self._ready.clear()
+        self._stopped.clear()
 
         # 启动处理线程
         threading.Thread(
             target=lambda: asyncio.run(self._process()), daemon=daemon
         ).start()
+        self._ready.wait(timeout=5)
+
+    async def stop(self) -> None:
+        if not self.running:
+            return
+        self.running = False
+        if self.loop and self._stop:
+            self.loop.call_soon_threadsafe(self._stop.set)
+            await asyncio.to_thread(self._stopped.wait, 10)
 
 
 # 创建全局任务分发器实例
@@ -82,14 +280,19 @@ dispatcher = TaskDispatcher()
 def register_handler(
     task_type: str,
     handler: Callable[[Any], Union[Any, Coroutine[Any, Any, Any]]],
+    key: Optional[Callable[[Any], Optional[Hashable]]] = None,
 ) -> None:
-    dispatcher.register_handler(task_type, handler)
+    dispatcher.register_handler(task_type, handler, key)
 
 
 def start_dispatcher(daemon: bool = True) -> None:
     dispatcher.start(daemon=daemon)
 
 
+async def stop_dispatcher() -> None:
+    await dispatcher.stop()
+
+
 # 兼容原有代码的函数
 async def put_item(queue_name: str, item: Any) -> None:
     await dispatcher.dispatch(queue_name, item)
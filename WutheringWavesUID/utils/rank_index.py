@@ -0,0 +1,258 @@
+import asyncio
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+from gsuid_core.logger import logger
+
+from ..utils.api.model import RoleDetailData
+from .calc import WuWaCalc
+from .calculate import calc_phantom_score, get_calc_map, get_total_score_bg
+from .damage.abstract import DamageRankRegister
+from .database.models import WavesBind, WavesCharRankIndex
+from .raw_data_store import raw_data_store
+from .util import get_version
+
+
+def get_raw_data_stamp(uid: str) -> int:
+    """角色面板文件的修改时间，不存在时为0"""
+    stat = raw_data_store.stat(uid)
+    return stat.st_mtime_ns if stat else 0
+
+
+def calc_rank_entry(
+    role_detail: RoleDetailData, rankDetail: Optional[Dict] = None
+) -> Optional[Dict]:
+    """计算排行所需数据，无声骸或评分为0时返回None"""
+    if not role_detail.phantomData or not role_detail.phantomData.equipPhantomList:
+        return None
+    equipPhantomList = role_detail.phantomData.equipPhantomList
+
+    calc: WuWaCalc = WuWaCalc(role_detail)
+    calc.phantom_pre = calc.prepare_phantom()
+    calc.phantom_card = calc.enhance_summation_phantom_value(calc.phantom_pre)
+    calc.calc_temp = get_calc_map(
+        calc.phantom_card,
+        role_detail.role.roleName,
+        role_detail.role.roleId,
+    )
+
+    # 评分
+    phantom_score = 0
+    for _phantom in equipPhantomList:
+        if _phantom and _phantom.phantomProp:
+            props = _phantom.get_props()
+            _score, _bg = calc_phantom_score(
+                role_detail.role.roleId, props, _phantom.cost, calc.calc_temp
+            )
+            phantom_score += _score
+
+    if phantom_score == 0:
+        return None
+
+    phantom_bg = get_total_score_bg(
+        role_detail.role.roleName, phantom_score, calc.calc_temp
+    )
+
+    calc.role_card = calc.enhance_summation_card_value(calc.phantom_card)
+    # 排行只需要数值，不记录效果明细
+    calc.damageAttribute = calc.card_sort_map_to_attribute(
+        calc.role_card, trace=False
+    )
+
+    if rankDetail is None:
+        rankDetail = DamageRankRegister.find_class(str(role_detail.role.roleId))
+    if rankDetail:
+        _, expected_damage = rankDetail["func"](calc.damageAttribute, role_detail)
+    else:
+        expected_damage = "0"
+
+    sonata_name = ""
+    ph_detail = calc.phantom_card.get("ph_detail", [])
+    if isinstance(ph_detail, list):
+        for ph in ph_detail:
+            if ph.get("ph_num") == 5:
+                sonata_name = ph.get("ph_name", "")
+                break
+
+            if ph.get("isFull"):
+                sonata_name = ph.get("ph_name", "")
+                break
+
+    return {
+        "level": role_detail.role.level,
+        "chain": role_detail.get_chain_num(),
+        "chain_name": role_detail.get_chain_name(),
+        "score": phantom_score,
+        "score_bg": phantom_bg,
+        "expected_damage": expected_damage,
+        "expected_damage_int": int(expected_damage.replace(",", "")),
+        "sonata_name": sonata_name,
+    }
+
+
+def calc_total_score(
+    role_details: Iterable[RoleDetailData], min_score: float = 175
+) -> Tuple[float, List[Dict]]:
+    """练度总分，只计算声骸分数不低于`min_score`的角色"""
+    total_score = 0
+    char_score_details = []
+    for role_detail in role_details:
+        if not role_detail.phantomData or not role_detail.phantomData.equipPhantomList:
+            continue
+
+        calc: WuWaCalc = WuWaCalc(role_detail)
+        calc.phantom_pre = calc.prepare_phantom()
+        calc.phantom_card = calc.enhance_summation_phantom_value(calc.phantom_pre)
+        calc.calc_temp = get_calc_map(
+            calc.phantom_card,
+            role_detail.role.roleName,
+            role_detail.role.roleId,
+        )
+
+        phantom_score = 0
+        for _phantom in role_detail.phantomData.equipPhantomList:
+            if _phantom and _phantom.phantomProp:
+                props = _phantom.get_props()
+                _score, _bg = calc_phantom_score(
+                    role_detail.role.roleId, props, _phantom.cost, calc.calc_temp
+                )
+                phantom_score += _score
+
+        if phantom_score >= min_score:
+            total_score += phantom_score
+            char_score_details.append(
+                {
+                    "char_id": role_detail.role.roleId,
+                    "phantom_score": phantom_score,
+                }
+            )
+    return total_score, char_score_details
+
+
+def _calc_entries(
+    uid: str, role_details: Iterable[Union[Dict, RoleDetailData]]
+) -> Dict[int, Dict]:
+    entries = {}
+    for role_detail in role_details:
+        try:
+            if not isinstance(role_detail, RoleDetailData):
+                role_detail = RoleDetailData(**role_detail)
+            entry = calc_rank_entry(role_detail)
+        except Exception as e:
+            logger.warning(f"[鸣潮] 排行索引计算失败 uid:{uid} {e}")
+            continue
+        if entry:
+            entries[role_detail.role.roleId] = entry
+    return entries
+
+
+async def _calc_entries_async(uid: str, role_details: List[Dict]) -> Dict[int, Dict]:
+    """在排行计算进程池中计算，未启用进程池时在线程中计算，不阻塞事件循环"""
+    # calc_pool 依赖本模块，避免循环导入
+    from .calc_pool import calc_pool
+
+    result = await calc_pool.run(_calc_entries, uid, role_details)
+    if result is None:
+        return await asyncio.to_thread(_calc_entries, uid, role_details)
+    return result[0]
+
+
+async def update_rank_index(
+    uid: str,
+    save_data: List[Dict],
+    refresh_update: Dict[int, Dict],
+    old_stamp: int,
+    remove_role_ids: Optional[List[int]] = None,
+):
+    """面板写入后增量更新排行索引
+
+    索引与写入前的角色面板一致时只重算`refresh_update`中的角色，否则全量重建
+    """
+    version = get_version()
+    stamp = get_raw_data_stamp(uid)
+    try:
+        full = await WavesCharRankIndex.select_uid_stamp(uid) != (old_stamp, version)
+        if full:
+            entries = await _calc_entries_async(uid, save_data)
+            remove_role_ids = None
+        else:
+            entries = await _calc_entries_async(uid, list(refresh_update.values()))
+            # 评分为0的角色需要从索引中移除
+            remove_role_ids = list(remove_role_ids or []) + [
+                role_id for role_id in refresh_update if role_id not in entries
+            ]
+        await WavesCharRankIndex.upsert_uid_index(
+            uid, entries, stamp, version, remove_role_ids, full
+        )
+    except Exception as e:
+        logger.exception(f"[鸣潮] 排行索引更新失败 uid:{uid}", e)
+
+
+async def remove_rank_index(uid: str, role_ids: List[int], old_stamp: int):
+    """删除角色面板后同步排行索引"""
+    version = get_version()
+    try:
+        if await WavesCharRankIndex.select_uid_stamp(uid) != (old_stamp, version):
+            # 索引已过期，等待下次刷新时重建
+            return
+        await WavesCharRankIndex.upsert_uid_index(
+            uid, {}, get_raw_data_stamp(uid), version, role_ids
+        )
+    except Exception as e:
+        logger.exception(f"[鸣潮] 排行索引更新失败 uid:{uid}", e)
+
+
+async def get_rank_index_candidates(
+    users: Iterable[WavesBind],
+    find_char_id: Union[int, str, List[str], List[int]],
+    tokenLimitFlag: bool,
+    wavesTokenUsersMap: Dict,
+) -> Tuple[
+    List[Tuple[str, str, WavesCharRankIndex]], List[Tuple[WavesBind, List[str]]]
+]:
+    """从排行索引读取角色数据
+
+    返回 (索引命中的 (user_id, uid, row) 列表, 需要回退计算的 (user, [uid]) 列表)
+    """
+    if isinstance(find_char_id, (int, str)):
+        role_ids = [int(find_char_id)]
+    else:
+        role_ids = [int(i) for i in find_char_id]
+
+    rows = await WavesCharRankIndex.select_by_role_ids(role_ids)
+    # 特殊角色有多个role_id，同一uid可能有多行
+    uid_rows: Dict[Tuple[str, int], WavesCharRankIndex] = {
+        (row.uid, row.role_id): row for row in rows
+    }
+    uid_stamps = await WavesCharRankIndex.select_uid_stamps()
+    version = get_version()
+
+    indexed = []
+    pending: List[Tuple[WavesBind, List[str]]] = []
+    for user in users:
+        if not user.uid:
+            continue
+        pending_uids = []
+        for uid in user.uid.split("_"):
+            if tokenLimitFlag and (user.user_id, uid) not in wavesTokenUsersMap:
+                continue
+            index_stamp = uid_stamps.get(uid)
+            if index_stamp is None or index_stamp[1] != version:
+                if get_raw_data_stamp(uid):
+                    pending_uids.append(uid)
+                continue
+            # 索引中没有该角色时也要检查面板文件:
+            # 索引更新失败或写入面板后中断时，索引会缺少刚保存的角色
+            stamp = get_raw_data_stamp(uid)
+            if not stamp:
+                continue
+            if stamp != index_stamp[0]:
+                pending_uids.append(uid)
+                continue
+            indexed.extend(
+                (user.user_id, uid, uid_rows[(uid, role_id)])
+                for role_id in role_ids
+                if (uid, role_id) in uid_rows
+            )
+        if pending_uids:
+            pending.append((user, pending_uids))
+    return indexed, pending
@@ -0,0 +1,255 @@
+import os
+import struct
+import asyncio
+import weakref
+from pathlib import Path
+from typing import Dict, Tuple, Iterable, Iterator, Optional
+
+import aiofiles
+from msgspec import msgpack
+from msgspec import json as msgjson
+from gsuid_core.logger import logger
+
+from ..wutheringwaves_config import WutheringWavesConfig
+from .resource.RESOURCE_PATH import PLAYER_PATH
+
+RAW_DATA_JSON = "rawData.json"
+RAW_DATA_LOG = "rawData.msgpack"
+
+# 日志记录头: 记录长度
+_HEADER = struct.Struct(">I")
+# 日志记录数超过 有效角色数 * COMPACT_FACTOR + COMPACT_SLACK 时整体重写
+COMPACT_FACTOR = 2
+COMPACT_SLACK = 8
+
+_encoder = msgpack.Encoder()
+_decoder = msgpack.Decoder()
+
+
+def get_raw_data_format() -> str:
+    return WutheringWavesConfig.get_config("RawDataFormat").data or "json"
+
+
+def _encode_json(roles: Dict[int, Dict]) -> bytes:
+    return msgjson.encode(list(roles.values()))
+
+
+def _decode_json(data: bytes) -> Dict[int, Dict]:
+    return {d["role"]["roleId"]: d for d in msgjson.decode(data)}
+
+
+def encode_frame(body: bytes) -> bytes:
+    """加上长度头的日志记录"""
+    return _HEADER.pack(len(body)) + body
+
+
+def iter_frames(data: bytes) -> Iterator[memoryview]:
+    """依次返回日志中的记录，末尾未写完的记录会被忽略"""
+    view = memoryview(data)
+    offset = 0
+    while offset + _HEADER.size <= len(view):
+        (size,) = _HEADER.unpack_from(view, offset)
+        end = offset + _HEADER.size + size
+        if end > len(view):
+            break
+        yield view[offset + _HEADER.size : end]
+        offset = end
+
+
+def frame_size(frame: memoryview) -> int:
+    return _HEADER.size + len(frame)
+
+
+def atomic_write(path: Path, data: bytes):
+    tmp = path.with_name(f"{path.name}.tmp")
+    with open(tmp, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def append_file(path: Path, data: bytes):
+    with open(path, "ab") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def _encode_record(role_id: int, detail: Optional[Dict]) -> bytes:
+    return encode_frame(_encoder.encode((role_id, detail)))
+
+
+def _decode_log(data: bytes) -> Tuple[Dict[int, Dict], int, int]:
+    """回放日志，返回 (角色面板, 记录数, 有效长度)
+
+    末尾未写完的记录会被忽略
+    """
+    roles: Dict[int, Dict] = {}
+    offset = records = 0
+    for frame in iter_frames(data):
+        role_id, detail = _decoder.decode(frame)
+        if detail is None:
+            roles.pop(role_id, None)
+        else:
+            roles[role_id] = detail
+        records += 1
+        offset += frame_size(frame)
+    return roles, records, offset
+
+
+class RawDataStore:
+    """按uid存储角色面板原始数据
+
+    - json: 兼容旧版的 rawData.json，每次整体原子写入
+    - msgpack: rawData.msgpack，每个角色一条记录，刷新时只追加变化的角色，
+      失效记录过多时整体重写
+
+    读取无需加锁；读取-修改-写入需在 `lock(uid)` 内进行。
+    切换格式后旧格式文件在下次写入时迁移
+    """
+
+    def __init__(self, base: Path = PLAYER_PATH):
+        self.base = base
+        self._locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = (
+            weakref.WeakValueDictionary()
+        )
+        # uid -> (日志有效长度, 记录数)，与文件大小一致时才允许追加
+        self._logs: Dict[str, Tuple[int, int]] = {}
+
+    def lock(self, uid: str) -> asyncio.Lock:
+        lock = self._locks.get(uid)
+        if lock is None:
+            lock = asyncio.Lock()
+            self._locks[uid] = lock
+        return lock
+
+    def _paths(self, uid: str) -> Tuple[Path, Path]:
+        """(当前格式文件, 另一格式文件)"""
+        _dir = self.base / uid
+        if get_raw_data_format() == "msgpack":
+            return _dir / RAW_DATA_LOG, _dir / RAW_DATA_JSON
+        return _dir / RAW_DATA_JSON, _dir / RAW_DATA_LOG
+
+    def stat(self, uid: str) -> Optional[os.stat_result]:
+        for path in self._paths(uid):
+            try:
+                return path.stat()
+            except OSError:
+                continue
+        return None
+
+    def exists(self, uid: str) -> bool:
+        return self.stat(uid) is not None
+
+    async def _read_path(self, uid: str, path: Path) -> Dict[int, Dict]:
+        async with aiofiles.open(path, mode="rb") as f:
+            data = await f.read()
+        if path.name == RAW_DATA_JSON:
+            return _decode_json(data) if data.strip() else {}
+        roles, records, size = _decode_log(data)
+        if size == len(data):
+            self._logs[uid] = (size, records)
+        else:
+            self._logs.pop(uid, None)
+        return roles
+
+    async def read(self, uid: str) -> Dict[int, Dict]:
+        """读取全部角色面板(roleId -> 面板)，文件不存在时为空
+
+        文件损坏时移至 .bad 并返回空
+        """
+        for path in self._paths(uid):
+            if not path.exists():
+                continue
+            try:
+                return await self._read_path(uid, path)
+            except FileNotFoundError:
+                continue
+            except Exception as e:
+                logger.exception(f"[鸣潮] 读取角色面板失败 {path}: {e}")
+                try:
+                    os.replace(path, path.with_name(f"{path.name}.bad"))
+                except OSError:
+                    pass
+                self._logs.pop(uid, None)
+                return {}
+        return {}
+
+    async def write(
+        self,
+        uid: str,
+        roles: Dict[int, Dict],
+        updated: Optional[Iterable[int]] = None,
+        removed: Iterable[int] = (),
+    ):
+        """写入全部角色面板
+
+        msgpack 格式下给出 updated/removed 时只追加这些角色的记录
+        """
+        path, other = self._paths(uid)
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        if path.name == RAW_DATA_JSON:
+            await asyncio.to_thread(atomic_write, path, _encode_json(roles))
+        else:
+            changes = []
+            if updated is not None:
+                changes = [_encode_record(i, roles[i]) for i in updated if i in roles]
+                changes += [_encode_record(i, None) for i in removed if i not in roles]
+
+            log = self._logs.get(uid)
+            try:
+                size = path.stat().st_size
+            except OSError:
+                size = -1
+            if (
+                updated is not None
+                and log is not None
+                and log[0] == size
+                and log[1] + len(changes)
+                <= len(roles) * COMPACT_FACTOR + COMPACT_SLACK
+            ):
+                data = b"".join(changes)
+                await asyncio.to_thread(append_file, path, data)
+                self._logs[uid] = (size + len(data), log[1] + len(changes))
+            else:
+                data = b"".join(_encode_record(i, d) for i, d in roles.items())
+                await asyncio.to_thread(atomic_write, path, data)
+                self._logs[uid] = (len(data), len(roles))
+
+        if other.exists():
+            other.unlink(missing_ok=True)
+            logger.info(f"[鸣潮] 角色面板已迁移为 {get_raw_data_format()}: {uid}")
+
+    async def migrate(self, uid: str) -> bool:
+        """将旧格式文件转换为当前格式"""
+        path, other = self._paths(uid)
+        if not other.exists():
+            return False
+        async with self.lock(uid):
+            if not other.exists():
+                return False
+            roles = await self.read(uid)
+            await self.write(uid, roles)
+            return True
+
+
+raw_data_store = RawDataStore()
+
+
+async def migrate_raw_data():
+    """启动时将所有uid的角色面板转换为当前存储格式"""
+    if not raw_data_store.base.exists():
+        return
+    count = 0
+    for _dir in raw_data_store.base.iterdir():
+        if not _dir.is_dir():
+            continue
+        try:
+            if await raw_data_store.migrate(_dir.name):
+                count += 1
+        except Exception as e:
+            logger.warning(f"[鸣潮] 角色面板迁移失败 {_dir.name}: {e}")
+    if count:
+        logger.info(f"[鸣潮] 角色面板迁移完成, 数量: {count}")
@@ -1,58 +1,78 @@
 import asyncio
-import json
-from typing import Dict, List, Optional, Union
-
-import aiofiles
+from typing import Dict, List, Tuple, Optional, Union
 
 from gsuid_core.logger import logger
 from gsuid_core.models import Event
 
-from ..utils.api.model import AccountBaseInfo, RoleList
+from ..utils.api.model import AccountBaseInfo, Role, RoleList
+from ..utils.char_info_utils import invalidate_role_detail_cache
 from ..utils.error_reply import WAVES_CODE_101, WAVES_CODE_102
 from ..utils.expression_ctx import WavesCharRank, get_waves_char_rank
 from ..utils.hint import error_reply
 from ..utils.queues.const import QUEUE_SCORE_RANK
 from ..utils.queues.queues import put_item
-from ..utils.resource.RESOURCE_PATH import PLAYER_PATH
+from ..utils.rank_index import get_raw_data_stamp, update_rank_index
+from ..utils.raw_data_store import raw_data_store
+from ..utils.refresh_scheduler import (
+    PRIORITY_FULL,
+    PRIORITY_SINGLE,
+    refresh_scheduler,
+)
 from ..utils.util import get_version, send_master_info
 from ..utils.waves_api import waves_api
 from ..wutheringwaves_config import WutheringWavesConfig
 from .resource.constant import SPECIAL_CHAR_INT_ALL
 
 
-def is_use_global_semaphore() -> bool:
-    return WutheringWavesConfig.get_config("UseGlobalSemaphore").data or False
+def is_skip_unchanged() -> bool:
+    return WutheringWavesConfig.get_config("RefreshSkipUnchanged").data or False
 
 
-def get_refresh_card_concurrency() -> int:
-    return WutheringWavesConfig.get_config("RefreshCardConcurrency").data or 2
+class RefreshPlanStats:
+    def __init__(self):
+        self.requested = 0
+        self.skipped = 0
 
 
-class SemaphoreManager:
-    def __init__(self):
-        self._last_config: int = get_refresh_card_concurrency()
-        self._semaphore: asyncio.Semaphore = asyncio.Semaphore(value=self._last_config)
-        self._semaphore_lock = asyncio.Lock()
+refresh_plan_stats = RefreshPlanStats()
 
-    async def get_semaphore(self) -> asyncio.Semaphore:
-        current_config = get_refresh_card_concurrency()
 
-        if is_use_global_semaphore():
-            return await self._get_semaphore(current_config)  # 全局模式
-        else:
-            return asyncio.Semaphore(value=current_config)  # 独立模式
+def _role_brief(role: Role) -> Tuple[int, Optional[int], Optional[int]]:
+    return role.level, role.breach, role.chainUnlockNum
 
-    async def _get_semaphore(self, current_config: int) -> asyncio.Semaphore:
-        if self._last_config != current_config:
-            async with self._semaphore_lock:
-                if self._last_config != current_config:
-                    self._semaphore = asyncio.Semaphore(value=current_config)
-                    self._last_config = current_config
 
-        return self._semaphore
+def _detail_brief(detail: Dict) -> Tuple[int, Optional[int], Optional[int]]:
+    role = detail["role"]
+    chain_num = sum(1 for i in detail.get("chainList") or [] if i.get("unlocked"))
+    return role.get("level"), role.get("breach"), chain_num
 
 
-semaphore_manager = SemaphoreManager()
+async def plan_refresh(
+    uid: str, role_info: RoleList, role_ids: List[str]
+) -> Tuple[List[str], List[Dict]]:
+    """根据角色列表的等级/突破/共鸣链与本地面板比较，决定需要请求详情的角色
+
+    返回 (需要请求的角色id, 未变化可直接使用的本地面板)
+    """
+    old_data = await raw_data_store.read(uid)
+    roles = {f"{r.roleId}": r for r in role_info.roleList}
+
+    fetch_ids = []
+    unchanged = []
+    for role_id in role_ids:
+        role = roles.get(role_id)
+        old = old_data.get(int(role_id))
+        if (
+            role
+            and old
+            and role.breach is not None
+            and role.chainUnlockNum is not None
+            and _role_brief(role) == _detail_brief(old)
+        ):
+            unchanged.append(old)
+        else:
+            fetch_ids.append(role_id)
+    return fetch_ids, unchanged
 
 
 async def send_card(
@@ -118,54 +138,52 @@ async def save_card_info(
 ):
     if len(waves_data) == 0:
         return
-    _dir = PLAYER_PATH / uid
-    _dir.mkdir(parents=True, exist_ok=True)
-    path = _dir / "rawData.json"
-
-    old_data = {}
-    if path.exists():
-        try:
-            async with aiofiles.open(path, mode="r", encoding="utf-8") as f:
-                old = json.loads(await f.read())
-                old_data = {d["role"]["roleId"]: d for d in old}
-        except Exception as e:
-            logger.exception(f"save_card_info get failed {path}:", e)
-            path.unlink(missing_ok=True)
 
-    #
     refresh_update = {}
     refresh_unchanged = {}
-    for item in waves_data:
-        role_id = item["role"]["roleId"]
-
-        if role_id in SPECIAL_CHAR_INT_ALL:
-            # 漂泊者预处理
-            for piaobo_id in SPECIAL_CHAR_INT_ALL:
-                old = old_data.get(piaobo_id)
-                if not old:
-                    continue
-                if piaobo_id != role_id:
-                    del old_data[piaobo_id]
-
-        old = old_data.get(role_id)
-        if old != item:
-            refresh_update[role_id] = item
-        else:
-            refresh_unchanged[role_id] = item
+    removed_role_ids = []
+    async with raw_data_store.lock(uid):
+        old_stamp = get_raw_data_stamp(uid)
+        old_data = await raw_data_store.read(uid)
+
+        for item in waves_data:
+            role_id = item["role"]["roleId"]
+
+            if role_id in SPECIAL_CHAR_INT_ALL:
+                # 漂泊者预处理
+                for piaobo_id in SPECIAL_CHAR_INT_ALL:
+                    old = old_data.get(piaobo_id)
+                    if not old:
+                        continue
+                    if piaobo_id != role_id:
+                        del old_data[piaobo_id]
+                        removed_role_ids.append(piaobo_id)
+
+            old = old_data.get(role_id)
+            if old != item:
+                refresh_update[role_id] = item
+            else:
+                refresh_unchanged[role_id] = item
 
-        old_data[role_id] = item
+            old_data[role_id] = item
 
-    save_data = list(old_data.values())
+        save_data = list(old_data.values())
+
+        try:
+            await raw_data_store.write(
+                uid, old_data, refresh_update.keys(), removed_role_ids
+            )
+            await update_rank_index(
+                uid, save_data, refresh_update, old_stamp, removed_role_ids
+            )
+        except Exception as e:
+            logger.exception(f"save_card_info save failed {uid}:", e)
+        finally:
+            invalidate_role_detail_cache(uid)
 
     if not waves_api.is_net(uid):
         await send_card(uid, user_id, save_data, is_self_ck, token, role_info, waves_data)
 
-    try:
-        async with aiofiles.open(path, "w", encoding="utf-8") as file:
-            await file.write(json.dumps(save_data, ensure_ascii=False))
-    except Exception as e:
-        logger.exception(f"save_card_info save failed {path}:", e)
-
     if waves_map:
         waves_map["refresh_update"] = refresh_update
         waves_map["refresh_unchanged"] = refresh_unchanged
@@ -197,34 +215,33 @@ async def refresh_char(
         msg = f"鸣潮特征码[{uid}]获取数据失败\n1.是否注册过库街区\n2.库街区能否查询当前鸣潮特征码数据"
         return msg
 
-    semaphore = await semaphore_manager.get_semaphore()
+    priority = PRIORITY_FULL if refresh_type == "all" else PRIORITY_SINGLE
 
     async def limited_get_role_detail_info(role_id, uid, ck):
-        async with semaphore:
+        async with refresh_scheduler.slot(user_id, ev.group_id, priority):
             return await waves_api.get_role_detail_info(role_id, uid, ck)
 
-    if is_self_ck:
-        tasks = [
-            limited_get_role_detail_info(f"{r.roleId}", uid, ck)
-            for r in role_info.roleList
-            if refresh_type == "all"
-            or (isinstance(refresh_type, list) and f"{r.roleId}" in refresh_type)
-        ]
+    if is_self_ck or not role_info.showRoleIdList:
+        all_role_ids = [f"{r.roleId}" for r in role_info.roleList]
     else:
-        if role_info.showRoleIdList:
-            tasks = [
-                limited_get_role_detail_info(f"{r}", uid, ck)
-                for r in role_info.showRoleIdList
-                if refresh_type == "all"
-                or (isinstance(refresh_type, list) and f"{r}" in refresh_type)
-            ]
-        else:
-            tasks = [
-                limited_get_role_detail_info(f"{r.roleId}", uid, ck)
-                for r in role_info.roleList
-                if refresh_type == "all"
-                or (isinstance(refresh_type, list) and f"{r.roleId}" in refresh_type)
-            ]
+        all_role_ids = [f"{r}" for r in role_info.showRoleIdList]
+    role_ids = [
+        r
+        for r in all_role_ids
+        if refresh_type == "all"
+        or (isinstance(refresh_type, list) and r in refresh_type)
+    ]
+
+    unchanged_datas = []
+    if refresh_type == "all" and is_skip_unchanged():
+        role_ids, unchanged_datas = await plan_refresh(uid, role_info, role_ids)
+        refresh_plan_stats.requested += len(role_ids)
+        refresh_plan_stats.skipped += len(unchanged_datas)
+        logger.info(
+            f"[鸣潮] {uid} 刷新面板: 请求{len(role_ids)}个角色, 跳过{len(unchanged_datas)}个未变化角色"
+        )
+
+    tasks = [limited_get_role_detail_info(r, uid, ck) for r in role_ids]
     results = await asyncio.gather(*tasks)
 
     charId2chainNum: Dict[int, int] = {
@@ -282,6 +299,8 @@ async def refresh_char(
 
         waves_datas.append(role_detail_info)
 
+    waves_datas.extend(unchanged_datas)
+
     await save_card_info(
         uid,
         waves_datas,
@@ -0,0 +1,211 @@
+import time
+import heapq
+import asyncio
+import itertools
+from collections import Counter
+from contextlib import asynccontextmanager
+from typing import Dict, List, Tuple, Optional
+
+from ..wutheringwaves_config import WutheringWavesConfig
+
+# 单角色刷新优先于全部刷新
+PRIORITY_SINGLE = 0
+PRIORITY_FULL = 1
+
+
+def get_refresh_limits():
+    """(全局并发上限(0为不限制), 单用户并发上限, 单群并发上限(0为不限制))"""
+    per_user = WutheringWavesConfig.get_config("RefreshCardConcurrency").data or 2
+    total = WutheringWavesConfig.get_config("RefreshGlobalConcurrency").data or 0
+    per_group = WutheringWavesConfig.get_config("RefreshGroupConcurrency").data or 0
+    per_user = max(per_user, 1)
+    if WutheringWavesConfig.get_config("UseGlobalSemaphore").data:
+        # 兼容原全局共享模式: 全局上限即为刷新并发数
+        total = min(total, per_user) if total > 0 else per_user
+    return max(total, 0), per_user, per_group
+
+
+class _Waiter:
+    __slots__ = ("user", "group", "priority", "tag", "seq", "future", "enqueued")
+
+    def __init__(self, user, group, priority, tag, seq, future):
+        self.user = user
+        self.group = group
+        self.priority = priority
+        self.tag = tag
+        self.seq = seq
+        self.future = future
+        self.enqueued = time.monotonic()
+
+    @property
+    def key(self) -> Tuple[int, float, int]:
+        return self.priority, self.tag, self.seq
+
+
+class RefreshScheduler:
+    """角色面板请求的公平调度器
+
+    按用户做加权公平排队(起始时间公平队列)，同时限制单用户、单群与全局的并发数；
+    单角色刷新优先于全部刷新。
+
+    每个用户的等待请求为一个堆，ready 堆中每个用户只放队首请求，
+    按 (优先级, 虚拟起始时间, 序号) 取出；达到单用户上限的用户在其释放名额时重新加入，
+    达到单群上限的用户暂存在 parked 中，在该群释放名额时重新加入
+    """
+
+    def __init__(self):
+        self.queues: Dict[str, List[Tuple[int, float, int, _Waiter]]] = {}
+        self.ready: List[Tuple[int, float, int, str]] = []
+        # 用户 -> 已放入 ready/parked 的队首序号
+        self.scheduled: Dict[str, int] = {}
+        self.parked: Dict[str, List[Tuple[int, float, int, str]]] = {}
+        self.queued = 0
+        self.running = 0
+        self.user_running: Counter = Counter()
+        self.group_running: Counter = Counter()
+        self.user_tags: Dict[str, float] = {}
+        self.vtime = 0.0
+        self._seq = itertools.count()
+
+        self.served = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def _push(self, user: str):
+        """用户队首请求放入 ready 堆"""
+        queue = self.queues.get(user)
+        if queue and self.scheduled.get(user) != queue[0][2]:
+            self.scheduled[user] = queue[0][2]
+            heapq.heappush(self.ready, (*queue[0][:3], user))
+
+    def _grant(self, waiter: _Waiter):
+        self.running += 1
+        self.user_running[waiter.user] += 1
+        if waiter.group:
+            self.group_running[waiter.group] += 1
+        self.vtime = max(self.vtime, waiter.tag)
+
+        wait = time.monotonic() - waiter.enqueued
+        self.served += 1
+        self.total_wait += wait
+        self.max_wait = max(self.max_wait, wait)
+        waiter.future.set_result(None)
+
+    def _dispatch(self):
+        total, per_user, per_group = get_refresh_limits()
+        while self.ready and (total <= 0 or self.running < total):
+            entry = heapq.heappop(self.ready)
+            user = entry[3]
+            queue = self.queues.get(user)
+            if not queue or queue[0][2] != entry[2]:
+                # 队首已变化
+                continue
+            if self.user_running[user] >= per_user:
+                del self.scheduled[user]
+                continue
+            waiter = queue[0][3]
+            if (
+                per_group > 0
+                and waiter.group
+                and self.group_running[waiter.group] >= per_group
+            ):
+                self.parked.setdefault(waiter.group, []).append(entry)
+                continue
+
+            self._remove(waiter)
+            self._grant(waiter)
+            self._push(user)
+
+    def _remove(self, waiter: _Waiter):
+        queue = self.queues[waiter.user]
+        if queue[0][2] == waiter.seq:
+            heapq.heappop(queue)
+        else:
+            queue.remove((*waiter.key, waiter))
+            heapq.heapify(queue)
+        if not queue:
+            del self.queues[waiter.user]
+        if self.scheduled.get(waiter.user) == waiter.seq:
+            del self.scheduled[waiter.user]
+        self.queued -= 1
+
+    async def acquire(
+        self,
+        user: str,
+        group: Optional[str] = None,
+        priority: int = PRIORITY_FULL,
+        weight: float = 1,
+    ):
+        # 空闲用户从当前虚拟时间开始，避免长时间未请求的用户积累过多额度
+        tag = max(self.vtime, self.user_tags.get(user, 0.0)) + 1 / weight
+        self.user_tags[user] = tag
+
+        future = asyncio.get_running_loop().create_future()
+        waiter = _Waiter(user, group, priority, tag, next(self._seq), future)
+        heapq.heappush(self.queues.setdefault(user, []), (*waiter.key, waiter))
+        self.queued += 1
+        self._push(user)
+        self._dispatch()
+
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # 已获得名额后被取消
+                self.release(user, group)
+            else:
+                self._remove(waiter)
+                self._push(user)
+                self._dispatch()
+            raise
+
+    def release(self, user: str, group: Optional[str] = None):
+        self.running -= 1
+        self.user_running[user] -= 1
+        if self.user_running[user] <= 0:
+            del self.user_running[user]
+            if user not in self.queues:
+                self.user_tags.pop(user, None)
+        if group:
+            self.group_running[group] -= 1
+            if self.group_running[group] <= 0:
+                del self.group_running[group]
+            for entry in self.parked.pop(group, []):
+                heapq.heappush(self.ready, entry)
+        self._push(user)
+        self._dispatch()
+
+    @asynccontextmanager
+    async def slot(
+        self,
+        user: str,
+        group: Optional[str] = None,
+        priority: int = PRIORITY_FULL,
+        weight: float = 1,
+    ):
+        await self.acquire(user, group, priority, weight)
+        try:
+            yield
+        finally:
+            self.release(user, group)
+
+    def get_state(self) -> Dict:
+        now = time.monotonic()
+        return {
+            "running": self.running,
+            "queued": self.queued,
+            "queued_users": len(self.queues),
+            "oldest_wait": round(
+                max(
+                    (now - i[3].enqueued for q in self.queues.values() for i in q),
+                    default=0.0,
+                ),
+                3,
+            ),
+            "avg_wait": round(self.total_wait / self.served, 3) if self.served else 0,
+            "max_wait": round(self.max_wait, 3),
+            "served": self.served,
+        }
+
+
+refresh_scheduler = RefreshScheduler()
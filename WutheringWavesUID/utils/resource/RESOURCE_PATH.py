@@ -14,6 +14,12 @@ CONFIG_PATH = MAIN_PATH / "config.json"
 # 用户数据保存文件
 PLAYER_PATH = MAIN_PATH / "players"
 
+# 上传队列积压任务
+QUEUE_BACKLOG_PATH = MAIN_PATH / "queue_backlog.jsonl"
+
+# 接口缓存
+API_CACHE_PATH = MAIN_PATH / "api_cache.db"
+
 # 游戏素材
 RESOURCE_PATH = MAIN_PATH / "resource"
 PHANTOM_PATH = RESOURCE_PATH / "phantom"
@@ -3,6 +3,7 @@ import inspect
 import random
 import string
 import time
+from collections import OrderedDict
 from functools import wraps
 from typing import Any, Callable, Coroutine, Dict, List, TypeVar, overload
 
@@ -11,52 +12,101 @@ import httpx
 from gsuid_core.subscribe import gs_subscribe
 
 
-def timed_async_cache(expiration, condition=lambda x: True):
+# 所有timed_async_cache缓存的函数, 用于统计
+ASYNC_CACHES: Dict[str, Callable] = {}
+
+
+def timed_async_cache(
+    expiration,
+    condition=lambda x: True,
+    maxsize: int = 128,
+    keys: List[str] | None = None,
+):
+    """
+    按参数缓存异步函数结果
+    keys为None时使用全部参数作为缓存键, 否则只使用keys中的参数, 类方法忽略self/cls
+    同一个键的并发调用共享同一次执行
+    """
+
     def decorator(func):
-        cache = {}
-        locks = {}
+        cache: OrderedDict = OrderedDict()
+        inflight: Dict[tuple, asyncio.Future] = {}
+        stats = {"hits": 0, "misses": 0}
 
         sig = inspect.signature(func)
         params = list(sig.parameters.keys())
         is_cls_method = params and params[0] in ["self", "cls"]
 
-        @wraps(func)
-        async def wrapper(*args):
-            current_time = time.time()
-            if is_cls_method and args and hasattr(args[0], "__class__"):
-                cache_key = f"{args[0].__class__.__name__}.{func.__name__}"
-            else:
-                cache_key = func.__name__
+        def make_key(args, kwargs) -> tuple:
+            bound_args = sig.bind(*args, **kwargs)
+            bound_args.apply_defaults()
+            key_parts = []
+            for name, value in bound_args.arguments.items():
+                if is_cls_method and name == params[0]:
+                    continue
+                if keys is not None and name not in keys:
+                    continue
+                try:
+                    hash(value)
+                except TypeError:
+                    value = repr(value)
+                key_parts.append((name, value))
+            return tuple(key_parts)
+
+        async def call(cache_key, args, kwargs):
+            try:
+                value = await func(*args, **kwargs)
+                if condition(value):
+                    cache[cache_key] = (value, time.time())
+                    cache.move_to_end(cache_key)
+                    while len(cache) > maxsize:
+                        cache.popitem(last=False)
+                return value
+            finally:
+                inflight.pop(cache_key, None)
 
-            # 为每个缓存键创建一个锁
-            if cache_key not in locks:
-                locks[cache_key] = asyncio.Lock()
+        @wraps(func)
+        async def wrapper(*args, **kwargs):
+            cache_key = make_key(args, kwargs)
 
             # 检查缓存，如果有效则直接返回
             if cache_key in cache:
                 value, timestamp = cache[cache_key]
-                if current_time - timestamp < expiration:
+                if time.time() - timestamp < expiration:
+                    cache.move_to_end(cache_key)
+                    stats["hits"] += 1
                     return value
-
-            # 获取锁以确保并发安全
-            async with locks[cache_key]:
-                # 双重检查，避免等待锁期间其他协程已经更新了缓存
-                if cache_key in cache:
-                    value, timestamp = cache[cache_key]
-                    if current_time - timestamp < expiration:
-                        return value
-
-                # 执行原始函数
-                value = await func(*args)
-                if condition(value):
-                    cache[cache_key] = (value, current_time)
-                return value
-
+                del cache[cache_key]
+
+            stats["misses"] += 1
+            # 相同参数的并发调用等待同一个任务
+            future = inflight.get(cache_key)
+            if future is None:
+                future = asyncio.ensure_future(call(cache_key, args, kwargs))
+                future.add_done_callback(
+                    lambda f: f.cancelled() or f.exception()
+                )
+                inflight[cache_key] = future
+            return await asyncio.shield(future)
+
+        def cache_info() -> Dict[str, int]:
+            return {**stats, "size": len(cache), "maxsize": maxsize}
+
+        def cache_clear():
+            cache.clear()
+
+        wrapper.cache_info = cache_info
+        wrapper.cache_clear = cache_clear
+        ASYNC_CACHES[func.__qualname__] = wrapper
         return wrapper
 
     return decorator
 
 
+def get_async_cache_stats() -> Dict[str, Dict[str, int]]:
+    return {name: func.cache_info() for name, func in ASYNC_CACHES.items()}
+
+
 F = TypeVar("F", bound=Callable[..., Coroutine[Any, Any, Any]])
 
 
@@ -198,7 +248,7 @@ filter_msg = [
 
 
 # 发送主人信息
-@timed_async_cache(300, lambda x: x)
+@timed_async_cache(300, lambda x: x, keys=[])
 async def send_master_info(msg: str):
     # 过滤
     for i in filter_msg:
@@ -4,7 +4,7 @@ from gsuid_core.logger import logger
 
 from ..utils.error_reply import WAVES_CODE_103
 from ..utils.hint import error_reply
-from ..utils.resource.RESOURCE_PATH import PLAYER_PATH
+from ..utils.raw_data_store import raw_data_store
 from ..wutheringwaves_config import PREFIX
 from ..utils.refresh_char_detail import save_card_info
 from ..utils.database.models import WavesBind
@@ -17,8 +17,6 @@ from ..utils.name_convert import (
 
 from .char_fetterDetail import get_fetterDetail_from_sonata, get_first_echo_id_list
 
-import aiofiles
-import json
 import copy
 import re
 
@@ -67,23 +65,10 @@ async def change_echo(bot: Bot, ev: Event):
     return await bot.send(f"[鸣潮] 修改角色{char_name_print}数据成功，使用【{PREFIX}{char_name_print}面板】查看您的角色面板\n", at_sender)
 
 async def get_local_all_role_detail(uid: str) -> tuple[bool, dict]:
-    _dir = PLAYER_PATH / uid
-    _dir.mkdir(parents=True, exist_ok=True)
-    path = _dir / "rawData.json"
+    if not raw_data_store.exists(uid):
+        return False, {}
 
-    role_data = {}
-    if path.exists():
-        try:
-            async with aiofiles.open(path, mode="r", encoding="utf-8") as f:
-                data = json.loads(await f.read())
-                role_data = {d["role"]["roleId"]: d for d in data}
-        except Exception as e:
-            logger.error(f"[鸣潮] 基础数据get failed {path}:", e)
-            path.unlink(missing_ok=True)
-    else:
-        return False, role_data
-
-    return True, role_data
+    return True, await raw_data_store.read(uid)
 
 async def get_char_name_from_local(char_name: str, role_data: dict):
     for char_id, role_info in role_data.items():
@@ -199,10 +184,6 @@ async def change_sonata_and_first_echo(bot: Bot, char_id: int, sonata_a: str | N
 
 
 async def get_local_all_role_info(uid: str) -> tuple[bool, dict]:
-    _dir = PLAYER_PATH / uid
-    _dir.mkdir(parents=True, exist_ok=True)
-    path = _dir / "rawData.json"
-
     # 初始化标准数据结构
     role_data = {
         'roleList': [],
@@ -210,25 +191,16 @@ async def get_local_all_role_info(uid: str) -> tuple[bool, dict]:
         'showToGuest': False
     }
     
-    if not path.exists():
-        return False, role_data
-        
-    try:
-        async with aiofiles.open(path, mode="r", encoding="utf-8") as f:
-            raw_data = json.loads(await f.read())
-            
-            # 正确解析角色列表
-            if isinstance(raw_data, list):
-                for item in raw_data:
-                    if "role" in item:
-                        role_data["roleList"].append(item["role"])
-            
-        return True, role_data
-    except Exception as e:
-        logger.error(f"[鸣潮] 数据解析失败 {path}:", e)
-        path.unlink(missing_ok=True)
+    if not raw_data_store.exists(uid):
         return False, role_data
 
+    raw_data = await raw_data_store.read(uid)
+    for item in raw_data.values():
+        if "role" in item:
+            role_data["roleList"].append(item["role"])
+
+    return True, role_data
+
 
 
 async def change_weapon_resonLevel(waves_id: str, char: str, reson_level: int):
@@ -26,7 +26,7 @@ from ..wutheringwaves_config import PREFIX
 
 
 async def ann_list_card() -> bytes:
-    ann_list = await waves_api.get_ann_list()
+    ann_list = await waves_api.get_ann_list(True)
     if not ann_list:
         raise Exception("获取游戏公告失败,请检查接口是否正常")
 
@@ -1,41 +1,28 @@
 
-import json
-import aiofiles
 from typing import  List, Union
 
 from gsuid_core.logger import logger
 
-from ..utils.resource.RESOURCE_PATH import PLAYER_PATH
-from ..utils.util import async_func_lock
+from ..utils.char_info_utils import invalidate_role_detail_cache
+from ..utils.rank_index import get_raw_data_stamp, remove_rank_index
+from ..utils.raw_data_store import raw_data_store
 
 
-@async_func_lock(keys=["uid"])
 async def delete_char_detail(
     uid: str,
     delete_type: Union[str, List[str]] = "all",
 ) -> str:
-    _dir = PLAYER_PATH / uid
-    _dir.mkdir(parents=True, exist_ok=True)
-    path = _dir / "rawData.json"
+    async with raw_data_store.lock(uid):
+        return await _delete_char_detail(uid, delete_type)
 
+
+async def _delete_char_detail(
+    uid: str,
+    delete_type: Union[str, List[str]] = "all",
+) -> str:
     # 读取现有数据
-    old_data = {}
-    if path.exists():
-        try:
-            async with aiofiles.open(path, mode="r", encoding="utf-8") as f:
-                content = await f.read()
-                if content.strip():  # 确保文件不为空
-                    old = json.loads(content)
-                    old_data = {d["role"]["roleId"]: d for d in old}
-        except Exception as e:
-            logger.exception(f"读取角色数据失败 {path}: {e}")
-            # 只有在文件损坏时才删除
-            try:
-                path.unlink(missing_ok=True)
-                return "角色数据文件损坏，已删除，请重新添加角色\n"
-            except Exception as unlink_error:
-                logger.error(f"删除损坏文件失败 {path}: {unlink_error}")
-            return "读取角色数据失败，请稍后再试\n"
+    old_stamp = get_raw_data_stamp(uid)
+    old_data = await raw_data_store.read(uid)
 
     # 记录原始数据长度和内容（用于比较）
     original_count = len(old_data)
@@ -76,8 +63,19 @@ async def delete_char_detail(
 
     # 保存更新后的数据
     try:
-        async with aiofiles.open(path, "w", encoding="utf-8") as file:
-            await file.write(json.dumps(save_data, ensure_ascii=False, indent=2))
+        deleted_role_ids = [
+            role_id
+            for role_id in original_role_ids
+            if str(role_id) not in remaining_role_ids
+        ]
+        await raw_data_store.write(
+            uid,
+            {d["role"]["roleId"]: d for d in save_data},
+            [],
+            deleted_role_ids,
+        )
+        invalidate_role_detail_cache(uid)
+        await remove_rank_index(uid, deleted_role_ids, old_stamp)
         logger.info(f"成功删除角色数据，UID: {uid}, 操作: {delete_type}")
         
         # 计算删除的数量
@@ -88,5 +86,6 @@ async def delete_char_detail(
             return f"删除成功，共删除了{deleted_count}个角色\n"
             
     except Exception as e:
-        logger.exception(f"保存角色数据失败 {path}: {e}")
+        invalidate_role_detail_cache(uid)
+        logger.exception(f"保存角色数据失败 {uid}: {e}")
         return "删除角色失败，请稍后再试\n"
@@ -15,7 +15,6 @@ from gsuid_core.utils.image.image_tools import crop_center_img, get_qq_avatar
 from ..utils import hint
 from ..utils.api.model import (
     AccountBaseInfo,
-    OnlineRoleList,
     RoleDetailData,
     WeaponData,
 )
@@ -79,6 +78,7 @@ from ..utils.image import (
     get_weapon_type,
 )
 from ..utils.name_convert import alias_to_char_name, char_name_to_char_id
+from ..utils.online_catalog import online_role_catalog
 from ..utils.resource.constant import (
     ATTRIBUTE_ID_MAP,
     DEAFAULT_WEAPON_ID,
@@ -651,12 +651,9 @@ async def draw_char_detail_img(
         if waves_api.is_net(uid):
             ck = await waves_api.get_waves_random_cookie(uid, user_id)
         if ck:
-            online_list = await waves_api.get_online_list_role(ck)
-            if online_list.success and online_list.data:
-                online_list_role_model = OnlineRoleList.model_validate(online_list.data)
-                online_role_map = {str(i.roleId): i for i in online_list_role_model}
-                if char_id in online_role_map:
-                    is_online_user = True
+            online_role_map = await online_role_catalog.get(ck)
+            if isinstance(online_role_map, dict) and char_id in online_role_map:
+                is_online_user = True
 
     # 账户数据
     if waves_id:
@@ -697,14 +694,14 @@ async def draw_char_detail_img(
     oneRank: Optional[OneRankResponse] = None
     enemy_detail: Optional[EnemyDetailData] = EnemyDetailData()
     if change_list_regex:
+        # 角色数据可能来自面板缓存，在副本上修改
         temp = copy.deepcopy(role_detail)
         try:
             role_detail, change_command = await change_role_detail(
-                uid, ck, role_detail, enemy_detail, change_list_regex
+                uid, ck, temp, enemy_detail, change_list_regex
             )
         except Exception as e:
             logger.exception("角色数据转换错误", e)
-            role_detail = temp
     else:
         if not is_limit_query and not waves_api.is_net(uid):
             # 非极限与国际服用户查询时，获取评分排名
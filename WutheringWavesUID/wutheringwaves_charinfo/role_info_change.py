@@ -42,6 +42,8 @@ async def get_remote_role_detail_info(
             (role for role in gen_temp if str(role.role.roleId) in find_char_id),
             None,
         )
+        if role_detail_info:
+            role_detail_info = role_detail_info.model_copy(deep=True)
 
     if not role_detail_info:
         for char_id in find_char_id:
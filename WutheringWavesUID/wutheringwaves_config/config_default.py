@@ -184,15 +184,128 @@ CONFIG_DEFAULT: Dict[str, GSC] = {
     ),
     "RefreshCardConcurrency": GsIntConfig(
         "刷新角色面板并发数",
-        "刷新角色面板并发数",
+        "单个用户刷新角色面板的并发数",
         10,
         50,
     ),
+    "RefreshGlobalConcurrency": GsIntConfig(
+        "刷新角色面板全局并发上限（0为不限制）",
+        "所有用户刷新角色面板的总并发数，超出时按用户公平排队",
+        0,
+        200,
+    ),
+    "RefreshGroupConcurrency": GsIntConfig(
+        "单群刷新角色面板并发上限（0为不限制）",
+        "同一群内所有用户刷新角色面板的总并发数",
+        0,
+        200,
+    ),
     "UseGlobalSemaphore": GsBoolConfig(
         "开启后刷新角色面板并发数为全局共享",
-        "开启后刷新角色面板并发数为全局共享",
+        "开启后全局并发上限不超过刷新角色面板并发数",
         False,
     ),
+    "RefreshSkipUnchanged": GsBoolConfig(
+        "刷新全部面板时跳过未变化角色",
+        "根据角色列表的等级/突破/共鸣链判断，未变化的角色直接使用本地面板，不再请求详情；仅更换声骸/武器/技能的角色需单独刷新",
+        False,
+    ),
+    "RawDataFormat": GsStrConfig(
+        "角色面板存储格式",
+        "json兼容旧版与外部工具；msgpack体积更小，刷新时只追加变化的角色。切换后启动时自动转换",
+        "json",
+        options=["json", "msgpack"],
+    ),
+    "GachaLogFormat": GsStrConfig(
+        "抽卡记录存储格式",
+        "json兼容旧版与外部工具；msgpack体积更小，更新时只追加新抽卡，备份只记录位置。切换后下次更新时转换",
+        "json",
+        options=["json", "msgpack"],
+    ),
+    "RoleDetailCacheSize": GsIntConfig(
+        "角色面板缓存uid数量（0为关闭）",
+        "内存中缓存已解析角色面板的uid数量，排行等批量查询可避免重复读取",
+        2000,
+        100000,
+    ),
+    "RankCalcWorkers": GsIntConfig(
+        "排行计算进程数（0为不使用进程池）",
+        "排行评分与伤害计算使用的子进程数，避免大量计算阻塞机器人",
+        0,
+        32,
+    ),
+    "HttpMaxConnections": GsIntConfig(
+        "共享HTTP连接池总连接数（重启生效）",
+        "上传面板、排行等接口共用的HTTP连接池总连接数",
+        100,
+        1000,
+    ),
+    "HttpMaxConnPerHost": GsIntConfig(
+        "共享HTTP连接池单域名并发数（重启生效）",
+        "同一域名同时进行的请求数上限",
+        10,
+        200,
+    ),
+    "HttpMaxKeepalive": GsIntConfig(
+        "共享HTTP连接池保持的空闲连接数（重启生效）",
+        "所有域名合计保持的空闲长连接数上限",
+        20,
+        1000,
+    ),
+    "UploadQueueWorkers": GsIntConfig(
+        "上传队列并发数（重启生效）",
+        "面板、深渊、冥海记录上传同时进行的任务数",
+        4,
+        32,
+    ),
+    "UploadQueueMaxSize": GsIntConfig(
+        "上传队列长度上限",
+        "超出上限的上传任务暂存到磁盘，空闲时再上传",
+        1000,
+        100000,
+    ),
+    "UploadRetryTimes": GsIntConfig(
+        "上传失败重试次数",
+        "上传失败重试次数",
+        3,
+        10,
+    ),
+    "CookieValidCacheTime": GsIntConfig(
+        "CK验证缓存时间(秒，0为关闭)",
+        "CK验证通过后在该时间内不再重复校验登录状态",
+        300,
+        3600,
+    ),
+    "PublicCkPoolSize": GsIntConfig(
+        "公共ck池数量",
+        "定时预先验证的公共ck数量，查询时从中轮流借用",
+        10,
+        100,
+    ),
+    "PublicCkRateLimit": GsIntConfig(
+        "单个公共ck每分钟最多使用次数(0为不限制)",
+        "单个公共ck每分钟最多使用次数(0为不限制)",
+        20,
+        600,
+    ),
+    "KuroRequestRate": GsIntConfig(
+        "库洛接口每秒请求数上限(0为不限制)",
+        "按域名与接口路径分别限流，被限流时自动降低速率",
+        0,
+        1000,
+    ),
+    "GachaLogRate": GsIntConfig(
+        "抽卡记录每秒请求数上限(0为不限制)",
+        "所有用户共享，请求失败时自动降低速率",
+        2,
+        20,
+    ),
+    "GachaLogConcurrency": GsIntConfig(
+        "更新抽卡记录时同时请求的卡池数",
+        "更新抽卡记录时同时请求的卡池数",
+        3,
+        9,
+    ),
     "CaptchaProvider": GsStrConfig(
         "验证码提供方（重启生效）",
         "验证码提供方（重启生效）",
@@ -1,4 +1,5 @@
 import copy
+import asyncio
 from pathlib import Path
 from typing import Dict, List
 
@@ -11,9 +12,7 @@ from ..utils.api.model import (
     BatchRoleCostResponse,
     CultivateCost,
     OnlineRole,
-    OnlineRoleList,
     OnlineWeapon,
-    OnlineWeaponList,
     OwnedRoleList,
     RoleCostDetail,
     RoleCultivateStatusList,
@@ -40,6 +39,7 @@ from ..utils.name_convert import (
     char_name_to_char_id,
     weapon_name_to_weapon_id,
 )
+from ..utils.online_catalog import online_role_catalog, online_weapon_catalog
 from ..utils.refresh_char_detail import refresh_char
 from ..utils.resource.constant import SPECIAL_CHAR
 from ..utils.resource.download_file import get_material_img
@@ -149,24 +149,25 @@ async def calc_develop_cost(ev: Event, develop_list: List[str], is_flush=False):
     if len(alias_char_ids) > 2:
         return "暂不支持查询两个以上角色养成"
 
-    refresh_data = await waves_api.calculator_refresh_data(uid, token)
-    if not refresh_data.success:
-        return "养成刷新失败"
-
-    # 获取所有角色
-    online_list_role = await waves_api.get_online_list_role(token)
-    if not online_list_role.success or isinstance(online_list_role.data, str):
-        return online_list_role.throw_msg()
-    online_list_role_model = OnlineRoleList.model_validate(online_list_role.data)
-    online_role_map = {str(i.roleId): i for i in online_list_role_model}
-    # 获取所有武器
-    online_list_weapon = await waves_api.get_online_list_weapon(token)
-    if not online_list_weapon.success or isinstance(online_list_weapon.data, str):
-        return online_list_weapon.throw_msg()
-    online_list_weapon_model = OnlineWeaponList.model_validate(online_list_weapon.data)
-    online_weapon_map = {str(i.weaponId): i for i in online_list_weapon_model}
-    # 获取拥有的角色
-    owned_role = await waves_api.get_owned_role(uid, token)
+    async def get_owned_role():
+        # 拥有的角色依赖养成数据刷新
+        refresh_data = await waves_api.calculator_refresh_data(uid, token)
+        if not refresh_data.success:
+            return "养成刷新失败"
+        return await waves_api.get_owned_role(uid, token)
+
+    # 图鉴为全局共享缓存，与用户数据并发获取
+    owned_role, online_role_map, online_weapon_map = await asyncio.gather(
+        get_owned_role(),
+        online_role_catalog.get(token),
+        online_weapon_catalog.get(token),
+    )
+    if isinstance(owned_role, str):
+        return owned_role
+    if isinstance(online_role_map, str):
+        return online_role_map
+    if isinstance(online_weapon_map, str):
+        return online_weapon_map
     if not owned_role.success or isinstance(owned_role.data, str):
         return owned_role.throw_msg()
     owned_char_ids_model = OwnedRoleList.model_validate(owned_role.data)
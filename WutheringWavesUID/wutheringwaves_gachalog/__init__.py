@@ -11,13 +11,20 @@ from ..utils.database.models import WavesBind
 from ..utils.error_reply import ERROR_CODE, WAVES_CODE_103
 from ..wutheringwaves_config import PREFIX
 from .draw_gachalogs import draw_card, draw_card_help
-from .get_gachalogs import export_gachalogs, import_gachalogs, save_gachalogs
+from .gacha_log_store import gacha_log_store
+from .get_gachalogs import (
+    export_gachalogs,
+    import_gachalogs,
+    save_gachalogs,
+    restore_gachalogs,
+)
 
 sv_gacha_log = SV("waves抽卡记录")
 sv_gacha_help_log = SV("waves抽卡记录帮助")
 sv_get_gachalog_by_link = SV("waves导入抽卡链接", area="DIRECT")
 sv_import_gacha_log = SV("waves导入抽卡记录", area="DIRECT")
 sv_export_json_gacha_log = SV("waves导出抽卡记录")
+sv_restore_gacha_log = SV("waves恢复抽卡记录", area="DIRECT")
 
 ERROR_MSG_NOTIFY = f"请给出正确的抽卡记录链接, 请重新发送【{PREFIX}导入抽卡链接 链接】，抽卡链接获取帮助请发送【{PREFIX}抽卡帮助】"
 
@@ -92,9 +99,7 @@ async def send_gacha_log_card_info(bot: Bot, ev: Event):
             return await bot.send(ERROR_CODE[WAVES_CODE_103])
     else:
         # 检查目标UID是否有抽卡记录
-        from ..utils.resource.RESOURCE_PATH import PLAYER_PATH
-        gacha_log_path = PLAYER_PATH / str(target_uid) / "gacha_logs.json"
-        if not gacha_log_path.exists():
+        if not gacha_log_store.exists(str(target_uid)):
             return await bot.send(f"[鸣潮] UID{target_uid} 还没有抽卡记录噢!")
 
     im = await draw_card(target_uid, ev)
@@ -136,3 +141,36 @@ async def send_export_gacha_info(bot: Bot, ev: Event):
         await bot.send("✅导出抽卡记录成功！")
     else:
         await bot.send("导出抽卡记录失败...")
+
+
+@sv_restore_gacha_log.on_fullmatch("抽卡记录备份")
+async def send_gacha_log_backups(bot: Bot, ev: Event):
+    uid = await WavesBind.get_uid_by_game(ev.user_id, ev.bot_id)
+    if not uid:
+        return await bot.send(ERROR_CODE[WAVES_CODE_103])
+
+    backups = await gacha_log_store.backups(uid)
+    if not backups:
+        return await bot.send(f"[鸣潮] UID{uid} 还没有抽卡记录备份噢!")
+
+    type_map = {"import": "导入前", "update": "修正前", "restore": "恢复前"}
+    im = [f"UID{uid} 抽卡记录备份:"]
+    for i, backup in enumerate(backups, 1):
+        type = type_map.get(backup["type"], backup["type"])
+        im.append(f"{i}. {backup['time']} {type}")
+    im.append(f"使用【{PREFIX}恢复抽卡记录 序号】恢复对应备份")
+    await bot.send("\n".join(im))
+
+
+@sv_restore_gacha_log.on_command("恢复抽卡记录")
+async def restore_gacha_log(bot: Bot, ev: Event):
+    uid = await WavesBind.get_uid_by_game(ev.user_id, ev.bot_id)
+    if not uid:
+        return await bot.send(ERROR_CODE[WAVES_CODE_103])
+
+    backup_id = ev.text.strip()
+    if not backup_id.isdigit():
+        return await bot.send(
+            f"请发送【{PREFIX}恢复抽卡记录 序号】，序号可通过【{PREFIX}抽卡记录备份】查看"
+        )
+    await bot.send(await restore_gachalogs(uid, int(backup_id)))
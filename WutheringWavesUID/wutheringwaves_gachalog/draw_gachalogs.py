@@ -1,11 +1,9 @@
-import json
 import os
 import random
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List
+from typing import List
 
-import aiofiles
 from PIL import Image, ImageDraw
 
 from gsuid_core.models import Event
@@ -35,9 +33,9 @@ from ..utils.image import (
     get_waves_bg,
 )
 from ..utils.resource.constant import NORMAL_LIST
-from ..utils.resource.RESOURCE_PATH import PLAYER_PATH
 from ..utils.waves_api import waves_api
 from ..wutheringwaves_config import PREFIX
+from .gacha_log_store import gacha_log_store
 
 TEXT_PATH = Path(__file__).parent / "texture2d"
 HOMO_TAG = ["非到极致", "运气不好", "平稳保底", "小欧一把", "欧狗在此"]
@@ -144,13 +142,10 @@ async def draw_card_help():
 
 async def draw_card(uid: str, ev: Event):
     # 获取数据
-    gacha_log_path = PLAYER_PATH / str(uid) / "gacha_logs.json"
-    if not gacha_log_path.exists():
+    if not gacha_log_store.exists(str(uid)):
         return f"[鸣潮] 你还没有抽卡记录噢!\n 请发送 {PREFIX}导入抽卡链接 后重试!"
-    async with aiofiles.open(gacha_log_path, "r", encoding="UTF-8") as f:
-        raw_data: Dict = json.loads(await f.read())
 
-    gachalogs = raw_data["data"]
+    gachalogs = await gacha_log_store.read(str(uid))
     title_num = len([1 for i in gachalogs.keys() if "新手" not in i])
 
     total_data = {}
@@ -0,0 +1,350 @@
+import json
+import asyncio
+import shutil
+import weakref
+from pathlib import Path
+from datetime import datetime
+from typing import Any, Dict, List, Tuple, Optional
+
+import aiofiles
+from msgspec import msgpack
+from gsuid_core.logger import logger
+
+from ..wutheringwaves_config import WutheringWavesConfig
+from ..utils.resource.RESOURCE_PATH import PLAYER_PATH
+from ..utils.raw_data_store import (
+    frame_size,
+    iter_frames,
+    append_file,
+    atomic_write,
+    encode_frame,
+)
+
+GACHA_LOG_JSON = "gacha_logs.json"
+GACHA_LOG_LOG = "gacha_logs.msgpack"
+GACHA_LOG_INDEX = "gacha_logs.index.json"
+# 备份文件名: {类型}_gacha_logs_{时间}[_{日志长度或序号}].json
+GACHA_LOG_BACKUP = "_gacha_logs_"
+BACKUP_TIME_FORMAT = "%Y-%m-%d.%H%M%S"
+SNAPSHOT_TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+# 日志大小超过当前数据的该倍数时压缩
+COMPACT_RATIO = 3
+
+# 列式存储的字段，与 GachaLog 一致
+COLUMNS = (
+    "cardPoolType",
+    "resourceId",
+    "qualityLevel",
+    "resourceType",
+    "name",
+    "count",
+    "time",
+)
+
+# 记录类型
+# 新抽卡: 插入到卡池记录最前(记录按时间倒序)
+KIND_PREPEND = 0
+# 替换卡池全部记录
+KIND_REPLACE = 1
+
+_encoder = msgpack.Encoder()
+_decoder = msgpack.Decoder()
+
+
+def get_gacha_log_format() -> str:
+    return WutheringWavesConfig.get_config("GachaLogFormat").data or "json"
+
+
+def _encode_json(uid: str, pools: Dict[str, List[Dict]]) -> bytes:
+    result: Dict[str, Any] = {
+        "uid": uid,
+        "data_time": datetime.now().strftime("%Y-%m-%d %H-%M-%S"),
+    }
+    for name, logs in pools.items():
+        result[name] = len(logs)
+    result["data"] = pools
+    return json.dumps(result, ensure_ascii=False).encode("utf-8")
+
+
+def _encode_pool(kind: int, gacha_name: str, logs: List[Dict]) -> bytes:
+    columns = [[log[k] for log in logs] for k in COLUMNS]
+    return encode_frame(_encoder.encode((kind, gacha_name, columns)))
+
+
+def _decode_log(data: bytes) -> Tuple[Dict[str, List[Dict]], int]:
+    """回放日志，返回 (卡池 -> 抽卡记录, 有效长度)"""
+    batches: Dict[str, List[List[Dict]]] = {}
+    offset = 0
+    for frame in iter_frames(data):
+        kind, gacha_name, columns = _decoder.decode(frame)
+        logs = [dict(zip(COLUMNS, row)) for row in zip(*columns)]
+        if kind == KIND_REPLACE or gacha_name not in batches:
+            batches[gacha_name] = [logs]
+        else:
+            batches[gacha_name].append(logs)
+        offset += frame_size(frame)
+    pools = {
+        name: [log for logs in reversed(items) for log in logs]
+        for name, items in batches.items()
+    }
+    return pools, offset
+
+
+def _backup_name(type: str, backup_time: datetime, tag: str = "") -> str:
+    name = f"{type}{GACHA_LOG_BACKUP}{backup_time.strftime(BACKUP_TIME_FORMAT)}"
+    return f"{name}_{tag}.json" if tag else f"{name}.json"
+
+
+def _make_index(
+    pools: Dict[str, List[Dict]], size: int, snapshots: List[Dict]
+) -> Dict[str, Any]:
+    return {
+        "data_time": datetime.now().strftime("%Y-%m-%d %H-%M-%S"),
+        "size": size,
+        "count": {name: len(logs) for name, logs in pools.items()},
+        "latest": {name: logs[0] if logs else None for name, logs in pools.items()},
+        "snapshots": snapshots,
+    }
+
+
+class GachaLogStore:
+    """按uid存储抽卡记录
+
+    - json: 兼容旧版的 gacha_logs.json，每次整体原子写入，备份为整个文件的副本
+    - msgpack: gacha_logs.msgpack，每条记录为一个卡池的一批抽卡(按列存储)，
+      更新时只追加新抽卡；gacha_logs.index.json 记录日志长度、各卡池数量与最新一条，
+      备份只记录当时的日志长度，回放到该长度即为备份时的数据。
+      日志需要整体重写(压缩、与索引不一致、切换格式)时，先将这些备份转为 json 备份文件
+
+    读取无需加锁；读取-修改-写入需在 `lock(uid)` 内进行。
+    切换格式后旧格式文件在下次写入时迁移
+    """
+
+    def __init__(self, base: Path = PLAYER_PATH):
+        self.base = base
+        self._locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = (
+            weakref.WeakValueDictionary()
+        )
+
+    def lock(self, uid: str) -> asyncio.Lock:
+        lock = self._locks.get(uid)
+        if lock is None:
+            lock = asyncio.Lock()
+            self._locks[uid] = lock
+        return lock
+
+    def _paths(self, uid: str) -> Tuple[Path, Path]:
+        """(当前格式文件, 另一格式文件)"""
+        _dir = self.base / uid
+        if get_gacha_log_format() == "msgpack":
+            return _dir / GACHA_LOG_LOG, _dir / GACHA_LOG_JSON
+        return _dir / GACHA_LOG_JSON, _dir / GACHA_LOG_LOG
+
+    def exists(self, uid: str) -> bool:
+        return any(path.exists() for path in self._paths(uid))
+
+    async def _read_index(self, uid: str) -> Optional[Dict[str, Any]]:
+        path = self.base / uid / GACHA_LOG_INDEX
+        try:
+            async with aiofiles.open(path, "r", encoding="UTF-8") as f:
+                return json.loads(await f.read())
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"[鸣潮] 读取抽卡记录索引失败 {path}: {e}")
+            return None
+
+    async def _write_index(self, uid: str, index: Dict[str, Any]):
+        path = self.base / uid / GACHA_LOG_INDEX
+        data = json.dumps(index, ensure_ascii=False).encode("utf-8")
+        await asyncio.to_thread(atomic_write, path, data)
+
+    async def _current_index(self, uid: str) -> Optional[Dict[str, Any]]:
+        """msgpack 格式下与日志一致的索引"""
+        path, _ = self._paths(uid)
+        if path.name != GACHA_LOG_LOG or not path.exists():
+            return None
+        index = await self._read_index(uid)
+        if index is None or index["size"] != path.stat().st_size:
+            return None
+        return index
+
+    async def _read_path(
+        self, path: Path, offset: Optional[int] = None
+    ) -> Tuple[Dict[str, List[Dict]], int]:
+        async with aiofiles.open(path, mode="rb") as f:
+            if path.name == GACHA_LOG_JSON:
+                data = await f.read()
+                return json.loads(data)["data"], len(data)
+            data = await f.read() if offset is None else await f.read(offset)
+        return _decode_log(data)
+
+    async def read(
+        self, uid: str, offset: Optional[int] = None
+    ) -> Dict[str, List[Dict]]:
+        """读取各卡池抽卡记录(按时间倒序)，文件不存在时为空
+
+        offset 为 msgpack 格式下备份时的日志长度
+        """
+        for path in self._paths(uid):
+            if path.exists():
+                return (await self._read_path(path, offset))[0]
+        return {}
+
+    async def latest(self, uid: str) -> Optional[Dict[str, Optional[Dict]]]:
+        """msgpack 格式下索引中各卡池最新一条抽卡，索引不可用时为 None"""
+        index = await self._current_index(uid)
+        return index["latest"] if index else None
+
+    async def backups(self, uid: str) -> List[Dict]:
+        """全部备份，按时间倒序
+
+        msgpack 日志内的备份带 offset，备份文件带 file
+        """
+        _dir = self.base / uid
+        result: List[Dict] = []
+        index = await self._current_index(uid)
+        if index:
+            result.extend(index["snapshots"])
+        for path in _dir.glob(f"*{GACHA_LOG_BACKUP}*.json"):
+            type, _, time = path.stem.partition(GACHA_LOG_BACKUP)
+            time = time.partition("_")[0]
+            try:
+                backup_time = datetime.strptime(time, BACKUP_TIME_FORMAT)
+            except ValueError:
+                continue
+            result.append(
+                {
+                    "type": type,
+                    "time": backup_time.strftime(SNAPSHOT_TIME_FORMAT),
+                    "file": path.name,
+                }
+            )
+        result.sort(key=lambda i: i["time"], reverse=True)
+        return result
+
+    async def read_backup(self, uid: str, backup: Dict) -> Dict[str, List[Dict]]:
+        """读取 `backups` 返回的某个备份"""
+        _dir = self.base / uid
+        if "offset" in backup:
+            return (await self._read_path(_dir / GACHA_LOG_LOG, backup["offset"]))[0]
+        async with aiofiles.open(_dir / backup["file"], "rb") as f:
+            return json.loads(await f.read())["data"]
+
+    async def backup(self, uid: str, type: str):
+        """备份当前抽卡记录"""
+        path, other = self._paths(uid)
+        now = datetime.now()
+        index = await self._current_index(uid)
+        if index is not None:
+            index["snapshots"].append(
+                {
+                    "type": type,
+                    "time": now.strftime(SNAPSHOT_TIME_FORMAT),
+                    "offset": index["size"],
+                }
+            )
+            await self._write_index(uid, index)
+            return
+        source = path if path.exists() else other
+        if not source.exists():
+            return
+        # 同一秒内的多次备份以序号区分
+        backup_path = source.with_name(_backup_name(type, now))
+        n = 0
+        while backup_path.exists():
+            n += 1
+            backup_path = source.with_name(_backup_name(type, now, str(n)))
+        if source.name == GACHA_LOG_JSON:
+            await asyncio.to_thread(shutil.copyfile, source, backup_path)
+        else:
+            pools, _ = await self._read_path(source)
+            data = _encode_json(uid, pools)
+            await asyncio.to_thread(atomic_write, backup_path, data)
+
+    async def _dump_snapshots(self, uid: str):
+        """日志整体重写或删除前，将其中的备份转为 json 备份文件"""
+        path = self.base / uid / GACHA_LOG_LOG
+        index = await self._read_index(uid)
+        if not index or not path.exists():
+            return
+        size = path.stat().st_size
+        for snapshot in index["snapshots"]:
+            backup_time = datetime.strptime(snapshot["time"], SNAPSHOT_TIME_FORMAT)
+            # 文件名带日志长度，同一秒内的多个备份各自保留
+            backup_path = path.with_name(
+                _backup_name(snapshot["type"], backup_time, str(snapshot["offset"]))
+            )
+            if backup_path.exists():
+                # 之前已转换过的同一备份
+                continue
+            if snapshot["offset"] > size:
+                logger.warning(f"[鸣潮] 抽卡记录备份已损坏 {uid}: {snapshot}")
+                continue
+            pools, _ = await self._read_path(path, snapshot["offset"])
+            data = _encode_json(uid, pools)
+            await asyncio.to_thread(atomic_write, backup_path, data)
+
+    async def append(self, uid: str, added: Dict[str, List[Dict]]) -> bool:
+        """msgpack 格式下只追加各卡池新增的抽卡(按时间倒序)，根据索引更新数量与最新一条，
+        无需回放日志
+
+        索引不可用时返回 False，此时需读取全部记录后调用 `write`
+        """
+        index = await self._current_index(uid)
+        if index is None:
+            return False
+        path, _ = self._paths(uid)
+        data = b"".join(
+            _encode_pool(KIND_PREPEND, name, logs)
+            for name, logs in added.items()
+            if logs
+        )
+        if data:
+            await asyncio.to_thread(append_file, path, data)
+        for name, logs in added.items():
+            if logs:
+                index["count"][name] = index["count"].get(name, 0) + len(logs)
+                index["latest"][name] = logs[0]
+        index["size"] += len(data)
+        index["data_time"] = datetime.now().strftime("%Y-%m-%d %H-%M-%S")
+        await self._write_index(uid, index)
+        return True
+
+    async def write(self, uid: str, pools: Dict[str, List[Dict]]):
+        """写入各卡池全部抽卡记录
+
+        msgpack 格式下追加各卡池的全部记录，之前的备份仍可回放；
+        日志超过当前数据的 COMPACT_RATIO 倍时压缩为当前数据
+        """
+        path, other = self._paths(uid)
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        if path.name == GACHA_LOG_JSON:
+            await asyncio.to_thread(atomic_write, path, _encode_json(uid, pools))
+        else:
+            data = b"".join(
+                _encode_pool(KIND_REPLACE, name, logs) for name, logs in pools.items()
+            )
+            index = await self._current_index(uid)
+            if index is not None and index["size"] < len(data) * (COMPACT_RATIO - 1):
+                await asyncio.to_thread(append_file, path, data)
+                index = _make_index(
+                    pools, index["size"] + len(data), index["snapshots"]
+                )
+            else:
+                # 首次写入、日志与索引不一致或日志过大时整体重写
+                await self._dump_snapshots(uid)
+                await asyncio.to_thread(atomic_write, path, data)
+                index = _make_index(pools, len(data), [])
+            await self._write_index(uid, index)
+
+        if other.exists():
+            if other.name == GACHA_LOG_LOG:
+                await self._dump_snapshots(uid)
+                (other.parent / GACHA_LOG_INDEX).unlink(missing_ok=True)
+            other.unlink(missing_ok=True)
+            logger.info(f"[鸣潮] 抽卡记录已迁移为 {get_gacha_log_format()}: {uid}")
+
+
+gacha_log_store = GachaLogStore()
@@ -2,22 +2,26 @@ import asyncio
 import base64
 import copy
 import json
+import time
+import textwrap
 from datetime import datetime
-from pathlib import Path
 from typing import Dict, List, Optional, Tuple, Union
 
 import aiofiles
-import msgspec
 
 from gsuid_core.logger import logger
 from gsuid_core.models import Event
 
 from ..utils.api.model import GachaLog
+from ..utils.api.rate_limit import EndpointLimiter
+from ..utils.api.request_util import ThrowMsg, KuroApiResp
 from ..utils.database.models import WavesUser
+from ..utils.error_reply import WAVES_CODE_999
 from ..utils.resource.RESOURCE_PATH import PLAYER_PATH
 from ..utils.waves_api import waves_api
 from ..version import WutheringWavesUID_version
-from ..wutheringwaves_config import PREFIX
+from ..wutheringwaves_config import PREFIX, WutheringWavesConfig
+from .gacha_log_store import gacha_log_store
 from .model import WWUIDGacha
 from .model_for_waves_plugin import WavesPluginGacha
 
@@ -48,51 +52,128 @@ gachalogs_history_meta = {
 }
 
 ERROR_MSG_INVALID_LINK = "当前抽卡链接已经失效，请重新导入抽卡链接"
+ERROR_MSG_FETCH_FAILED = "获取【{}】抽卡记录失败：{}\n请稍后再试"
+
+
+def _log_key(log: GachaLog) -> Tuple:
+    return (
+        log.cardPoolType,
+        log.resourceId,
+        log.qualityLevel,
+        log.resourceType,
+        log.name,
+        log.count,
+        log.time,
+    )
 
 
-def find_length(A, B) -> int:
-    """数组最长公共子串长度"""
-    n, m = len(A), len(B)
-    dp = [[0] * (m + 1) for _ in range(n + 1)]
-    ans = 0
-    for i in range(n - 1, -1, -1):
-        for j in range(m - 1, -1, -1):
-            dp[i][j] = dp[i + 1][j + 1] + 1 if A[i] == B[j] else 0
-            ans = max(ans, dp[i][j])
-    return ans
+def _encode_logs(*logs_list: List[GachaLog]) -> List[List[int]]:
+    """将抽卡记录按全部字段编码为整数，相同记录编码相同"""
+    ids: Dict[Tuple, int] = {}
+    return [[ids.setdefault(_log_key(i), len(ids)) for i in logs] for logs in logs_list]
 
 
-# 找到两个数组中最长公共子串的下标
-def find_longest_common_subarray_indices(
-    a: List[GachaLog], b: List[GachaLog]
-) -> Optional[Tuple[Tuple[int, int], Tuple[int, int]]]:
-    n, m = len(a), len(b)
-    dp = [[0] * (m + 1) for _ in range(n + 1)]
-    length = 0
-    a_end = b_end = 0
-
-    for i in range(n - 1, -1, -1):
-        for j in range(m - 1, -1, -1):
-            if a[i] == b[j]:
-                dp[i][j] = dp[i + 1][j + 1] + 1
-                if dp[i][j] > length:
-                    length = dp[i][j]
-                    a_end = i + length - 1
-                    b_end = j + length - 1
-            else:
-                dp[i][j] = 0
+class _SuffixAutomaton:
+    """序列的后缀自动机，用于线性时间求最长公共子串"""
 
+    def __init__(self, seq: List[int]):
+        self.next: List[Dict[int, int]] = [{}]
+        self.link = [-1]
+        self.length = [0]
+        # 状态对应子串在 seq 中最靠后的结束位置
+        self.last_pos = [-1]
+
+        last = 0
+        for pos, c in enumerate(seq):
+            cur = self._add_state(self.length[last] + 1, -1, {}, pos)
+            p = last
+            while p != -1 and c not in self.next[p]:
+                self.next[p][c] = cur
+                p = self.link[p]
+            if p == -1:
+                self.link[cur] = 0
+            else:
+                q = self.next[p][c]
+                if self.length[p] + 1 == self.length[q]:
+                    self.link[cur] = q
+                else:
+                    clone = self._add_state(
+                        self.length[p] + 1,
+                        self.link[q],
+                        dict(self.next[q]),
+                        self.last_pos[q],
+                    )
+                    while p != -1 and self.next[p].get(c) == q:
+                        self.next[p][c] = clone
+                        p = self.link[p]
+                    self.link[q] = clone
+                    self.link[cur] = clone
+            last = cur
+
+        # 沿后缀链接向上传递最靠后的结束位置
+        for v in sorted(
+            range(1, len(self.length)), key=self.length.__getitem__, reverse=True
+        ):
+            u = self.link[v]
+            if u > 0 and self.last_pos[v] > self.last_pos[u]:
+                self.last_pos[u] = self.last_pos[v]
+
+    def _add_state(self, length: int, link: int, next: Dict[int, int], pos: int):
+        self.next.append(next)
+        self.link.append(link)
+        self.length.append(length)
+        self.last_pos.append(pos)
+        return len(self.length) - 1
+
+    def longest_common(self, seq: List[int]) -> Tuple[int, int, int]:
+        """与 seq 的最长公共子串 (长度, seq中结束位置, 自动机序列中结束位置)
+
+        长度相同时取 seq 中最靠后的，其次取自动机序列中最靠后的
+        """
+        best = (0, -1, -1)
+        v = length = 0
+        for i, c in enumerate(seq):
+            while v and c not in self.next[v]:
+                v = self.link[v]
+                length = self.length[v]
+            if c in self.next[v]:
+                v = self.next[v][c]
+                length += 1
+            if length and length >= best[0]:
+                best = (length, i, self.last_pos[v])
+        return best
+
+
+def _longest_common_subarray(
+    a: List[int], b: List[int]
+) -> Optional[Tuple[Tuple[int, int], Tuple[int, int]]]:
+    if not a or not b:
+        return None
+    length, a_end, b_end = _SuffixAutomaton(b).longest_common(a)
     if length == 0:
         return None
-
     return (a_end - length + 1, a_end), (b_end - length + 1, b_end)
 
 
-# 根据最长公共子串递归合并两个GachaLog列表，不去重，按time排序
-def merge_gacha_logs_by_common_subarray(
+def find_length(A: List[GachaLog], B: List[GachaLog]) -> int:
+    """数组最长公共子串长度"""
+    if not A or not B:
+        return 0
+    a, b = _encode_logs(A, B)
+    return _SuffixAutomaton(b).longest_common(a)[0]
+
+
+# 找到两个数组中最长公共子串的下标，有多个时取a中最靠后的，其次取b中最靠后的
+def find_longest_common_subarray_indices(
     a: List[GachaLog], b: List[GachaLog]
+) -> Optional[Tuple[Tuple[int, int], Tuple[int, int]]]:
+    return _longest_common_subarray(*_encode_logs(a, b))
+
+
+def _merge_by_common_subarray(
+    a: List[GachaLog], b: List[GachaLog], ka: List[int], kb: List[int]
 ) -> List[GachaLog]:
-    common_indices = find_longest_common_subarray_indices(a, b)
+    common_indices = _longest_common_subarray(ka, kb)
     if not common_indices:
         return sorted(
             a + b,
@@ -102,45 +183,154 @@ def merge_gacha_logs_by_common_subarray(
 
     (a_start, a_end), (b_start, b_end) = common_indices
 
-    prefix = merge_gacha_logs_by_common_subarray(a[:a_start], b[:b_start])
+    prefix = _merge_by_common_subarray(
+        a[:a_start], b[:b_start], ka[:a_start], kb[:b_start]
+    )
     common_subarray = a[a_start : a_end + 1]
-    suffix = merge_gacha_logs_by_common_subarray(a[a_end + 1 :], b[b_end + 1 :])
+    suffix = _merge_by_common_subarray(
+        a[a_end + 1 :], b[b_end + 1 :], ka[a_end + 1 :], kb[b_end + 1 :]
+    )
 
     return prefix + common_subarray + suffix
 
 
+# 根据最长公共子串递归合并两个GachaLog列表，不去重，按time排序
+def merge_gacha_logs_by_common_subarray(
+    a: List[GachaLog], b: List[GachaLog]
+) -> List[GachaLog]:
+    ka, kb = _encode_logs(a, b)
+    return _merge_by_common_subarray(a, b, ka, kb)
+
+
+def get_gacha_log_rate() -> float:
+    return WutheringWavesConfig.get_config("GachaLogRate").data or 0
+
+
+def get_gacha_log_concurrency() -> int:
+    return max(1, WutheringWavesConfig.get_config("GachaLogConcurrency").data or 1)
+
+
+# 抽卡记录接口的请求速率，所有用户共享
+gacha_log_limiter = EndpointLimiter("抽卡记录", get_gacha_log_rate())
+
+
+def count_new_gachalog(old: List[Dict], gacha_log: List[GachaLog]) -> int:
+    """接口返回的记录中新增的数量"""
+    # 返回的记录已全部在本地记录开头时无需计算重叠
+    if gacha_log == [GachaLog(**log) for log in old[: len(gacha_log)]]:
+        return 0
+    return len(gacha_log) - find_length([GachaLog(**log) for log in old], gacha_log)
+
+
+def get_new_gachalog_by_latest(
+    gacha_logs: Dict[str, List[GachaLog]],
+    latest: Dict[str, Optional[Dict]],
+) -> Optional[Dict[str, List[GachaLog]]]:
+    """根据各卡池本地最新一条抽卡计算新增，无需读取全部记录
+
+    某卡池最新一条不在接口返回的记录中时为 None，需与全部记录比较
+    """
+    new = {}
+    for gacha_name, gacha_log in gacha_logs.items():
+        head = latest.get(gacha_name)
+        if head is None or not gacha_log:
+            # 本地没有记录时全部为新增；接口没有返回记录时没有新增
+            new[gacha_name] = gacha_log
+            continue
+        head_log = GachaLog(**head)
+        for i, log in enumerate(gacha_log):
+            if log == head_log:
+                new[gacha_name] = gacha_log[:i]
+                break
+        else:
+            return None
+    return new
+
+
+async def fetch_gachalogs(
+    uid: str,
+    record_id: str,
+    cost: Optional[Dict[str, float]] = None,
+) -> Tuple[Optional[str], Dict[str, List[GachaLog]]]:
+    """并发获取各卡池抽卡记录，cost 中记录各卡池请求耗时"""
+    limiter = gacha_log_limiter
+    limiter.set_max_rate(get_gacha_log_rate())
+    semaphore = asyncio.Semaphore(get_gacha_log_concurrency())
+
+    async def fetch(gacha_name: str, card_pool_type: str):
+        async with semaphore:
+            if not limiter.allow():
+                res = KuroApiResp.err(ThrowMsg.SERVER_BUSY, code=WAVES_CODE_999)
+                return gacha_name, card_pool_type, res
+            try:
+                await limiter.acquire()
+                start = time.perf_counter()
+                res = await waves_api.get_gacha_log(card_pool_type, record_id, uid)
+                if cost is not None:
+                    cost[gacha_name] = time.perf_counter() - start
+                if res.is_server_busy:
+                    # 仅服务端限流或服务端错误时降低速率
+                    limiter.on_throttle()
+                elif res.success or res.code == -1:  # type: ignore
+                    # 链接失效说明接口本身可用
+                    limiter.on_success()
+                else:
+                    limiter.on_failure()
+            finally:
+                # 被取消时结算半开状态的探测请求
+                limiter.release()
+        return gacha_name, card_pool_type, res
+
+    tasks = [
+        asyncio.create_task(fetch(gacha_name, card_pool_type))
+        for gacha_name, card_pool_type in gacha_type_meta_data.items()
+    ]
+    gacha_logs: Dict[str, List[GachaLog]] = {}
+    try:
+        for future in asyncio.as_completed(tasks):
+            gacha_name, card_pool_type, res = await future
+            if not res.success:
+                # 任一卡池获取失败时不再请求其余卡池，避免只保存部分卡池
+                if res.code == -1:  # type: ignore
+                    return ERROR_MSG_INVALID_LINK, {}
+                msg = ERROR_MSG_FETCH_FAILED.format(gacha_name, res.throw_msg())
+                return msg, {}
+
+            if res.data and isinstance(res.data, list):
+                temp = res.data
+            else:
+                temp = []
+
+            gacha_log = [GachaLog.model_validate(log) for log in temp]  # type: ignore
+            for log in gacha_log:
+                if log.cardPoolType != card_pool_type:
+                    log.cardPoolType = card_pool_type
+            gacha_logs[gacha_name] = gacha_log
+    finally:
+        for task in tasks:
+            task.cancel()
+
+    return None, gacha_logs
+
+
 async def get_new_gachalog(
-    uid: str, record_id: str, full_data: Dict[str, List[GachaLog]], is_force: bool
+    full_data: Dict[str, List[Dict]],
+    gacha_logs: Dict[str, List[GachaLog]],
 ) -> tuple[Union[str, None], Dict[str, List[GachaLog]], Dict[str, int]]:
+    """与全部本地记录比较，返回各卡池新增的抽卡"""
     new = {}
     new_count = {}
-    for gacha_name, card_pool_type in gacha_type_meta_data.items():
-        res = await waves_api.get_gacha_log(card_pool_type, record_id, uid)
-        if not res.success or not res.data:
-            # 抽卡记录获取失败
-            if res.code == -1:  # type: ignore
-                return ERROR_MSG_INVALID_LINK, None, None  # type: ignore
-
-        if res.data and isinstance(res.data, list):
-            temp = res.data
-        else:
-            temp = []
-
-        gacha_log = [GachaLog.model_validate(log) for log in temp]  # type: ignore
-        for log in gacha_log:
-            if log.cardPoolType != card_pool_type:
-                log.cardPoolType = card_pool_type
-        old_length = find_length(full_data[gacha_name], gacha_log)
-        _add = gacha_log if old_length == 0 else gacha_log[:-old_length]
-        new[gacha_name] = _add + copy.deepcopy(full_data[gacha_name])
+    for gacha_name in gacha_type_meta_data.keys():
+        gacha_log = gacha_logs[gacha_name]
+        _add = gacha_log[: count_new_gachalog(full_data[gacha_name], gacha_log)]
+        new[gacha_name] = _add
         new_count[gacha_name] = len(_add)
-        await asyncio.sleep(1)
 
     return None, new, new_count
 
 
 async def get_new_gachalog_for_file(
-    full_data: Dict[str, List[GachaLog]],
+    full_data: Dict[str, List[Dict]],
     import_data: Dict[str, List[GachaLog]],
 ) -> tuple[Union[str, None], Dict[str, List[GachaLog]], Dict[str, int]]:
     new = {}
@@ -153,25 +343,13 @@ async def get_new_gachalog_for_file(
         gacha_name = cardPoolType
         gacha_log = [GachaLog(**log.dict()) for log in item]
         new_gacha_log = merge_gacha_logs_by_common_subarray(
-            full_data[gacha_name], gacha_log
+            [GachaLog(**log) for log in full_data[gacha_name]], gacha_log
         )
         new[gacha_name] = new_gacha_log
         new_count[gacha_name] = len(new_gacha_log)
     return None, new, new_count
 
 
-async def backup_gachalogs(uid: str, gachalogs_history: Dict, type: str):
-    path = PLAYER_PATH / str(uid)
-    if not path.exists():
-        path.mkdir(parents=True, exist_ok=True)
-    # 备份
-    backup_path = (
-        path / f"{type}_gacha_logs_{datetime.now().strftime('%Y-%m-%d.%H%M%S')}.json"
-    )
-    async with aiofiles.open(backup_path, "w", encoding="UTF-8") as file:
-        await file.write(json.dumps(gachalogs_history, ensure_ascii=False))
-
-
 async def save_gachalogs(
     ev: Event,
     uid: str,
@@ -179,32 +357,50 @@ async def save_gachalogs(
     is_force: bool = False,
     import_data: Optional[Dict[str, List[GachaLog]]] = None,
 ) -> str:
-    path = PLAYER_PATH / str(uid)
-    if not path.exists():
-        path.mkdir(parents=True, exist_ok=True)
+    async with gacha_log_store.lock(uid):
+        return await _save_gachalogs(ev, uid, record_id, is_force, import_data)
 
-    # 抽卡记录json路径
-    gachalogs_path = path / "gacha_logs.json"
 
-    temp_gachalogs_history = {}
-    if gachalogs_path.exists():
-        with Path.open(gachalogs_path, encoding="UTF-8") as f:
-            gachalogs_history: Dict = json.load(f)
-
-        # import 时备份
-        if not record_id:
-            await backup_gachalogs(uid, gachalogs_history, type="import")
-
-        # update 时备份
-        temp_gachalogs_history = copy.deepcopy(gachalogs_history)
-
-        gachalogs_history = gachalogs_history["data"]
-    else:
-        gachalogs_history = copy.deepcopy(gachalogs_history_meta)
+async def _save_gachalogs(
+    ev: Event,
+    uid: str,
+    record_id: str,
+    is_force: bool = False,
+    import_data: Optional[Dict[str, List[GachaLog]]] = None,
+) -> str:
+    if record_id:
+        cost: Dict[str, float] = {}
+        start = time.perf_counter()
+        code, gacha_logs = await fetch_gachalogs(uid, record_id, cost)
+        logger.info(
+            f"[鸣潮] UID{uid} 获取抽卡记录耗时 {time.perf_counter() - start:.2f}s: "
+            + ", ".join(f"{k} {v:.2f}s" for k, v in cost.items())
+        )
+        if code:
+            return code
+        await save_record_id(ev.user_id, ev.bot_id, uid, record_id)
 
-    temp = copy.deepcopy(gachalogs_history_meta)
-    temp.update(gachalogs_history)
-    gachalogs_history = temp
+        # msgpack 格式下根据索引中的最新一条计算新增并追加，无需读取全部记录；
+        # 索引只在 write 修正卡池类型后写入，此时无需再修正
+        latest = None if is_force else await gacha_log_store.latest(uid)
+        new = get_new_gachalog_by_latest(gacha_logs, latest) if latest else None
+        if new is not None:
+            added = {
+                gacha_name: [log.dict() for log in new.get(gacha_name, [])]
+                for gacha_name in gacha_type_meta_data.keys()
+            }
+            if await gacha_log_store.append(uid, added):
+                return get_save_reply(uid, {k: len(v) for k, v in added.items()})
+
+    # import 时备份
+    if not record_id:
+        await gacha_log_store.backup(uid, type="import")
+
+    history = await gacha_log_store.read(uid)
+    gachalogs_history = {
+        gacha_name: history.get(gacha_name, [])
+        for gacha_name in gacha_type_meta_data.keys()
+    }
 
     is_need_backup = False
     for gacha_name, card_pool_type in gacha_type_meta_data.items():
@@ -223,17 +419,13 @@ async def save_gachalogs(
 
             is_need_backup = True
 
+    # update 时备份，此时文件中仍为修正前的记录
     if is_need_backup:
-        await backup_gachalogs(uid, temp_gachalogs_history, type="update")
-
-    for gacha_name in gacha_type_meta_data.keys():
-        gachalogs_history[gacha_name] = [
-            GachaLog(**log) for log in gachalogs_history[gacha_name]
-        ]
+        await gacha_log_store.backup(uid, type="update")
 
     if record_id:
         code, gachalogs_new, gachalogs_count_add = await get_new_gachalog(
-            uid, record_id, gachalogs_history, is_force
+            gachalogs_history, gacha_logs
         )
     else:
         code, gachalogs_new, gachalogs_count_add = await get_new_gachalog_for_file(
@@ -244,27 +436,28 @@ async def save_gachalogs(
         return code or ERROR_MSG_INVALID_LINK
 
     if record_id:
-        await save_record_id(ev.user_id, ev.bot_id, uid, record_id)
-
-    # 获取当前时间
-    current_time = datetime.now().strftime("%Y-%m-%d %H-%M-%S")
-
-    # 初始化最后保存的数据
-    result = {"uid": uid, "data_time": current_time}
-
-    # 保存数量
-    for gacha_name in gacha_type_meta_data.keys():
-        result[gacha_name] = len(gachalogs_new.get(gacha_name, []))  # type: ignore
+        # 只追加新增的抽卡，修正过卡池类型时整体写入
+        added = {
+            gacha_name: [log.dict() for log in gachalogs_new.get(gacha_name, [])]
+            for gacha_name in gacha_type_meta_data.keys()
+        }
+        if is_need_backup or not await gacha_log_store.append(uid, added):
+            pools = {
+                gacha_name: added[gacha_name] + gachalogs_history[gacha_name]
+                for gacha_name in gacha_type_meta_data.keys()
+            }
+            await gacha_log_store.write(uid, pools)
+    else:
+        pools = {
+            gacha_name: [log.dict() for log in gachalogs_new.get(gacha_name, [])]
+            for gacha_name in gacha_type_meta_data.keys()
+        }
+        await gacha_log_store.write(uid, pools)
 
-    result["data"] = {  # type: ignore
-        gacha_name: [log.dict() for log in gachalogs_new.get(gacha_name, [])]
-        for gacha_name in gacha_type_meta_data.keys()
-    }
+    return get_save_reply(uid, gachalogs_count_add)
 
-    vo = msgspec.to_builtins(result)
-    async with aiofiles.open(gachalogs_path, "w", encoding="UTF-8") as file:
-        await file.write(json.dumps(vo, ensure_ascii=False))
 
+def get_save_reply(uid: str, gachalogs_count_add: Dict[str, int]) -> str:
     # 计算数据
     all_add = sum(gachalogs_count_add.values())
 
@@ -281,6 +474,20 @@ async def save_gachalogs(
     return im
 
 
+async def restore_gachalogs(uid: str, backup_id: int) -> str:
+    """恢复第 backup_id 个备份(按时间倒序，从 1 开始)，恢复前备份当前记录"""
+    async with gacha_log_store.lock(uid):
+        backups = await gacha_log_store.backups(uid)
+        if not 0 < backup_id <= len(backups):
+            return f"[鸣潮] UID{uid} 没有第{backup_id}个抽卡记录备份"
+        backup = backups[backup_id - 1]
+        pools = await gacha_log_store.read_backup(uid, backup)
+        await gacha_log_store.backup(uid, type="restore")
+        await gacha_log_store.write(uid, pools)
+    count = sum(len(logs) for logs in pools.values())
+    return f"✅UID{uid}已恢复{backup['time']}的抽卡记录备份，共{count}条"
+
+
 async def save_record_id(user_id, bot_id, uid, record_id):
     user = await WavesUser.get_user_by_attr(user_id, bot_id, "uid", uid)
     if user:
@@ -344,6 +551,11 @@ async def import_gachalogs(ev: Event, history_url: str, type: str, uid: str) ->
     return res
 
 
+def _dump_export_log(log: Dict) -> str:
+    # 与 json.dumps(导出数据, indent=4) 中 list 内条目的格式一致
+    return textwrap.indent(json.dumps(log, ensure_ascii=False, indent=4), " " * 8)
+
+
 async def export_gachalogs(uid: str) -> dict:
     path = PLAYER_PATH / uid
     if not path.exists():
@@ -353,31 +565,34 @@ async def export_gachalogs(uid: str) -> dict:
     now = datetime.now()
     current_time = now.strftime("%Y-%m-%d %H:%M:%S")
 
-    # 抽卡记录json路径
-    gachalogs_path = path / "gacha_logs.json"
-    if gachalogs_path.exists():
-        async with aiofiles.open(gachalogs_path, "r", encoding="UTF-8") as f:
-            raw_data = json.loads(await f.read())
-
-        result = {
-            "info": {
-                "export_time": current_time,
-                "export_app": "WutheringWavesUID",
-                "export_app_version": WutheringWavesUID_version,
-                "export_timestamp": round(now.timestamp()),
-                "version": "v2.0",
-                "uid": uid,
-            },
-            "list": [],
+    if gacha_log_store.exists(uid):
+        gachalogs_history = await gacha_log_store.read(uid)
+
+        info = {
+            "export_time": current_time,
+            "export_app": "WutheringWavesUID",
+            "export_app_version": WutheringWavesUID_version,
+            "export_timestamp": round(now.timestamp()),
+            "version": "v2.0",
+            "uid": uid,
         }
-        gachalogs_history = raw_data["data"]
-        for name, gachalogs in gachalogs_history.items():
-            result["list"].extend(gachalogs)
+        head = json.dumps({"info": info}, ensure_ascii=False, indent=4)
 
+        # 逐个卡池写入，不在内存中拼接整个导出文件
         async with aiofiles.open(
             path / f"export_{uid}.json", "w", encoding="UTF-8"
         ) as file:
-            await file.write(json.dumps(result, ensure_ascii=False, indent=4))
+            await file.write(head[:-2] + ',\n    "list": [')
+            is_empty = True
+            for gachalogs in gachalogs_history.values():
+                if not gachalogs:
+                    continue
+                await file.write(
+                    ("\n" if is_empty else ",\n")
+                    + ",\n".join(_dump_export_log(log) for log in gachalogs)
+                )
+                is_empty = False
+            await file.write("]\n}" if is_empty else "\n    ]\n}")
 
         logger.success("[导出抽卡记录] 导出成功!")
         im = {
@@ -3,7 +3,6 @@ import copy
 from pathlib import Path
 from typing import Dict, Union
 
-import httpx
 from PIL import Image, ImageDraw
 
 from gsuid_core.logger import logger
@@ -20,6 +19,7 @@ from ..utils.fonts.waves_fonts import (
     waves_font_36,
     waves_font_58,
 )
+from ..utils.http_client import http_client
 from ..utils.image import (
     CHAIN_COLOR_LIST,
     GOLD,
@@ -255,11 +255,10 @@ async def draw_pic(roleId):
 async def get_char_hold_rate_data() -> Dict:
     """获取角色持有率数据"""
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(GET_HOLD_RATE_URL, timeout=10)
-            response.raise_for_status()
-            if response.status_code == 200:
-                return response.json().get("data", {})
+        response = await http_client.get(GET_HOLD_RATE_URL, timeout=10)
+        response.raise_for_status()
+        if response.status_code == 200:
+            return response.json().get("data", {})
     except Exception as e:
         logger.error(f"获取角色持有率数据失败: {e}")
 
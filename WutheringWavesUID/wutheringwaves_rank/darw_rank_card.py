@@ -1,7 +1,7 @@
 import asyncio
 import time
 from pathlib import Path
-from typing import List, Optional, Union
+from typing import Dict, List, Optional, Tuple, Union
 
 from PIL import Image, ImageDraw
 from pydantic import BaseModel
@@ -14,12 +14,6 @@ from gsuid_core.utils.image.image_tools import crop_center_img
 
 from ..utils.api.model import RoleDetailData, WeaponData
 from ..utils.cache import TimedCache
-from ..utils.calc import WuWaCalc
-from ..utils.calculate import (
-    calc_phantom_score,
-    get_calc_map,
-    get_total_score_bg,
-)
 from ..utils.util import send_master_info
 from ..utils.char_info_utils import get_all_role_detail_info_list
 from ..utils.damage.abstract import DamageRankRegister
@@ -51,6 +45,8 @@ from ..utils.image import (
     get_waves_bg,
 )
 from ..utils.name_convert import alias_to_char_name, char_name_to_char_id
+from ..utils.calc_pool import calc_rank_entries_async
+from ..utils.rank_index import get_rank_index_candidates
 from ..utils.resource.constant import SPECIAL_CHAR, SPECIAL_CHAR_NAME
 from ..utils.util import hide_uid
 from ..wutheringwaves_config import PREFIX, WutheringWavesConfig
@@ -71,7 +67,7 @@ pic_cache = TimedCache(86400, 200)
 
 
 class RankInfo(BaseModel):
-    roleDetail: RoleDetailData  # 角色明细
+    roleDetail: Optional[RoleDetailData] = None  # 角色明细，仅展示的条目会加载
     qid: str  # qq id
     uid: str  # uid
     server: str  # 区服
@@ -86,79 +82,33 @@ class RankInfo(BaseModel):
     sonata_name: str  # 合鸣效果
 
 
-async def get_one_rank_info(user_id, uid, role_detail, rankDetail):
-    equipPhantomList = role_detail.phantomData.equipPhantomList
-
-    calc: WuWaCalc = WuWaCalc(role_detail)
-    calc.phantom_pre = calc.prepare_phantom()
-    calc.phantom_card = calc.enhance_summation_phantom_value(calc.phantom_pre)
-    calc.calc_temp = get_calc_map(
-        calc.phantom_card,
-        role_detail.role.roleName,
-        role_detail.role.roleId,
-    )
-
-    # 评分
-    phantom_score = 0
-    # calc_temp = get_calc_map(phantom_sum_value, role_detail.role.roleName)
-    for i, _phantom in enumerate(equipPhantomList):
-        if _phantom and _phantom.phantomProp:
-            props = _phantom.get_props()
-            _score, _bg = calc_phantom_score(
-                role_detail.role.roleId, props, _phantom.cost, calc.calc_temp
-            )
-            phantom_score += _score
-
-    if phantom_score == 0:
-        return
-
-    phantom_score = round(phantom_score, 2)
-    phantom_bg = get_total_score_bg(
-        role_detail.role.roleName, phantom_score, calc.calc_temp
-    )
-
-    calc.role_card = calc.enhance_summation_card_value(calc.phantom_card)
-    calc.damageAttribute = calc.card_sort_map_to_attribute(calc.role_card)
-
-    if rankDetail:
-        crit_damage, expected_damage = rankDetail["func"](
-            calc.damageAttribute, role_detail
-        )
-    else:
-        expected_damage = "0"
-
-    sonata_name = ""
-    ph_detail = calc.phantom_card.get("ph_detail", [])
-    if isinstance(ph_detail, list):
-        for ph in ph_detail:
-            if ph.get("ph_num") == 5:
-                sonata_name = ph.get("ph_name", "")
-                break
-
-            if ph.get("isFull"):
-                sonata_name = ph.get("ph_name", "")
-                break
-                
+def build_rank_info(user_id: str, uid: str, entry: Dict) -> RankInfo:
     # 区服
     region_text, region_color = get_region_for_rank(uid)
 
-    rankInfo = RankInfo(
+    return RankInfo(
         **{
-            "roleDetail": role_detail,
             "qid": user_id,
             "uid": uid,
             "server": region_text,
             "server_color": region_color,
-            "level": role_detail.role.level,
-            "chain": role_detail.get_chain_num(),
-            "chainName": role_detail.get_chain_name(),
-            "score": round(int(phantom_score * 100) / 100, ndigits=2),
-            "score_bg": phantom_bg,
-            "expected_damage": expected_damage,
-            "expected_damage_int": int(expected_damage.replace(",", "")),
-            "sonata_name": sonata_name,
+            "level": entry["level"],
+            "chain": entry["chain"],
+            "chainName": entry["chain_name"],
+            "score": round(int(round(entry["score"], 2) * 100) / 100, ndigits=2),
+            "score_bg": entry["score_bg"],
+            "expected_damage": entry["expected_damage"],
+            "expected_damage_int": entry["expected_damage_int"],
+            "sonata_name": entry["sonata_name"],
         }
     )
+
+
+def build_rank_info_with_detail(
+    user_id: str, uid: str, role_detail: RoleDetailData, entry: Dict
+) -> RankInfo:
+    rankInfo = build_rank_info(user_id, uid, entry)
+    rankInfo.roleDetail = role_detail
     return rankInfo
 
 
@@ -181,22 +131,25 @@ async def find_role_detail(
     )
 
 
-async def get_rank_info_for_user(
+async def get_rank_candidates_for_user(
     user: WavesBind,
     char_id,
     find_char_id,
     rankDetail,
     tokenLimitFlag,
     wavesTokenUsersMap,
-):
-    rankInfoList = []
+    uids: Optional[List[str]] = None,
+) -> List[Tuple[str, str, RoleDetailData]]:
+    """需要实时计算排行的 (user_id, uid, 角色面板)"""
+    candidates = []
     if not user.uid:
-        return rankInfoList
+        return candidates
 
-    tasks = [find_role_detail(uid, find_char_id) for uid in user.uid.split("_")]
+    uids = uids or user.uid.split("_")
+    tasks = [find_role_detail(uid, find_char_id) for uid in uids]
     role_details = await asyncio.gather(*tasks)
 
-    for uid, role_detail in zip(user.uid.split("_"), role_details):
+    for uid, role_detail in zip(uids, role_details):
         if (
             tokenLimitFlag
             and (
@@ -211,18 +164,9 @@ async def get_rank_info_for_user(
         if not role_detail.phantomData or not role_detail.phantomData.equipPhantomList:
             continue
 
-        rankInfo = None
-        try:
-            rankInfo = await get_one_rank_info(user.user_id, uid, role_detail, rankDetail)
-        except Exception as e:
-            logger.warning(f"获取用户{user.user_id} id{uid} 的排行数据,错误: {e}")
-            await send_master_info(f"获取用户{user.user_id} id{uid} 的排行数据,错误: {e}")
+        candidates.append((user.user_id, uid, role_detail))
 
-        if not rankInfo:
-            continue
-        rankInfoList.append(rankInfo)
-
-    return rankInfoList
+    return candidates
 
 
 async def get_all_rank_info(
@@ -233,27 +177,63 @@ async def get_all_rank_info(
     tokenLimitFlag,
     wavesTokenUsersMap,
 ):
+    # 已建立索引的uid直接读取排行索引
+    indexed, pending = await get_rank_index_candidates(
+        users, find_char_id, tokenLimitFlag, wavesTokenUsersMap
+    )
+    rankInfoList = [
+        build_rank_info(user_id, uid, row.model_dump())
+        for user_id, uid, row in indexed
+    ]
+
     semaphore = asyncio.Semaphore(50)
 
-    async def process_user(user):
+    async def process_user(user, uids):
         async with semaphore:
-            return await get_rank_info_for_user(
+            return await get_rank_candidates_for_user(
                 user,
                 char_id,
                 find_char_id,
                 rankDetail,
                 tokenLimitFlag,
                 wavesTokenUsersMap,
+                uids=uids,
             )
 
-    tasks = [process_user(user) for user in users]
+    # 索引缺失或过期的uid回退为实时计算
+    tasks = [process_user(user, uids) for user, uids in pending]
     results = await asyncio.gather(*tasks)
-
-    # Flatten the results list
-    rankInfoList = [rank_info for result in results for rank_info in result]
+    candidates = [candidate for result in results for candidate in result]
+
+    # 所有回退计算的角色一次提交
+    entries = await calc_rank_entries_async([c[2] for c in candidates], rankDetail)
+    for (user_id, uid, role_detail), (entry, error) in zip(candidates, entries):
+        if error:
+            logger.warning(f"获取用户{user_id} id{uid} 的排行数据,错误: {error}")
+            await send_master_info(f"获取用户{user_id} id{uid} 的排行数据,错误: {error}")
+            continue
+        if not entry:
+            continue
+        rankInfoList.append(
+            build_rank_info_with_detail(user_id, uid, role_detail, entry)
+        )
     return rankInfoList
 
 
+async def fill_rank_detail(
+    rankInfoList: List[RankInfo], find_char_id
+) -> List[RankInfo]:
+    """为需要展示的排行条目加载角色明细"""
+    result = []
+    for rank in rankInfoList:
+        if rank.roleDetail is None:
+            rank.roleDetail = await find_role_detail(rank.uid, find_char_id)
+            if rank.roleDetail is None:
+                continue
+        result.append(rank)
+    return result
+
+
 async def get_waves_token_condition(ev):
     wavesTokenUsersMap = {}
     flag = False
@@ -375,6 +355,7 @@ async def draw_rank_img(
     rankInfoList = rankInfoList[:rank_length]
     if rankId and rankInfo and rankId > rank_length:
         rankInfoList.append(rankInfo)
+    rankInfoList = await fill_rank_detail(rankInfoList, find_char_id)
 
     totalNum = len(rankInfoList)
     title_h = 500
@@ -14,11 +14,7 @@ from gsuid_core.utils.image.image_tools import crop_center_img
 
 from ..utils.util import send_master_info
 from ..utils.cache import TimedCache
-from ..utils.calc import WuWaCalc
-from ..utils.calculate import (
-    calc_phantom_score,
-    get_calc_map,
-)
+from ..utils.calc_pool import calc_total_score_async
 from ..utils.database.models import WavesBind, WavesUser
 from ..utils.fonts.waves_fonts import (
     waves_font_12,
@@ -90,42 +86,9 @@ async def calculate_user_total_score(user_id, uid: str) -> Optional[BotTotalRank
     if not role_details:
         return None
 
-    total_score = 0
-    char_score_details = []
-
-    # 计算每个角色的分数
-    for role_detail in role_details:
-        if not role_detail.phantomData or not role_detail.phantomData.equipPhantomList:
-            continue
-
-        equipPhantomList = role_detail.phantomData.equipPhantomList
-
-        calc: WuWaCalc = WuWaCalc(role_detail)
-        calc.phantom_pre = calc.prepare_phantom()
-        calc.phantom_card = calc.enhance_summation_phantom_value(calc.phantom_pre)
-        calc.calc_temp = get_calc_map(
-            calc.phantom_card,
-            role_detail.role.roleName,
-            role_detail.role.roleId,
-        )
-
-        # 评分
-        phantom_score = 0
-        # calc_temp = get_calc_map(phantom_sum_value, role_detail.role.roleName)
-        for i, _phantom in enumerate(equipPhantomList):
-            if _phantom and _phantom.phantomProp:
-                props = _phantom.get_props()
-                _score, _bg = calc_phantom_score(
-                    role_detail.role.roleId, props, _phantom.cost, calc.calc_temp
-                )
-                phantom_score += _score
-
-        if phantom_score >= 175:  # 只计算分数>=175的角色
-            total_score += phantom_score
-            char_score_details.append({
-                'char_id': role_detail.role.roleId,
-                'phantom_score': phantom_score
-            })
+    total_score, char_score_details = await calc_total_score_async(
+        list(role_details)
+    )
 
     if total_score == 0 or not char_score_details:
         return None
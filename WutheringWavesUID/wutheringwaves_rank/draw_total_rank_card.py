@@ -29,6 +29,7 @@ from ..utils.fonts.waves_fonts import (
     waves_font_34,
     waves_font_58,
 )
+from ..utils.http_client import http_client
 from ..utils.image import (
     AMBER,
     GREY,
@@ -72,23 +73,22 @@ async def get_rank(item: TotalRankRequest) -> Optional[TotalRankResponse]:
     if not WavesToken:
         return
 
-    async with httpx.AsyncClient() as client:
-        try:
-            res = await client.post(
-                GET_TOTAL_RANK_URL,
-                json=item.dict(),
-                headers={
-                    "Content-Type": "application/json",
-                    "Authorization": f"Bearer {WavesToken}",
-                },
-                timeout=httpx.Timeout(10),
-            )
-            if res.status_code == 200:
-                return TotalRankResponse.model_validate(res.json())
-            else:
-                logger.warning(f"获取练度排行失败: {res.status_code} - {res.text}")
-        except Exception as e:
-            logger.exception(f"获取练度排行失败: {e}")
+    try:
+        res = await http_client.post(
+            GET_TOTAL_RANK_URL,
+            json=item.dict(),
+            headers={
+                "Content-Type": "application/json",
+                "Authorization": f"Bearer {WavesToken}",
+            },
+            timeout=httpx.Timeout(10),
+        )
+        if res.status_code == 200:
+            return TotalRankResponse.model_validate(res.json())
+        else:
+            logger.warning(f"获取练度排行失败: {res.status_code} - {res.text}")
+    except Exception as e:
+        logger.exception(f"获取练度排行失败: {e}")
 
 
 async def draw_total_rank(bot: Bot, ev: Event, pages: int) -> Union[str, bytes]:
@@ -30,6 +30,7 @@ from ..utils.fonts.waves_fonts import (
     waves_font_44,
     waves_font_58,
 )
+from ..utils.http_client import http_client
 from ..utils.image import (
     AMBER,
     RED,
@@ -88,23 +89,22 @@ async def get_rank(item: SlashRankItem) -> Optional[SlashRankRes]:
     if not WavesToken:
         return
 
-    async with httpx.AsyncClient() as client:
-        try:
-            res = await client.post(
-                GET_SLASH_RANK_URL,
-                json=item.dict(),
-                headers={
-                    "Content-Type": "application/json",
-                    "Authorization": f"Bearer {WavesToken}",
-                },
-                timeout=httpx.Timeout(10),
-            )
-            if res.status_code == 200:
-                return SlashRankRes.model_validate(res.json())
-            else:
-                logger.warning(f"获取排行失败: {res.status_code} - {res.text}")
-        except Exception as e:
-            logger.exception(f"获取排行失败: {e}")
+    try:
+        res = await http_client.post(
+            GET_SLASH_RANK_URL,
+            json=item.dict(),
+            headers={
+                "Content-Type": "application/json",
+                "Authorization": f"Bearer {WavesToken}",
+            },
+            timeout=httpx.Timeout(10),
+        )
+        if res.status_code == 200:
+            return SlashRankRes.model_validate(res.json())
+        else:
+            logger.warning(f"获取排行失败: {res.status_code} - {res.text}")
+    except Exception as e:
+        logger.exception(f"获取排行失败: {e}")
 
 
 async def draw_all_slash_rank_card(bot: Bot, ev: Event):
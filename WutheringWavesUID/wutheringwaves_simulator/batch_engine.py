@@ -0,0 +1,181 @@
+"""模擬抽卡批量引擎
+
+以 NumPy 同時模擬多組(trials)連續抽卡(pulls)，規則與 SimulatorCore.simulate_one 一致:
+- 五星: 前70抽為基礎概率，之後每抽遞增，歪了之後下一個五星必為UP
+- 四星: 第10抽保底，出五星時四星計數照常增加
+- 四星從UP與常駐中隨機，同一輪十連內避開最近3個已出的四星
+"""
+
+from typing import Dict, List, Optional
+
+import numpy as np
+
+# 同一輪內避開的最近四星數
+RECENT_FOUR_STAR = 3
+# 一輪的抽數，每輪重置最近四星
+ROUND_SIZE = 10
+# 四星保底(計數達到該值時必出)
+FOUR_STAR_PITY = 9
+
+
+class GachaPool:
+    """整數編碼的卡池與五星保底概率表"""
+
+    def __init__(self, config: Dict):
+        five = config["five_star"]
+        four = config["four_star"]
+        three = config["three_star"]
+
+        self.names: List[str] = []
+        self._codes: Dict[str, int] = {}
+
+        self.five_up = self._encode(five["up_pool"])
+        self.five_other = self._encode(five["other_pool"])
+        self.other_rate = five.get("other", 0.5) if len(self.five_other) else 0.0
+        # 四星按列表條目抽取，同名條目權重相同
+        self.four_entries = self._encode(four["up_pool"] + four["other_pool"])
+        up_codes = set(self._encode(four["up_pool"]).tolist())
+        self.four_is_up = np.array(
+            [i in up_codes for i in range(len(self.names))], dtype=bool
+        )
+        self.four_basic = four["basic"]
+        self.three = self._encode(three["other_pool"])
+
+        # 五星概率表: 第t抽(已抽t次未出五星)的出五星概率
+        basic, increase = five["basic"], five["increase"]
+        table = []
+        t = 0
+        while True:
+            p = basic if t < 70 else basic + (t - 69) * increase
+            table.append(min(p, 1.0))
+            if p >= 1 or (t >= 70 and increase <= 0):
+                break
+            t += 1
+        self.five_table = np.array(table, dtype=np.float64)
+
+    def _encode(self, items: List[Dict]) -> np.ndarray:
+        codes = []
+        for item in items:
+            name = item["name"]
+            if name not in self._codes:
+                self._codes[name] = len(self.names)
+                self.names.append(name)
+            codes.append(self._codes[name])
+        return np.array(codes, dtype=np.int32)
+
+    def code(self, name: str) -> Optional[int]:
+        return self._codes.get(name)
+
+
+class BatchResult:
+    """stars/items 形狀為 (trials, pulls)，items 為 GachaPool.names 的下標"""
+
+    def __init__(self, pool: GachaPool, stars: np.ndarray, items: np.ndarray, state):
+        self.pool = pool
+        self.stars = stars
+        self.items = items
+        (
+            self.five_star_time,
+            self.five_star_other,
+            self.four_star_time,
+            self.four_star_other,
+        ) = state
+
+    def gacha_list(self, trial: int = 0) -> List[Dict]:
+        return [
+            {"name": self.pool.names[item], "star": int(star)}
+            for star, item in zip(self.stars[trial], self.items[trial])
+        ]
+
+    def state(self, trial: int = 0) -> Dict:
+        return {
+            "five_star_time": int(self.five_star_time[trial]),
+            "five_star_other": bool(self.five_star_other[trial]),
+            "four_star_time": int(self.four_star_time[trial]),
+            "four_star_other": bool(self.four_star_other[trial]),
+        }
+
+
+def simulate_batch(
+    pool: GachaPool,
+    pulls: int,
+    trials: int = 1,
+    state: Optional[Dict] = None,
+    rng: Optional[np.random.Generator] = None,
+) -> BatchResult:
+    """從同一初始狀態模擬 trials 組，每組連續 pulls 抽"""
+    rng = rng or np.random.default_rng()
+    state = state or {}
+    five_t = np.full(trials, state.get("five_star_time", 0), dtype=np.int32)
+    five_other = np.full(trials, state.get("five_star_other", True), dtype=bool)
+    four_t = np.full(trials, state.get("four_star_time", 0), dtype=np.int32)
+    four_other = np.full(trials, state.get("four_star_other", True), dtype=bool)
+    recent = np.full((trials, RECENT_FOUR_STAR), -1, dtype=np.int32)
+
+    stars = np.empty((trials, pulls), dtype=np.int8)
+    items = np.empty((trials, pulls), dtype=np.int32)
+    last = len(pool.five_table) - 1
+
+    for n in range(pulls):
+        if n % ROUND_SIZE == 0:
+            recent.fill(-1)
+        u = rng.random((trials, 3))
+
+        hit5 = u[:, 0] < pool.five_table[np.minimum(five_t, last)]
+        # 五星: u1 判斷是否歪，u2 選擇角色
+        lose = hit5 & five_other & (u[:, 1] < pool.other_rate)
+        item = pool.five_up[(u[:, 2] * len(pool.five_up)).astype(np.int32)]
+        if len(pool.five_other):
+            item = np.where(
+                lose,
+                pool.five_other[(u[:, 2] * len(pool.five_other)).astype(np.int32)],
+                item,
+            )
+        # 四星: u1 判斷概率，u2 選擇角色
+        hit4 = ~hit5 & ((four_t >= FOUR_STAR_PITY) | (u[:, 1] < pool.four_basic))
+        hit3 = ~hit5 & ~hit4
+        item = np.where(
+            hit3, pool.three[(u[:, 2] * len(pool.three)).astype(np.int32)], item
+        )
+
+        rows = np.flatnonzero(hit4)
+        if rows.size:
+            entries = pool.four_entries
+            excluded = (entries[None, :, None] == recent[rows][:, None, :]).any(axis=2)
+            weights = (~excluded).astype(np.float64)
+            totals = weights.sum(axis=1)
+            # 全部四星都出現過時從全部中選
+            weights[totals == 0] = 1
+            totals[totals == 0] = len(entries)
+            cum = np.cumsum(weights, axis=1)
+            index = (cum <= (u[rows, 2] * totals)[:, None]).sum(axis=1)
+            codes = entries[index]
+            item[rows] = codes
+            four_other[rows] = pool.four_is_up[codes]
+            recent[rows, :-1] = recent[rows, 1:]
+            recent[rows, -1] = codes
+
+        stars[:, n] = np.where(hit5, 5, np.where(hit4, 4, 3))
+        items[:, n] = item
+        five_other = np.where(hit5, ~lose, five_other)
+        five_t = np.where(hit5, 0, five_t + 1)
+        four_t = np.where(hit4, 0, four_t + 1)
+
+    return BatchResult(pool, stars, items, (five_t, five_other, four_t, four_other))
+
+
+def pulls_to_target(
+    pool: GachaPool,
+    name: str,
+    trials: int = 10000,
+    max_pulls: int = 160,
+    state: Optional[Dict] = None,
+    rng: Optional[np.random.Generator] = None,
+) -> np.ndarray:
+    """每組首次抽到 name 所需抽數，max_pulls 內未抽到記為 max_pulls + 1"""
+    code = pool.code(name)
+    result = simulate_batch(pool, max_pulls, trials, state, rng)
+    if code is None:
+        return np.full(trials, max_pulls + 1, dtype=np.int32)
+    found = result.items == code
+    return np.where(found.any(axis=1), found.argmax(axis=1) + 1, max_pulls + 1)
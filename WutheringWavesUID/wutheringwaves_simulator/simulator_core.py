@@ -10,6 +10,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..utils.database.models import WavesSimulator
 from ..utils.resource.RESOURCE_PATH import MAIN_PATH
+from .batch_engine import GachaPool, simulate_batch
 
 # 配置文件路徑
 SIMULATOR_CONFIG_PATH = Path(__file__).parent / "config"
@@ -21,6 +22,16 @@ class SimulatorCore:
     def __init__(self):
         self.role_config = self._load_config("role.json")
         self.weapon_config = self._load_config("weapon.json")
+        self._pools: Dict[str, GachaPool] = {}
+
+    def get_pool(self, gacha_type: str) -> Optional[GachaPool]:
+        """整數編碼後的卡池，供批量引擎使用"""
+        if gacha_type not in self._pools:
+            config = self.role_config if gacha_type == "role" else self.weapon_config
+            if not config:
+                return None
+            self._pools[gacha_type] = GachaPool(config)
+        return self._pools[gacha_type]
 
     def _load_config(self, filename: str) -> Dict:
         """載入配置文件"""
@@ -257,29 +268,13 @@ async def simulate_gacha(
         # 獲取用戶狀態
         user_state = await simulator_core.get_user_state(user_id, bot_id, gacha_type)
 
-        # 執行十連
-        gacha_list = []
-        current_state = user_state.copy()
-        # 記錄本輪已抽到的四星，避免重複（只在同一輪十連中）
-        recent_four_stars = []
-
-        for _ in range(10):
-            result, current_state = simulator_core.simulate_one(
-                config, current_state, recent_four_stars
-            )
-            gacha_list.append(result)
-
-            # 如果是四星，記錄到本輪列表中
-            if result["star"] == 4:
-                recent_four_stars.append(result["name"])
-                # 只保留最近3個四星（避免列表過長）
-                if len(recent_four_stars) > 3:
-                    recent_four_stars.pop(0)
-
-            # 每抽一次都保存狀態（保持狀態同步）
-            await simulator_core.save_user_state(
-                user_id, bot_id, gacha_type, current_state
-            )
+        # 執行十連，十連結束後保存一次狀態
+        result = simulate_batch(simulator_core.get_pool(gacha_type), 10, 1, user_state)
+        gacha_list = result.gacha_list()
+        current_state = result.state()
+        await simulator_core.save_user_state(
+            user_id, bot_id, gacha_type, current_state
+        )
 
         # 獲取池子名稱
         pool_name = config.get("pool_name", "未知池子")
@@ -1,5 +1,7 @@
+import asyncio
+
 from gsuid_core.logger import logger
-from gsuid_core.server import on_core_start
+from gsuid_core.server import on_core_start, on_core_shutdown
 
 from ..wutheringwaves_resource import startup
 
@@ -8,12 +10,14 @@ from ..wutheringwaves_resource import startup
 async def all_start():
     logger.info("[鸣潮] 启动中...")
     try:
+        from ..utils.calculate import preload_calc_map
         from ..utils.damage.register_char import register_char
         from ..utils.damage.register_echo import register_echo
         from ..utils.damage.register_weapon import register_weapon
         from ..utils.limit_user_card import load_limit_user_card
         from ..utils.map.damage.register import register_damage, register_rank
         from ..utils.queues import init_queues
+        from ..utils.raw_data_store import migrate_raw_data
 
         # 注册
         register_weapon()
@@ -22,6 +26,10 @@ async def all_start():
         register_rank()
         register_char()
 
+        # 预加载评分文件
+        calc_map_num = preload_calc_map()
+        logger.info(f"[鸣潮][加载评分文件] 数量: {calc_map_num}")
+
         # 初始化任务队列
         init_queues()
 
@@ -29,8 +37,23 @@ async def all_start():
         card_list = await load_limit_user_card()
         logger.info(f"[鸣潮][加载角色极限面板] 数量: {len(card_list)}")
 
+        # 转换角色面板存储格式
+        asyncio.create_task(migrate_raw_data())
+
         await startup()
     except Exception as e:
         logger.exception(e)
 
     logger.success("[鸣潮] 启动完成✅")
+
+
+@on_core_shutdown
+async def all_shutdown():
+    from ..utils.calc_pool import calc_pool
+    from ..utils.http_client import http_client
+    from ..utils.queues.queues import stop_dispatcher
+
+    calc_pool.shutdown(cancel_futures=True)
+    # 任务分发器在自己的事件循环结束前关闭其HTTP客户端
+    await stop_dispatcher()
+    await http_client.aclose()
@@ -1,7 +1,18 @@
 from gsuid_core.status.plugin_status import register_status
 
+from ..utils.api.rate_limit import kuro_rate_limiter
+from ..utils.api.single_flight import single_flight
+from ..utils.cache import cookie_validity_cache
+from ..utils.char_info_utils import role_detail_cache
 from ..utils.database.models import WavesBind, WavesUser
+from ..utils.http_client import http_client
 from ..utils.image import get_ICON
+from ..utils.refresh_char_detail import refresh_plan_stats
+from ..utils.refresh_scheduler import refresh_scheduler
+from ..utils.util import get_async_cache_stats
+
+# 状态页展示命中次数最多的缓存函数数量
+ASYNC_CACHE_TOP_N = 3
 
 
 async def get_user_num():
@@ -14,11 +25,100 @@ async def get_add_num():
     return len(datas)
 
 
+async def get_role_cache_hit():
+    return role_detail_cache.hits
+
+
+async def get_role_cache_miss():
+    return role_detail_cache.misses
+
+
+async def get_http_requests():
+    return sum(http_client.requests.values())
+
+
+async def get_http_errors():
+    return sum(http_client.errors.values())
+
+
+async def get_async_cache_hit():
+    return sum(i["hits"] for i in get_async_cache_stats().values())
+
+
+async def get_async_cache_miss():
+    return sum(i["misses"] for i in get_async_cache_stats().values())
+
+
+async def get_async_cache_size():
+    return sum(i["size"] for i in get_async_cache_stats().values())
+
+
+async def get_async_cache_top():
+    """命中次数最多的缓存函数: 命中/未命中/条目"""
+    stats = sorted(
+        get_async_cache_stats().items(), key=lambda i: i[1]["hits"], reverse=True
+    )
+    return ", ".join(
+        f"{name.rsplit('.', 1)[-1]} {i['hits']}/{i['misses']}/{i['size']}"
+        for name, i in stats[:ASYNC_CACHE_TOP_N]
+    )
+
+
+async def get_ck_validation_saved():
+    return cookie_validity_cache.saved
+
+
+async def get_ck_validations():
+    return cookie_validity_cache.validations
+
+
+async def get_kuro_limited():
+    return sum(1 for i in kuro_rate_limiter.limiters.values() if i.limited)
+
+
+async def get_kuro_circuit_open():
+    return sum(
+        1 for i in kuro_rate_limiter.limiters.values() if i.state != "closed"
+    )
+
+
+async def get_kuro_shared():
+    return single_flight.shared
+
+
+async def get_refresh_skipped():
+    return refresh_plan_stats.skipped
+
+
+async def get_refresh_queued():
+    return refresh_scheduler.get_state()["queued"]
+
+
+async def get_refresh_avg_wait():
+    return refresh_scheduler.get_state()["avg_wait"]
+
+
 register_status(
     get_ICON(),
     "WutheringWavesUID",
     {
         "绑定UID": get_add_num,
         "登录账户": get_user_num,
+        "面板缓存命中": get_role_cache_hit,
+        "面板缓存未命中": get_role_cache_miss,
+        "HTTP请求数": get_http_requests,
+        "HTTP请求失败": get_http_errors,
+        "接口缓存命中": get_async_cache_hit,
+        "接口缓存未命中": get_async_cache_miss,
+        "接口缓存条目": get_async_cache_size,
+        "接口缓存命中最多": get_async_cache_top,
+        "CK验证跳过": get_ck_validation_saved,
+        "CK验证次数": get_ck_validations,
+        "库洛接口限流中": get_kuro_limited,
+        "库洛接口熔断中": get_kuro_circuit_open,
+        "库洛请求合并": get_kuro_shared,
+        "面板刷新跳过": get_refresh_skipped,
+        "面板刷新排队": get_refresh_queued,
+        "面板刷新平均等待(秒)": get_refresh_avg_wait,
     },
 )
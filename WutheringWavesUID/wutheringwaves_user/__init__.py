@@ -9,6 +9,8 @@ from gsuid_core.logger import logger
 from gsuid_core.config import core_config
 
 from ..utils.button import WavesButton
+from ..utils.waves_api import waves_api
+from ..utils.api.cookie_pool import public_cookie_pool
 from .deal import add_cookie, get_cookie, delete_cookie
 from ..wutheringwaves_user.login_succ import login_success_msg
 from ..wutheringwaves_config import PREFIX, WutheringWavesConfig
@@ -105,6 +107,13 @@ async def delete_all_invalid_cookie(bot: Bot, ev: Event):
     await bot.send(f"[鸣潮] 已删除无效token【{del_len}】个\n", at_sender)
 
 
+@scheduler.scheduled_job("interval", minutes=30)
+async def refresh_public_cookie_pool():
+    if WutheringWavesConfig.get_config("WavesOnlySelfCk").data:
+        return
+    await public_cookie_pool.refresh(waves_api)
+
+
 @scheduler.scheduled_job("cron", hour=23, minute=30)
 async def auto_delete_all_invalid_cookie():
     DelInvalidCookie = WutheringWavesConfig.get_config("DelInvalidCookie").data
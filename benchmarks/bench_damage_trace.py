@@ -0,0 +1,112 @@
+"""DamageAttribute 记录效果(trace) vs 不记录效果 一致性校验与基准
+
+对 utils/map/damage 下每个角色的所有伤害函数与排行函数，分别以两种模式计算，
+要求结果完全一致，任一模式抛出异常即失败。
+没有极限面板数据的角色使用 generate_online_role_detail 生成的模板面板。
+一致性测试见 tests/test_damage_trace.py。
+
+用法: python benchmarks/bench_damage_trace.py [循环次数]
+"""
+
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from WutheringWavesUID.utils.api.model import RoleDetailData  # noqa: E402
+from WutheringWavesUID.utils.calc import WuWaCalc  # noqa: E402
+from WutheringWavesUID.utils.damage.abstract import (  # noqa: E402
+    DamageDetailRegister,
+    DamageRankRegister,
+)
+from WutheringWavesUID.utils.damage.register_char import register_char  # noqa
+from WutheringWavesUID.utils.damage.register_echo import register_echo  # noqa
+from WutheringWavesUID.utils.damage.register_weapon import (  # noqa: E402
+    register_weapon,
+)
+from WutheringWavesUID.utils.map.damage.register import (  # noqa: E402
+    register_damage,
+    register_rank,
+)
+from WutheringWavesUID.wutheringwaves_charinfo.draw_char_card import (  # noqa
+    generate_online_role_detail,
+)
+
+DAMAGE_PATH = ROOT / "WutheringWavesUID" / "utils" / "map" / "damage"
+LIMIT_PATH = ROOT / "WutheringWavesUID" / "utils" / "map" / "1.json"
+
+
+def run(role_detail: RoleDetailData, func, trace: bool):
+    calc = WuWaCalc(role_detail)
+    calc.phantom_pre = calc.prepare_phantom()
+    calc.phantom_card = calc.enhance_summation_phantom_value(calc.phantom_pre)
+    calc.role_card = calc.enhance_summation_card_value(calc.phantom_card)
+    attr = calc.card_sort_map_to_attribute(calc.role_card, trace=trace)
+    return func(attr, role_detail)
+
+
+async def load_roles():
+    with open(LIMIT_PATH, "r", encoding="utf-8") as f:
+        roles = {
+            str(r["role"]["roleId"]): RoleDetailData(**r) for r in json.load(f)
+        }
+    for path in sorted(DAMAGE_PATH.glob("damage_*.py")):
+        char_id = path.stem.split("_")[1]
+        if char_id not in roles:
+            role_detail = await generate_online_role_detail(char_id)
+            if role_detail:
+                roles[char_id] = role_detail
+    return roles
+
+
+def main():
+    number = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    register_weapon()
+    register_echo()
+    register_damage()
+    register_rank()
+    register_char()
+
+    roles = asyncio.run(load_roles())
+    scripts = sorted(DAMAGE_PATH.glob("damage_*.py"))
+
+    checked = 0
+    t_trace = t_fast = 0.0
+    for path in scripts:
+        char_id = path.stem.split("_")[1]
+        role_detail = roles.get(char_id)
+        assert role_detail, f"{path.name}: 没有极限面板也无法生成模板面板"
+
+        funcs = list(DamageDetailRegister.find_class(char_id) or [])
+        rank = DamageRankRegister.find_class(char_id)
+        if rank:
+            funcs.append(rank)
+
+        for detail in funcs:
+            expect = run(role_detail, detail["func"], True)
+            actual = run(role_detail, detail["func"], False)
+            assert expect == actual, f"{path.name} {detail['title']}: {expect} != {actual}"
+            checked += 1
+
+            start = time.perf_counter()
+            for _ in range(number):
+                run(role_detail, detail["func"], True)
+            t_trace += time.perf_counter() - start
+
+            start = time.perf_counter()
+            for _ in range(number):
+                run(role_detail, detail["func"], False)
+            t_fast += time.perf_counter() - start
+
+    print(f"scripts: {len(scripts)}, funcs checked: {checked}")
+    print(
+        f"trace {t_trace:.3f}s, fast {t_fast:.3f}s, x{t_trace / max(t_fast, 1e-9):.2f}"
+    )
+
+
+if __name__ == "__main__":
+    main()
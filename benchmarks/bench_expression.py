@@ -0,0 +1,96 @@
+"""condition表达式 解释执行 vs 编译执行 基准
+
+用法: python benchmarks/bench_expression.py [循环次数]
+"""
+
+import itertools
+import json
+import sys
+import timeit
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from WutheringWavesUID.utils.expression_evaluator import (  # noqa: E402
+    CompiledExpressions,
+    find_first_matching_expression,
+)
+
+MAP_PATH = ROOT / "WutheringWavesUID" / "utils" / "map" / "character"
+
+
+def collect_values(expression, values):
+    if not isinstance(expression, dict):
+        return
+    if "sub" in expression:
+        for child in expression["sub"]:
+            collect_values(child, values)
+    elif "key" in expression:
+        value = expression.get("value")
+        items = value if isinstance(value, list) else [value]
+        values.setdefault(expression["key"], set()).update(
+            json.dumps(i, ensure_ascii=False) for i in items
+        )
+
+
+def build_contexts(expressions):
+    """用表达式中出现过的值与若干无关值组合出上下文"""
+    values = {}
+    for expr in expressions:
+        collect_values(expr, values)
+    keys = sorted(values)
+    choices = [
+        [json.loads(v) for v in sorted(values[k])] + [None, "", "0", "100%"]
+        for k in keys
+    ]
+    return [dict(zip(keys, combo)) for combo in itertools.product(*choices)]
+
+
+def main():
+    number = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    files = sorted(MAP_PATH.glob("*/condition*.json"))
+    if not files:
+        print("未找到condition文件")
+        return
+
+    total_interp = total_compiled = 0.0
+    for path in files:
+        with open(path, "r", encoding="utf-8") as f:
+            expressions = json.load(f)
+        compiled = CompiledExpressions(expressions)
+        contexts = build_contexts(expressions)
+
+        for ctx in contexts:
+            expect = find_first_matching_expression(ctx, expressions)
+            actual = find_first_matching_expression(ctx, compiled)
+            assert expect == actual, f"{path} {ctx}: {expect} != {actual}"
+
+        def run_interp():
+            for ctx in contexts:
+                find_first_matching_expression(ctx, expressions)
+
+        def run_compiled():
+            for ctx in contexts:
+                find_first_matching_expression(ctx, compiled)
+
+        t_interp = timeit.timeit(run_interp, number=number)
+        t_compiled = timeit.timeit(run_compiled, number=number)
+        total_interp += t_interp
+        total_compiled += t_compiled
+        calls = number * len(contexts)
+        print(
+            f"{path.parent.name}/{path.name}: {len(contexts)} ctx, "
+            f"interp {t_interp / calls * 1e6:.2f}us, "
+            f"compiled {t_compiled / calls * 1e6:.2f}us, "
+            f"x{t_interp / t_compiled:.1f}"
+        )
+
+    print(
+        f"total: interp {total_interp:.3f}s, compiled {total_compiled:.3f}s, "
+        f"x{total_interp / total_compiled:.1f}"
+    )
+
+
+if __name__ == "__main__":
+    main()
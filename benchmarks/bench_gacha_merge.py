@@ -0,0 +1,133 @@
+"""抽卡记录合并 基准
+
+生成合成抽卡记录(十连同一时间、名称重复)，模拟 已有记录 + 新导入记录 的重叠:
+- 小规模下与原 O(n·m) 动态规划实现比较结果是否一致
+- 大规模(默认 50000 抽)下测量 find_length 与 merge_gacha_logs_by_common_subarray 耗时
+
+用法: python benchmarks/bench_gacha_merge.py [抽数]
+"""
+
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from WutheringWavesUID.utils.api.model import GachaLog  # noqa: E402
+from WutheringWavesUID.wutheringwaves_gachalog.get_gachalogs import (  # noqa: E402
+    find_length,
+    find_longest_common_subarray_indices,
+    merge_gacha_logs_by_common_subarray,
+)
+
+NAMES = ["今汐", "长离", "散华", "白芷", "秋水", "渊武", "远行者长刃·辟路", "暗夜长刃·玄明"]
+
+
+def old_find_length(A, B) -> int:
+    n, m = len(A), len(B)
+    dp = [[0] * (m + 1) for _ in range(n + 1)]
+    ans = 0
+    for i in range(n - 1, -1, -1):
+        for j in range(m - 1, -1, -1):
+            dp[i][j] = dp[i + 1][j + 1] + 1 if A[i] == B[j] else 0
+            ans = max(ans, dp[i][j])
+    return ans
+
+
+def old_indices(a, b):
+    n, m = len(a), len(b)
+    dp = [[0] * (m + 1) for _ in range(n + 1)]
+    length = 0
+    a_end = b_end = 0
+    for i in range(n - 1, -1, -1):
+        for j in range(m - 1, -1, -1):
+            if a[i] == b[j]:
+                dp[i][j] = dp[i + 1][j + 1] + 1
+                if dp[i][j] > length:
+                    length = dp[i][j]
+                    a_end = i + length - 1
+                    b_end = j + length - 1
+            else:
+                dp[i][j] = 0
+    if length == 0:
+        return None
+    return (a_end - length + 1, a_end), (b_end - length + 1, b_end)
+
+
+def old_merge(a, b):
+    common_indices = old_indices(a, b)
+    if not common_indices:
+        return sorted(
+            a + b,
+            key=lambda log: datetime.strptime(log.time, "%Y-%m-%d %H:%M:%S"),
+            reverse=True,
+        )
+    (a_start, a_end), (b_start, b_end) = common_indices
+    prefix = old_merge(a[:a_start], b[:b_start])
+    suffix = old_merge(a[a_end + 1 :], b[b_end + 1 :])
+    return prefix + a[a_start : a_end + 1] + suffix
+
+
+def make_history(pulls: int, rng: random.Random):
+    """按时间倒序的合成抽卡记录"""
+    start = datetime(2024, 5, 23)
+    logs = []
+    for n in range(pulls):
+        t = start + timedelta(minutes=n // 10)
+        name = rng.choice(NAMES)
+        logs.append(
+            GachaLog(
+                cardPoolType="1",
+                resourceId=NAMES.index(name),
+                qualityLevel=5 if rng.random() < 0.02 else 4 if rng.random() < 0.1 else 3,
+                resourceType="角色",
+                name=name,
+                count=1,
+                time=t.strftime("%Y-%m-%d %H:%M:%S"),
+            )
+        )
+    return logs[::-1]
+
+
+def make_case(pulls: int, rng: random.Random):
+    """已有记录与新导入记录，新导入中包含已有记录的后一部分以及若干新抽卡"""
+    history = make_history(pulls, rng)
+    cut = pulls // 10
+    old = history[cut:]
+    new = history[: pulls - cut]
+    return old, new
+
+
+def main():
+    pulls = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    rng = random.Random(0)
+
+    for size in (50, 200, 600):
+        a, b = make_case(size, rng)
+        assert find_length(a, b) == old_find_length(a, b)
+        assert find_longest_common_subarray_indices(a, b) == old_indices(a, b)
+        start = time.perf_counter()
+        expected = old_merge(a, b)
+        old_cost = time.perf_counter() - start
+        start = time.perf_counter()
+        assert merge_gacha_logs_by_common_subarray(a, b) == expected
+        new_cost = time.perf_counter() - start
+        print(f"{size} pulls: dp {old_cost * 1e3:.1f}ms, new {new_cost * 1e3:.1f}ms")
+
+    a, b = make_case(pulls, rng)
+    start = time.perf_counter()
+    length = find_length(a, b)
+    cost = time.perf_counter() - start
+    print(f"{pulls} pulls: find_length {cost * 1e3:.1f}ms (overlap {length})")
+
+    start = time.perf_counter()
+    merged = merge_gacha_logs_by_common_subarray(a, b)
+    cost = time.perf_counter() - start
+    print(f"{pulls} pulls: merge {cost * 1e3:.1f}ms (merged {len(merged)})")
+
+
+if __name__ == "__main__":
+    main()
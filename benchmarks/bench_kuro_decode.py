@@ -0,0 +1,81 @@
+"""库洛接口响应解析 json 二次解码 vs msgspec 基准
+
+以 utils/map/1.json 中的角色详情为样本，按库洛接口的格式(data 为 json 字符串)构造响应，
+分别用原流程(json.loads 外层 + json.loads data + debug 日志格式化)与 decode_kuro_response 解析，
+校验结果一致并统计单次解析耗时(均包含 KuroApiResp 校验)。
+
+用法: python benchmarks/bench_kuro_decode.py [循环次数]
+"""
+
+import json
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from WutheringWavesUID.utils.api.request_util import (  # noqa: E402
+    KuroApiResp,
+    decode_kuro_response,
+)
+
+SAMPLE_PATH = ROOT / "WutheringWavesUID" / "utils" / "map" / "1.json"
+
+
+def make_body(data) -> bytes:
+    return json.dumps(
+        {
+            "code": 200,
+            "msg": "请求成功",
+            "data": json.dumps(data, ensure_ascii=False),
+            "success": True,
+        },
+        ensure_ascii=False,
+    ).encode()
+
+
+def decode_old(body: bytes):
+    raw_data = json.loads(body)
+    if isinstance(raw_data, dict):
+        try:
+            raw_data["data"] = json.loads(raw_data.get("data", ""))
+        except Exception:
+            pass
+    # 原实现无论日志等级都会格式化 debug 日志
+    _ = f"raw_data:{raw_data}"
+    return KuroApiResp.model_validate(raw_data)
+
+
+def decode_new(body: bytes):
+    return KuroApiResp.model_validate(decode_kuro_response(body))
+
+
+def main():
+    number = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+
+    with open(SAMPLE_PATH, "r", encoding="utf-8") as f:
+        role_details = json.load(f)
+
+    cases = {
+        "role detail": [make_body(i) for i in role_details],
+        "role list": [make_body([i["role"] for i in role_details])],
+    }
+
+    for label, bodies in cases.items():
+        for body in bodies:
+            assert decode_old(body) == decode_new(body)
+
+        size = sum(len(i) for i in bodies) / len(bodies)
+        print(f"{label}: {len(bodies)} payloads, avg {size / 1024:.1f} KB")
+        for name, func in (("json + json.loads", decode_old), ("msgspec", decode_new)):
+            start = time.perf_counter()
+            for _ in range(number):
+                for body in bodies:
+                    func(body)
+            cost = (time.perf_counter() - start) / (number * len(bodies))
+            print(f"  {name}: {cost * 1e6:.1f}us per response")
+
+
+if __name__ == "__main__":
+    main()
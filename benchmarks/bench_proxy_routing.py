@@ -0,0 +1,90 @@
+"""_waves_request 代理判断 inspect.stack() vs 按地址查表 基准
+
+对 FUNC_URL_MAP 中的每个 WavesApi 方法，在一定深度的协程调用栈中分别用两种方式判断是否走代理，
+校验结果一致并统计单次请求的额外耗时。
+
+用法: python benchmarks/bench_proxy_routing.py [循环次数] [调用栈深度]
+"""
+
+import asyncio
+import inspect
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from WutheringWavesUID.utils.api import api  # noqa: E402
+from WutheringWavesUID.utils.api.api import FUNC_URL_MAP  # noqa: E402
+
+PROXY_FUNC = ["get_role_detail_info", "get_gacha_log"]
+api.get_need_proxy_func = lambda: PROXY_FUNC
+
+
+def route_old(url: str) -> bool:
+    return inspect.stack()[2].function in PROXY_FUNC or "all" in PROXY_FUNC
+
+
+def route_new(url: str) -> bool:
+    proxy_all, proxy_urls = api.get_need_proxy_urls()
+    return proxy_all or url in proxy_urls
+
+
+async def _waves_request(url: str, route) -> bool:
+    return route(url)
+
+
+def make_method(name: str):
+    """生成与 WavesApi 方法同名的协程函数，供 inspect.stack() 读取"""
+    ns = {"_waves_request": _waves_request}
+    exec(
+        f"async def {name}(url, route):\n"
+        f"    return await _waves_request(url, route)\n",
+        ns,
+    )
+    return ns[name]
+
+
+async def nested(depth: int, func, url: str, route) -> bool:
+    if depth <= 0:
+        return await func(url, route)
+    return await nested(depth - 1, func, url, route)
+
+
+async def main():
+    number = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    depth = int(sys.argv[2]) if len(sys.argv) > 2 else 30
+
+    calls = [
+        (name, url, make_method(name))
+        for name, urls in FUNC_URL_MAP.items()
+        for url in urls
+    ]
+
+    for name, url, func in calls:
+        old = await nested(depth, func, url, route_old)
+        new = await nested(depth, func, url, route_new)
+        assert old == new, f"{name} {url}: {old} != {new}"
+
+    results = {}
+    for label, route in (("inspect.stack", route_old), ("url table", route_new)):
+        start = time.perf_counter()
+        for _ in range(number):
+            for _, url, func in calls:
+                await nested(depth, func, url, route)
+        results[label] = (time.perf_counter() - start) / (number * len(calls))
+
+    start = time.perf_counter()
+    for _ in range(number):
+        for _, url, func in calls:
+            await nested(depth, func, url, lambda u: False)
+    baseline = (time.perf_counter() - start) / (number * len(calls))
+
+    print(f"methods: {len(FUNC_URL_MAP)}, urls: {len(calls)}, stack depth: {depth}")
+    for label, cost in results.items():
+        print(f"{label}: {(cost - baseline) * 1e6:.2f}us per request")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
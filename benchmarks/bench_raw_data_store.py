@@ -0,0 +1,102 @@
+"""角色面板存储 读写基准
+
+以 utils/map/1.json 中的角色详情为样本，在临时目录中比较:
+- 原实现: aiofiles 读写整个 rawData.json
+- RawDataStore json: 原子写入整个 rawData.json
+- RawDataStore msgpack: 刷新单个角色时只追加一条记录
+
+用法: python benchmarks/bench_raw_data_store.py [循环次数]
+"""
+
+import asyncio
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import aiofiles
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from WutheringWavesUID.utils import raw_data_store as store_module  # noqa: E402
+
+SAMPLE_PATH = ROOT / "WutheringWavesUID" / "utils" / "map" / "1.json"
+
+
+async def old_read(path: Path):
+    async with aiofiles.open(path, mode="r", encoding="utf-8") as f:
+        old = json.loads(await f.read())
+    return {d["role"]["roleId"]: d for d in old}
+
+
+async def old_write(path: Path, roles, role_id):
+    async with aiofiles.open(path, "w", encoding="utf-8") as f:
+        await f.write(json.dumps(list(roles.values()), ensure_ascii=False))
+
+
+def make_store(base: Path, fmt: str):
+    store_module.get_raw_data_format = lambda: fmt
+    return store_module.RawDataStore(base)
+
+
+async def bench(label, number, read, write):
+    start = time.perf_counter()
+    for _ in range(number):
+        roles = await read()
+    read_cost = (time.perf_counter() - start) / number
+
+    role_id = next(iter(roles))
+    start = time.perf_counter()
+    for i in range(number):
+        roles[role_id] = dict(roles[role_id], level=i)
+        await write(roles, role_id)
+    write_cost = (time.perf_counter() - start) / number
+    print(
+        f"{label}: read {read_cost * 1e3:.2f}ms, update one role {write_cost * 1e3:.2f}ms"
+    )
+    return roles
+
+
+async def main():
+    number = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+
+    with open(SAMPLE_PATH, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    roles = {d["role"]["roleId"]: d for d in data}
+    print(f"roles: {len(roles)}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        base = Path(tmp)
+        uid = "100000000"
+
+        path = base / "old" / uid / store_module.RAW_DATA_JSON
+        path.parent.mkdir(parents=True)
+        await old_write(path, roles, None)
+        expected = await bench(
+            "aiofiles json",
+            number,
+            lambda: old_read(path),
+            lambda r, i: old_write(path, r, i),
+        )
+
+        for fmt in ("json", "msgpack"):
+            store = make_store(base / fmt, fmt)
+            async with store.lock(uid):
+                await store.write(uid, roles)
+
+            async def write(r, i, store=store):
+                async with store.lock(uid):
+                    await store.write(uid, r, [i])
+
+            result = await bench(
+                f"RawDataStore {fmt}", number, lambda: store.read(uid), write
+            )
+            assert result == expected
+            size = store.stat(uid).st_size
+            print(f"  file size: {size / 1024:.1f} KB")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
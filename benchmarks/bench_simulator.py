@@ -0,0 +1,96 @@
+"""模擬抽卡 simulate_one 逐抽 vs NumPy 批量引擎 基準
+
+以模擬抽卡配置，分別用 SimulatorCore.simulate_one (每十抽重置最近四星) 與 simulate_batch
+模擬 trials 組 × pulls 抽，比較各星級出率、首個五星抽數與耗時，並輸出抽到UP五星所需抽數分佈。
+
+用法: python benchmarks/bench_simulator.py [組數] [每組抽數]
+"""
+
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from WutheringWavesUID.wutheringwaves_simulator.batch_engine import (  # noqa: E402
+    pulls_to_target,
+    simulate_batch,
+)
+from WutheringWavesUID.wutheringwaves_simulator.simulator_core import (  # noqa: E402
+    simulator_core,
+)
+
+
+def simulate_old(config, pulls: int, trials: int) -> np.ndarray:
+    stars = np.empty((trials, pulls), dtype=np.int8)
+    for m in range(trials):
+        state = {
+            "five_star_time": 0,
+            "five_star_other": True,
+            "four_star_time": 0,
+            "four_star_other": True,
+        }
+        recent = []
+        for n in range(pulls):
+            if n % 10 == 0:
+                recent = []
+            result, state = simulator_core.simulate_one(config, state, recent)
+            stars[m, n] = result["star"]
+            if result["star"] == 4:
+                recent.append(result["name"])
+                if len(recent) > 3:
+                    recent.pop(0)
+    return stars
+
+
+def first_five_star(stars: np.ndarray) -> float:
+    found = stars == 5
+    pulls = np.where(found.any(axis=1), found.argmax(axis=1) + 1, stars.shape[1] + 1)
+    return float(pulls.mean())
+
+
+def main():
+    trials = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    pulls = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+
+    for gacha_type in ("role", "weapon"):
+        config = (
+            simulator_core.role_config
+            if gacha_type == "role"
+            else simulator_core.weapon_config
+        )
+        pool = simulator_core.get_pool(gacha_type)
+
+        start = time.perf_counter()
+        old = simulate_old(config, pulls, trials)
+        old_cost = time.perf_counter() - start
+
+        start = time.perf_counter()
+        new = simulate_batch(pool, pulls, trials).stars
+        new_cost = time.perf_counter() - start
+
+        print(f"{gacha_type}: {trials} trials x {pulls} pulls")
+        print(f"  simulate_one: {old_cost * 1e3:.1f}ms, batch: {new_cost * 1e3:.1f}ms")
+        for star in (5, 4, 3):
+            print(
+                f"  {star}星出率: {(old == star).mean():.4f} vs {(new == star).mean():.4f}"
+            )
+        print(
+            f"  首個五星平均抽數: {first_five_star(old):.2f} vs {first_five_star(new):.2f}"
+        )
+
+        up_name = config["five_star"]["up_pool"][0]["name"]
+        start = time.perf_counter()
+        dist = pulls_to_target(pool, up_name, trials=10000, max_pulls=200)
+        cost = time.perf_counter() - start
+        print(
+            f"  抽到{up_name}: 平均 {dist.mean():.1f}, 中位數 {np.median(dist):.0f}, "
+            f"90% {np.percentile(dist, 90):.0f} 抽 ({cost * 1e3:.1f}ms, 10000組)"
+        )
+
+
+if __name__ == "__main__":
+    main()
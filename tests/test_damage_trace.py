@@ -0,0 +1,89 @@
+"""DamageAttribute 记录效果(trace)与不记录效果的计算结果一致性
+
+utils/map/damage 下每个 damage_*.py 的所有伤害函数与排行函数，分别以两种模式计算，
+结果必须完全一致，任一模式抛出异常即为失败。
+没有极限面板数据的角色使用 generate_online_role_detail 生成的模板面板，
+两者都没有时视为失败。
+"""
+
+import asyncio
+import json
+from pathlib import Path
+
+import pytest
+
+from WutheringWavesUID.utils.api.model import RoleDetailData
+from WutheringWavesUID.utils.calc import WuWaCalc
+from WutheringWavesUID.utils.damage.abstract import (
+    DamageDetailRegister,
+    DamageRankRegister,
+)
+from WutheringWavesUID.utils.damage.register_char import register_char
+from WutheringWavesUID.utils.damage.register_echo import register_echo
+from WutheringWavesUID.utils.damage.register_weapon import register_weapon
+from WutheringWavesUID.utils.map.damage.register import (
+    register_damage,
+    register_rank,
+)
+from WutheringWavesUID.wutheringwaves_charinfo.draw_char_card import (
+    generate_online_role_detail,
+)
+
+ROOT = Path(__file__).resolve().parent.parent
+DAMAGE_PATH = ROOT / "WutheringWavesUID" / "utils" / "map" / "damage"
+LIMIT_PATH = ROOT / "WutheringWavesUID" / "utils" / "map" / "1.json"
+
+SCRIPTS = sorted(DAMAGE_PATH.glob("damage_*.py"))
+
+
+def run(role_detail: RoleDetailData, func, trace: bool):
+    calc = WuWaCalc(role_detail)
+    calc.phantom_pre = calc.prepare_phantom()
+    calc.phantom_card = calc.enhance_summation_phantom_value(calc.phantom_pre)
+    calc.role_card = calc.enhance_summation_card_value(calc.phantom_card)
+    attr = calc.card_sort_map_to_attribute(calc.role_card, trace=trace)
+    return func(attr, role_detail)
+
+
+@pytest.fixture(scope="module")
+def roles():
+    register_weapon()
+    register_echo()
+    register_damage()
+    register_rank()
+    register_char()
+
+    with open(LIMIT_PATH, "r", encoding="utf-8") as f:
+        roles = {str(r["role"]["roleId"]): RoleDetailData(**r) for r in json.load(f)}
+    for path in SCRIPTS:
+        char_id = path.stem.split("_")[1]
+        if char_id not in roles:
+            role_detail = asyncio.run(generate_online_role_detail(char_id))
+            if role_detail:
+                roles[char_id] = role_detail
+    return roles
+
+
+def test_scripts_found():
+    assert SCRIPTS, f"{DAMAGE_PATH} 下没有 damage_*.py"
+
+
+@pytest.mark.parametrize("path", SCRIPTS, ids=lambda p: p.stem)
+def test_trace_matches_untraced(roles, path: Path):
+    char_id = path.stem.split("_")[1]
+    role_detail = roles.get(char_id)
+    assert role_detail is not None, f"{path.name}: 没有极限面板也无法生成模板面板"
+
+    funcs = list(DamageDetailRegister.find_class(char_id) or [])
+    rank = DamageRankRegister.find_class(char_id)
+    if rank:
+        funcs.append(rank)
+    assert funcs, f"{path.name}: 没有注册伤害函数"
+
+    for detail in funcs:
+        try:
+            expect = run(role_detail, detail["func"], True)
+            actual = run(role_detail, detail["func"], False)
+        except Exception as e:
+            pytest.fail(f"{detail['title']}: {type(e).__name__}: {e}")
+        assert expect == actual, f"{detail['title']}: {expect} != {actual}"